@@ -0,0 +1,114 @@
+"""
+Benchmark: sorting rows after every page vs ordering them once
+
+Synthetic pages are handled by the real query classes: members by
+`_handle_response`, organization pull requests by `handle_pull_requests`,
+as their shards do. The "per page" variant replays what they used to do:
+sort the whole, growing, result after each page.
+
+Usage: python benchmarks/accumulation.py [--members 50000] [--pull-requests 10000]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from yogit.api.queries import OrganizationMemberListQuery, OrgaPullRequestListQuery
+
+PAGE_SIZE = 100
+
+
+def member_pages(count):
+    logins = ["user{}".format(i) for i in range(count)]
+    random.shuffle(logins)
+    for start in range(0, count, PAGE_SIZE):
+        edges = [
+            {"role": "MEMBER", "node": {"login": login, "email": login + "@company.com", "location": "Lyon"}}
+            for login in logins[start : start + PAGE_SIZE]
+        ]
+        yield {"data": {"viewer": {"organization": {"membersWithRole": {"edges": edges}}}}}
+
+
+def pull_request_pages(count):
+    now = datetime(2019, 7, 12)
+    for start in range(0, count, PAGE_SIZE):
+        edges = []
+        for i in range(start, min(count, start + PAGE_SIZE)):
+            created = now - timedelta(days=random.randint(0, 1000))
+            edges.append(
+                {
+                    "node": {
+                        "createdAt": created.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                        "url": "https://github.com/orga/repo/pull/{}".format(i),
+                        "title": "Pull request {}".format(i),
+                        "labels": {"edges": []},
+                    }
+                }
+            )
+        yield {"data": {"search": {"edges": edges}}}
+
+
+def handle_members(query, page):
+    query._handle_response(page)  # pylint: disable=protected-access
+
+
+def handle_pull_requests(query, page):
+    query.handle_pull_requests(page["data"]["search"]["edges"])
+
+
+def sort_per_page(query, handle, pages):
+    data = []
+    for page in pages:
+        handle(query, page)
+        data.extend(query.rows.rows[len(data) :])
+        for key, reverse in query.rows.sort_keys:
+            data = sorted(data, key=key, reverse=reverse)
+    return data
+
+
+def sort_once(query, handle, pages):
+    for page in pages:
+        handle(query, page)
+    return query.data
+
+
+def measure(label, factory, handle, pages):
+    timings = []
+    for variant in (sort_per_page, sort_once):
+        query = factory()
+        start = time.perf_counter()
+        data = variant(query, handle, pages)
+        timings.append(time.perf_counter() - start)
+        assert data, "no row was handled"
+    print(
+        "{:<28} sort per page {:>7.2f}s   sort once {:>7.2f}s   speedup x{:.1f}".format(
+            label, timings[0], timings[1], timings[0] / timings[1]
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--members", type=int, default=50000)
+    parser.add_argument("--pull-requests", type=int, default=10000)
+    args = parser.parse_args()
+
+    random.seed(0)
+    with patch("yogit.api.queries.GraphQLClient"):
+        measure(
+            "{} members".format(args.members),
+            lambda: OrganizationMemberListQuery("orga"),
+            handle_members,
+            list(member_pages(args.members)),
+        )
+        measure(
+            "{} pull requests".format(args.pull_requests),
+            lambda: OrgaPullRequestListQuery([], "orga"),
+            handle_pull_requests,
+            list(pull_request_pages(args.pull_requests)),
+        )
+
+
+if __name__ == "__main__":
+    main()
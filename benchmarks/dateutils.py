@@ -0,0 +1,57 @@
+"""
+Benchmark: timestamp parsing and relative dates of rows
+
+Timestamps look like GitHub's `updatedAt`: pages repeat many of them. The
+"strptime" variant replays what `dt_for_str` used to do, "today per row"
+what `days_ago_str` used to do.
+
+Usage: python benchmarks/dateutils.py [--timestamps 100000] [--distinct 2000]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from yogit.utils.dateutils import days_ago_str, dt_for_str, utc_today
+
+
+def timestamps(count, distinct):
+    start = datetime(2019, 1, 1)
+    values = [
+        (start + timedelta(seconds=random.randint(0, 365 * 24 * 3600))).strftime(r"%Y-%m-%dT%H:%M:%SZ")
+        for _ in range(distinct)
+    ]
+    return [random.choice(values) for _ in range(count)]
+
+
+def measure(label, func, values):
+    start = time.perf_counter()
+    for value in values:
+        func(value)
+    elapsed = time.perf_counter() - start
+    print("{:<28} {:>8.3f}s  ({:.2f} us per call)".format(label, elapsed, elapsed * 1e6 / len(values)))
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--timestamps", type=int, default=100000)
+    parser.add_argument("--distinct", type=int, default=2000)
+    args = parser.parse_args()
+
+    values = timestamps(args.timestamps, args.distinct)
+    before = measure("strptime", lambda x: datetime.strptime(x, r"%Y-%m-%dT%H:%M:%SZ"), values)
+    measure("fast path, not cached", dt_for_str.__wrapped__, values)
+    dt_for_str.cache_clear()
+    after = measure("fast path, cached", dt_for_str, values)
+    print("speedup: x{:.1f}".format(before / after))
+
+    dates = [dt_for_str(x).date() for x in values]
+    before = measure("days_ago_str, today per row", days_ago_str, dates)
+    today = utc_today()
+    after = measure("days_ago_str, today once", lambda x: days_ago_str(x, today), dates)
+    print("speedup: x{:.1f}".format(before / after))
+
+
+if __name__ == "__main__":
+    main()
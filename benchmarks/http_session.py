@@ -0,0 +1,88 @@
+"""
+Benchmark: one connection per request vs shared keep-alive session
+
+A local stand-in server serves paginated GraphQL-like pages. Establishing
+a connection costs `--handshake-ms` (simulated TCP+TLS handshake), which
+is what `requests.request()` pays on every page.
+
+Usage: python benchmarks/http_session.py [--pages 200] [--handshake-ms 30]
+"""
+import argparse
+import json
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import requests
+
+from yogit.api.requester import create_session
+
+PAGE = json.dumps(
+    {
+        "data": {
+            "search": {
+                "pageInfo": {"hasNextPage": True, "endCursor": "cursor"},
+                "edges": [{"node": {"url": "https://github.com/o/r/pull/{}".format(i)}} for i in range(10)],
+            }
+        }
+    }
+).encode("utf-8")
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    """ Serve the same page over HTTP/1.1 keep-alive """
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    wbufsize = -1
+    handshake_delay = 0.0
+
+    def setup(self):
+        time.sleep(self.handshake_delay)
+        super().setup()
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class ThreadingServer(socketserver.ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def run(label, call, url, pages):
+    start = time.perf_counter()
+    for _ in range(pages):
+        call("post", url, data='{"query": "{}"}').json()
+    elapsed = time.perf_counter() - start
+    print("{:<24} {:>8.1f} pages/s  ({:.2f}s for {} pages)".format(label, pages / elapsed, elapsed, pages))
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--handshake-ms", type=float, default=30.0)
+    args = parser.parse_args()
+
+    PageHandler.handshake_delay = args.handshake_ms / 1000
+    server = ThreadingServer(("127.0.0.1", 0), PageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = "http://127.0.0.1:{}/graphql".format(server.server_address[1])
+
+    before = run("requests.request()", requests.request, url, args.pages)
+    after = run("shared session", create_session(10, 10).request, url, args.pages)
+    print("speedup: x{:.1f}".format(before / after))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark: tabulate vs streaming writers
+
+Rows are printed to /dev/null. Time is measured on a first run, peak
+memory (largest amount traced by `tracemalloc` while printing, rows
+themselves excluded) on a second one as tracing slows everything down.
+
+Usage: python benchmarks/output_formats.py [--rows 100000]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+import click
+from tabulate import tabulate
+
+from yogit.api.rows import OrgaPullRequestRow
+from yogit.utils.writers import write_rows
+
+
+def generate_rows(count):
+    today = date(2019, 7, 12)
+    for i in range(count):
+        created = today - timedelta(days=i % 1000)
+        yield OrgaPullRequestRow(
+            created,
+            "{} days ago".format(i % 1000),
+            "https://github.com/orga/repo/pull/{}".format(i),
+            "Title {}".format(i),
+        )
+
+
+def print_table(rows):
+    click.echo(tabulate([x[1:] for x in rows], headers=["CREATED", "URL", "TITLE"]))
+
+
+def measure(label, print_rows, rows):
+    start = time.perf_counter()
+    print_rows(rows)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    print_rows(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    sys.stderr.write("{:<10} {:>7.2f}s  peak {:>8.1f} MiB\n".format(label, elapsed, peak / 1024 / 1024))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    rows = list(generate_rows(args.rows))
+    sys.stderr.write("{} rows\n".format(args.rows))
+    with open(os.devnull, "w") as devnull:
+        sys.stdout = devnull
+        measure("table", print_table, rows)
+        for output_format in ("json", "ndjson", "csv"):
+            measure(output_format, lambda x, f=output_format: write_rows(x, f), rows)
+        sys.stdout = sys.__stdout__
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark: settings file accesses of a `yogit pr list` run
+
+The command runs against a mocked GitHub API. Calls reaching the settings
+file, or its JSON sidecar, are counted: `open()` and `os.stat()` each issue
+one system call, and YAML parses are counted on their own. The "every load"
+variant replays what `Storage.load()` used to do: open and parse the file on
+every getter.
+
+Usage: python benchmarks/settings_io.py [--pages 10]
+"""
+import argparse
+import builtins
+import os
+import tempfile
+from unittest.mock import patch
+
+import responses
+import yaml
+
+from yogit.api.client import GITHUB_API_URL_V4
+from yogit.storage.storage import Storage
+from yogit.yogit import cli
+from yogit.yogit.settings import Settings
+
+
+def page(index, pages):
+    return {
+        "data": {
+            "viewer": {
+                "pullRequests": {
+                    "pageInfo": {"hasNextPage": index < pages - 1, "endCursor": "cursor{}".format(index)},
+                    "edges": [
+                        {
+                            "node": {
+                                "createdAt": "2019-07-01T10:00:00Z",
+                                "url": "https://github.com/o/r/pull/{}".format(index),
+                                "title": "title",
+                                "mergeable": "MERGEABLE",
+                                "labels": {"edges": []},
+                            }
+                        }
+                    ],
+                }
+            }
+        }
+    }
+
+
+def load_every_time(self):
+    with open(self.filename, "r") as yaml_file:
+        return yaml.load(yaml_file, Loader=yaml.FullLoader) or {}
+
+
+class Counter:
+    """ Count accesses to one file and its sidecar """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.counts = {"open": 0, "stat": 0, "parse": 0}
+
+    def wrap(self, name, func):
+        def wrapper(path, *args, **kwargs):
+            if str(path).startswith(self.filename):
+                self.counts[name] += 1
+            return func(path, *args, **kwargs)
+
+        return wrapper
+
+    def wrap_parse(self, func):
+        def wrapper(*args, **kwargs):
+            self.counts["parse"] += 1
+            return func(*args, **kwargs)
+
+        return wrapper
+
+
+@responses.activate
+def run(label, settings_path, pages, load=None):
+    for index in range(pages):
+        responses.add(responses.POST, GITHUB_API_URL_V4, json=page(index, pages), status=200)
+    counter = Counter(settings_path)
+    patches = [
+        patch("builtins.open", counter.wrap("open", builtins.open)),
+        patch("os.stat", counter.wrap("stat", os.stat)),
+        patch("yaml.load", counter.wrap_parse(yaml.load)),
+        patch("yogit.yogit.update_checker.UpdateChecker._spawn_refresh"),
+        # As in a new process
+        patch.dict("yogit.storage.storage._SNAPSHOTS", clear=True),
+    ]
+    if load is not None:
+        patches.append(patch.object(Storage, "load", load))
+    for item in patches:
+        item.start()
+    try:
+        with patch("yogit.utils.spinner.Halo"), patch("click.echo"), patch("click.secho"):
+            cli.main.main(["pr", "list", "--no-cache"], standalone_mode=False)
+    finally:
+        for item in reversed(patches):
+            item.stop()
+    responses.reset()
+    print("{:<14} {open:>5} open()  {stat:>5} stat()  {parse:>5} YAML parses".format(label, **counter.counts))
+    return counter.counts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        settings_path = os.path.join(directory, "config.yaml")
+        with patch("yogit.yogit.paths.SETTINGS_DIR", directory), patch(
+            "yogit.yogit.settings.get_settings_path", return_value=settings_path
+        ):
+            settings = Settings()
+            with settings.transaction():
+                settings.set_github_token("token")
+                settings.set_github_login("login")
+                settings.set_github_emails(["login@company.com"])
+            before = run("every load", settings_path, args.pages, load=load_every_time)
+            after = run("snapshot", settings_path, args.pages)
+    print("system calls: {} -> {}".format(before["open"] + before["stat"], after["open"] + after["stat"]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+GraphQL alias batching
+
+Statements requested at the same time are merged into one document, their
+top-level fields being aliased so each statement's response can be routed
+back to it: one round trip instead of one per statement.
+"""
+import asyncio
+import re
+
+import click
+
+from yogit.api.cache import get_cached_response, cache_response
+from yogit.api.client import GraphQLClient
+from yogit.api.cost import estimate, MAX_NODES
+from yogit.api.engine import gather
+from yogit.api.statement import is_mutation, RATE_LIMIT_SELECTION
+from yogit.yogit.logger import LOGGER
+
+_TOKENS = re.compile(r'"(?:[^"\\]|\\.)*"|[A-Za-z_]\w*|[(){}:]')
+
+
+def get_selection(statement):
+    """
+    Return the selection set of a statement, without its enclosing braces
+    """
+    return statement[statement.find("{") + 1 : statement.rfind("}")]
+
+
+def get_fields(selection):
+    """
+    Return top-level fields of a selection set as (alias, name, text) tuples
+
+    `alias` is None when the field is not aliased, `text` is the field with
+    its arguments and selection set but without its alias.
+    """
+    fields = []
+    depth = 0
+    alias = name = start = None
+    expect_name = False
+    for match in _TOKENS.finditer(selection):
+        token = match.group(0)
+        if token in ("(", "{"):
+            depth += 1
+        elif token in (")", "}"):
+            depth -= 1
+        elif depth > 0:
+            continue
+        elif token == ":":
+            alias = name
+            expect_name = True
+        elif token[0] != '"':
+            if expect_name:
+                name, start = token, match.start()
+                expect_name = False
+            else:
+                if name is not None:
+                    fields.append((alias, name, selection[start : match.start()].strip()))
+                alias, name, start = None, token, match.start()
+    if name is not None:
+        fields.append((alias, name, selection[start:].strip()))
+    return fields
+
+
+def merge(statements):
+    """
+    Merge statements into one document
+
+    Return the document and, for each statement, a dict mapping the aliases
+    of the document to the response keys of the statement.
+    """
+    selections = [RATE_LIMIT_SELECTION]
+    aliases = []
+    for index, statement in enumerate(statements):
+        statement_aliases = {}
+        for alias, name, text in get_fields(get_selection(statement)):
+            key = alias or name
+            batch_alias = "q{}_{}".format(index, key)
+            statement_aliases[batch_alias] = key
+            selections.append("{}: {}".format(batch_alias, text))
+        aliases.append(statement_aliases)
+    return "{\n" + "\n".join(selections) + "\n}", aliases
+
+
+def split(response, aliases):
+    """
+    Return the part of a merged document response answering one statement
+
+    Errors without path concern the whole document, every statement gets them.
+    """
+    data = response.get("data") or {}
+    result = {"data": {key: data.get(alias) for alias, key in aliases.items()}}
+    errors = []
+    for error in response.get("errors", []):
+        path = error.get("path") or []
+        if not path:
+            errors.append(error)
+        elif path[0] in aliases:
+            error = dict(error, path=[aliases[path[0]]] + path[1:])
+            errors.append(error)
+    if errors:
+        result["errors"] = errors
+    return result
+
+
+class BatchClient:
+    """
+    GitHub GraphQL API client batching concurrent requests
+
+    Statements requested by coroutines before the event loop gets idle are
+    sent as one merged document, split so it stays under GitHub's node limit.
+    Mutations are never batched. Statements are cached one by one, merged
+    documents are not. A merged document is sent with the retry policy of its
+    statements, the default one if they differ.
+    """
+
+    def __init__(self, client=None):
+        self.client = client or GraphQLClient()
+        self.pending = []
+
+    async def get_async(self, query, retry_policy=None):
+        """
+        Perform GET GitHub GraphQL request along with concurrent ones
+        """
+        if is_mutation(query):
+            return await self.client.get_async(query, retry_policy)
+        response = get_cached_response(self.client.url, query)
+        if response is not None:
+            return response
+        future = asyncio.get_event_loop().create_future()
+        self.pending.append((query, future, retry_policy))
+        if len(self.pending) == 1:
+            asyncio.ensure_future(self._flush())
+        return await future
+
+    def _take_batches(self):
+        batches = []
+        nodes = 0
+        for query, future, retry_policy in self.pending:
+            query_nodes, _ = estimate(query)
+            if not batches or nodes + query_nodes > MAX_NODES:
+                batches.append([])
+                nodes = 0
+            batches[-1].append((query, future, retry_policy))
+            nodes += query_nodes
+        self.pending = []
+        return batches
+
+    async def _flush(self):
+        # Let every coroutine ready to run add its statement first
+        await asyncio.sleep(0)
+        await gather(*[self._send(batch) for batch in self._take_batches()])
+
+    async def _send(self, batch):
+        policies = set(retry_policy for _, _, retry_policy in batch)
+        retry_policy = policies.pop() if len(policies) == 1 else None
+        try:
+            if len(batch) == 1:
+                responses = [await self.client.fetch_async(batch[0][0], retry_policy)]
+            else:
+                LOGGER.info("Batching %d GraphQL statements in one request", len(batch))
+                document, aliases = merge([query for query, _, _ in batch])
+                response = await self.client.fetch_async(document, retry_policy)
+                if response.get("data") is None and response.get("errors"):
+                    raise click.ClickException("\n".join(x.get("message", "") for x in response["errors"]))
+                responses = [split(response, statement_aliases) for statement_aliases in aliases]
+        except Exception as exception:  # pylint: disable=broad-except
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(exception)
+            return
+        for (query, future, _), response in zip(batch, responses):
+            cache_response(self.client.url, query, response)
+            if not future.done():
+                future.set_result(response)
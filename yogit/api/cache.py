@@ -0,0 +1,163 @@
+"""
+On-disk cache of GitHub responses
+
+A response is stored compressed in its own file, keyed by the GitHub login
+and the normalized request. The age of an entry is the one of its file;
+least recently used entries are evicted once the cache exceeds its size.
+
+Nothing is cached unless a command sets a cache policy.
+"""
+import hashlib
+import json
+import os
+import zlib
+from time import time
+
+from yogit.api.statement import is_mutation
+from yogit.yogit.logger import LOGGER
+from yogit.yogit.paths import get_cache_dir
+from yogit.yogit.settings import Settings
+
+DEFAULT_MAX_SIZE = 50 * 1024 * 1024
+
+_MAX_AGE = None
+_REFRESH = False
+_CACHE = None
+
+
+def set_cache_policy(max_age, refresh=False):
+    """
+    Serve responses younger than `max_age` seconds from cache, None disables the cache
+
+    With `refresh`, responses are always fetched, then cached.
+    """
+    global _MAX_AGE, _REFRESH  # pylint: disable=global-statement
+    _MAX_AGE = max_age
+    _REFRESH = refresh
+
+
+def normalize(request):
+    """
+    Return a request with insignificant whitespaces removed
+    """
+    return " ".join(request.split())
+
+
+class ResponseCache:
+    """ Compressed responses, one file per request """
+
+    def __init__(self, directory, login, max_size=DEFAULT_MAX_SIZE):
+        self.directory = directory
+        self.login = login
+        self.max_size = max_size
+        self.size = None
+        self.hits = 0
+        self.misses = 0
+
+    def _get_path(self, url, request):
+        key = "\n".join([self.login, url, normalize(request)])
+        return os.path.join(self.directory, hashlib.sha1(key.encode("utf-8")).hexdigest() + ".json.z")
+
+    def get(self, url, request, max_age):
+        """
+        Return the cached response to `request` sent to `url` if younger than `max_age` seconds, None otherwise
+        """
+        path = self._get_path(url, request)
+        try:
+            stored = os.stat(path).st_mtime
+            if time() - stored > max_age:
+                self.misses += 1
+                return None
+            with open(path, "rb") as cache_file:
+                response = json.loads(zlib.decompress(cache_file.read()).decode("utf-8"))
+            # Access time tells which entries were least recently used
+            os.utime(path, (time(), stored))
+        except (OSError, ValueError, zlib.error):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return response
+
+    def put(self, url, request, response):
+        """
+        Cache the response to `request` sent to `url`
+        """
+        path = self._get_path(url, request)
+        data = zlib.compress(json.dumps(response).encode("utf-8"))
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(path + ".tmp", "wb") as cache_file:
+                cache_file.write(data)
+            os.replace(path + ".tmp", path)
+        except OSError as error:
+            LOGGER.error(str(error))
+            return
+        if self.size is not None:
+            self.size += len(data)
+        if self.size is None or self.size > self.max_size:
+            self._evict()
+
+    def _evict(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_atime, stat.st_size, entry.path))
+        self.size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if self.size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self.size -= size
+
+    def get_stats(self):
+        """ Return hits and misses as a string """
+        return "Response cache: {} hits, {} misses".format(self.hits, self.misses)
+
+
+def get_cache():
+    """
+    Return the response cache shared by every client
+    """
+    global _CACHE  # pylint: disable=global-statement
+    if _CACHE is None:
+        _CACHE = ResponseCache(get_cache_dir(), Settings().get_github_login())
+    return _CACHE
+
+
+def get_cached_response(url, request):
+    """
+    Return the cached response to `request` sent to `url` according to the cache policy, or None
+    """
+    if _MAX_AGE is None or _REFRESH or is_mutation(request):
+        return None
+    response = get_cache().get(url, request, _MAX_AGE)
+    if response is not None:
+        LOGGER.info("Served from cache: %s", url)
+    return response
+
+
+def cache_response(url, request, response):
+    """
+    Cache the response to `request` sent to `url` according to the cache policy
+
+    GraphQL responses reporting errors are not cached.
+    """
+    if _MAX_AGE is None or is_mutation(request):
+        return
+    if isinstance(response, dict) and "errors" in response:
+        return
+    get_cache().put(url, request, response)
+
+
+def log_cache_stats():
+    """
+    Log hits and misses of the response cache, if it was used
+    """
+    if _CACHE is not None:
+        LOGGER.info(_CACHE.get_stats())
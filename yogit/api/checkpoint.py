@@ -0,0 +1,98 @@
+"""
+Pagination checkpoints
+
+Pages of a long query are appended to a state file as they are fetched, so
+an interrupted query can be resumed: pages already fetched are read back
+instead of being requested again.
+"""
+import hashlib
+import json
+import os
+
+from yogit.yogit.logger import LOGGER
+from yogit.yogit.paths import get_checkpoint_dir
+
+
+def _get_key(text):
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class Checkpoint:
+    """
+    Pages fetched by a query and the queries it spawns, one JSON line per page
+
+    A page is identified by its statement and the cursor it was requested
+    after. Named values are stored alongside pages, so that a resumed run
+    builds the same statements as the interrupted one. Unless `resume` is
+    set, pages and values of a previous run are dropped.
+    """
+
+    def __init__(self, name, resume=False):
+        self.filename = os.path.join(get_checkpoint_dir(), _get_key(name) + ".ndjson")
+        self.pages = {}
+        self.values = {}
+        if resume:
+            self._load()
+        else:
+            self.clear()
+
+    def _load(self):
+        line = "\n"
+        try:
+            with open(self.filename, "r") as ndjson_file:
+                for line in ndjson_file:
+                    try:
+                        page = json.loads(line)
+                    except ValueError:
+                        # Last line of an interrupted write
+                        continue
+                    if "name" in page:
+                        self.values[page["name"]] = page["value"]
+                        continue
+                    self.pages[(page["key"], page["after"])] = page["response"]
+            if not line.endswith("\n"):
+                # Terminate the interrupted write, or the next line would be appended to it
+                with open(self.filename, "a") as ndjson_file:
+                    ndjson_file.write("\n")
+        except OSError:
+            return
+        LOGGER.info("Resuming from %d pages of `%s`", len(self.pages), self.filename)
+
+    def get(self, statement, cursor):
+        """
+        Return and forget the stored page of `statement` requested after `cursor`, or None
+        """
+        return self.pages.pop((_get_key(statement), cursor), None)
+
+    def put(self, statement, cursor, response):
+        """
+        Store the page of `statement` requested after `cursor`
+        """
+        self._append({"key": _get_key(statement), "after": cursor, "response": response})
+
+    def setdefault(self, name, value):
+        """
+        Return the value stored as `name`, storing `value` first if there is none
+        """
+        if name not in self.values:
+            self.values[name] = value
+            self._append({"name": name, "value": value})
+        return self.values[name]
+
+    def _append(self, entry):
+        line = json.dumps(entry)
+        try:
+            os.makedirs(get_checkpoint_dir(), exist_ok=True)
+            with open(self.filename, "a") as ndjson_file:
+                ndjson_file.write(line + "\n")
+        except OSError as error:
+            LOGGER.error(str(error))
+
+    def clear(self):
+        """ Drop stored pages and values """
+        self.pages = {}
+        self.values = {}
+        try:
+            os.remove(self.filename)
+        except OSError:
+            pass
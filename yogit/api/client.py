@@ -1,17 +1,34 @@
 """
 GitHub API requester
 """
+import asyncio
+import atexit
 import json
+import threading
+from time import sleep, time
 
 import click
 
 from yogit.yogit.logger import LOGGER
+from yogit.yogit.paths import get_rate_limit_path
 from yogit.yogit.settings import Settings
-from yogit.api.requester import http_call
+from yogit.storage.storage import load_json, save_json
+from yogit.api.cache import get_cached_response, cache_response
+from yogit.api.cost import estimate
+from yogit.api.requester import http_call, async_http_call, http_send, async_http_send, check_response, RetryPolicy
+from yogit.api.validators import ValidatorStore, get_conditional_headers
+from yogit.api.statement import is_mutation, with_rate_limit
+from yogit.utils.dateutils import timestamp_for_str
 
 GITHUB_API_URL_V4 = "https://api.github.com/graphql"
 GITHUB_API_URL_V3 = "https://api.github.com"
 
+GRAPHQL_RESOURCE = "graphql"
+REST_RESOURCE = "core"
+PACING_THRESHOLD = 0.1
+
+_PACER = None
+
 
 def _get_authorization():
     """
@@ -28,6 +45,140 @@ def _get_headers():
     return {"Accept": "application/json", "Content-Type": "application/json", "Authorization": _get_authorization()}
 
 
+class RateLimitPacer:
+    """
+    Pace requests according to the last known rate limit budget
+
+    Nothing is slowed down while more than `PACING_THRESHOLD` of the budget
+    remains. Below it, the remaining requests are spread until the budget
+    resets, and requests are paused until reset once it is exhausted.
+    Budgets are persisted so they survive the process: when a new budget
+    window starts, and on `flush`.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.lock = threading.Lock()
+        self.budgets = load_json(self.filename)
+        self.dirty = False
+
+    def _save(self):
+        save_json(self.filename, self.budgets)
+        self.dirty = False
+
+    def update(self, resource, limit, remaining, reset):
+        """
+        Store budget of `resource`, `reset` being a POSIX timestamp
+        """
+        with self.lock:
+            previous = self.budgets.get(resource)
+            self.budgets[resource] = {"limit": limit, "remaining": remaining, "reset": reset}
+            self.dirty = True
+            if previous is None or previous["reset"] != reset:
+                self._save()
+
+    def flush(self):
+        """
+        Persist budgets updated since they were last saved
+        """
+        with self.lock:
+            if self.dirty:
+                self._save()
+
+    def update_from_headers(self, headers):
+        """
+        Store budget found in `X-RateLimit-*` headers, if any
+        """
+        try:
+            self.update(
+                headers.get("X-RateLimit-Resource", REST_RESOURCE),
+                int(headers["X-RateLimit-Limit"]),
+                int(headers["X-RateLimit-Remaining"]),
+                int(headers["X-RateLimit-Reset"]),
+            )
+        except (KeyError, ValueError):
+            pass
+
+    def update_from_graphql(self, response):
+        """
+        Store budget found in the `rateLimit` field of a GraphQL response, if any
+        """
+        try:
+            rate_limit = response["data"]["rateLimit"]
+            self.update(
+                GRAPHQL_RESOURCE, rate_limit["limit"], rate_limit["remaining"], timestamp_for_str(rate_limit["resetAt"])
+            )
+        except (KeyError, TypeError, ValueError):
+            pass
+
+    def get_budget(self, resource):
+        """
+        Return last known budget of `resource` or None if unknown or already reset
+        """
+        budget = self.budgets.get(resource)
+        if budget is None or time() >= budget["reset"]:
+            return None
+        return budget
+
+    def get_delay(self, resource, cost=1):
+        """
+        Return seconds to wait before sending a request costing `cost`
+        """
+        budget = self.get_budget(resource)
+        if budget is None or budget["remaining"] > budget["limit"] * PACING_THRESHOLD:
+            return 0
+        until_reset = budget["reset"] - time()
+        if budget["remaining"] < cost:
+            return until_reset + 1
+        return until_reset / (budget["remaining"] // cost)
+
+    def wait(self, resource, cost=1):
+        """
+        Block until a request costing `cost` can be sent
+        """
+        delay = self.get_delay(resource, cost)
+        if delay > 0:
+            LOGGER.warning("Rate limit almost exhausted, pausing %.1fs", delay)
+            sleep(delay)
+
+    async def wait_async(self, resource, cost=1):
+        """
+        Wait until a request costing `cost` can be sent, without blocking the event loop
+        """
+        delay = self.get_delay(resource, cost)
+        if delay > 0:
+            LOGGER.warning("Rate limit almost exhausted, pausing %.1fs", delay)
+            await asyncio.sleep(delay)
+
+
+def get_pacer():
+    """
+    Return the rate limit pacer shared by every client
+    """
+    global _PACER  # pylint: disable=global-statement
+    if _PACER is None:
+        _PACER = RateLimitPacer(get_rate_limit_path())
+        atexit.register(_PACER.flush)
+    return _PACER
+
+
+def _get_cost(query):
+    """
+    Return the rate limit cost a GraphQL query may be charged, in the worst case
+    """
+    if not isinstance(query, str):
+        return 1
+    _, cost = estimate(query)
+    return cost
+
+
+def _get_retry_policy(query):
+    """
+    Reads are idempotent and can be replayed on any transient failure, mutations cannot
+    """
+    return RetryPolicy(idempotent=not is_mutation(query))
+
+
 class GraphQLClient:
     """
     GitHub GraphQL API client
@@ -40,23 +191,101 @@ class GraphQLClient:
         """
         Perform GET GitHub GraphQL request
         """
-        payload = json.dumps({"query": query})
+        response = get_cached_response(self.url, query)
+        if response is not None:
+            return response
+        payload = json.dumps({"query": with_rate_limit(query)})
         LOGGER.debug(payload)
-        return http_call("post", self.url, headers=_get_headers(), data=payload)
+        get_pacer().wait(GRAPHQL_RESOURCE, _get_cost(query))
+        response = http_call(
+            "post", self.url, headers=_get_headers(), data=payload, retry_policy=_get_retry_policy(query)
+        )
+        get_pacer().update_from_graphql(response)
+        cache_response(self.url, query, response)
+        return response
+
+    async def get_async(self, query, retry_policy=None):
+        """
+        Perform GET GitHub GraphQL request without blocking the event loop
+        """
+        response = get_cached_response(self.url, query)
+        if response is None:
+            response = await self.fetch_async(query, retry_policy)
+            cache_response(self.url, query, response)
+        return response
+
+    async def fetch_async(self, query, retry_policy=None):
+        """
+        Perform GET GitHub GraphQL request without blocking the event loop nor using the response cache
+
+        `retry_policy` defaults to the one of the query kind (read or mutation)
+        """
+        payload = json.dumps({"query": with_rate_limit(query)})
+        LOGGER.debug(payload)
+        await get_pacer().wait_async(GRAPHQL_RESOURCE, _get_cost(query))
+        retry_policy = retry_policy or _get_retry_policy(query)
+        response = await async_http_call(
+            "post", self.url, headers=_get_headers(), data=payload, retry_policy=retry_policy
+        )
+        get_pacer().update_from_graphql(response)
+        return response
 
 
 class RESTClient:
     """
     GitHub REST API client
+
+    Requests are conditional: a `304 Not Modified` is served from local store
+    and does not count against the rate limit.
     """
 
+    def __init__(self):
+        self.validators = ValidatorStore()
+
     def _get_url(self, endpoint):
         return GITHUB_API_URL_V3 + endpoint
 
+    def _get_conditional_headers(self, url):
+        entry = self.validators.get(url)
+        headers = _get_headers()
+        headers.update(get_conditional_headers(entry))
+        return entry, headers
+
+    def _handle_response(self, url, entry, response):
+        get_pacer().update_from_headers(response.headers)
+        if response.status_code == 304 and entry is not None:
+            LOGGER.info("Not modified, served from local store: %s", url)
+            return entry["body"]
+        body = check_response(response)
+        self.validators.put(url, response.headers.get("ETag"), response.headers.get("Last-Modified"), body)
+        return body
+
     def get(self, endpoint):
         """
         Perform GET GitHub REST request
         """
         url = self._get_url(endpoint)
+        response = get_cached_response(url, "")
+        if response is not None:
+            return response
+        LOGGER.debug("GET %s", url)
+        entry, headers = self._get_conditional_headers(url)
+        get_pacer().wait(REST_RESOURCE)
+        response = self._handle_response(url, entry, http_send("get", url, headers=headers))
+        cache_response(url, "", response)
+        return response
+
+    async def get_async(self, endpoint):
+        """
+        Perform GET GitHub REST request without blocking the event loop
+        """
+        url = self._get_url(endpoint)
+        response = get_cached_response(url, "")
+        if response is not None:
+            return response
         LOGGER.debug("GET %s", url)
-        return http_call("get", url, headers=_get_headers())
+        entry, headers = self._get_conditional_headers(url)
+        await get_pacer().wait_async(REST_RESOURCE)
+        response = self._handle_response(url, entry, await async_http_send("get", url, headers=headers))
+        cache_response(url, "", response)
+        return response
@@ -0,0 +1,100 @@
+"""
+GraphQL query cost estimation and page size tuning
+
+GitHub rejects queries which may return more than `MAX_NODES` nodes and
+charges every query according to the connections it may traverse:
+https://developer.github.com/v4/guides/resource-limitations/
+"""
+import re
+
+MAX_NODES = 500000
+MAX_PAGE_SIZE = 100
+TARGET_LATENCY = 5.0
+
+_TOKENS = re.compile(r'"(?:[^"\\]|\\.)*"|\b(?:first|last)\s*:\s*(?:\$\w+|\d+)|[A-Za-z_]\w*|[(){}]')
+_CONNECTION_SIZE = re.compile(r"(?:first|last)\s*:\s*(\$\w+|\d+)")
+
+
+def get_connections(statement, page_size):
+    """
+    Return the connections of a statement as (size, parent size) pairs
+
+    `size` is the number of items requested by `first`/`last`, variables (`$offset`)
+    stand for `page_size`. `parent size` is the worst-case number of parent nodes
+    the connection is fetched for.
+    """
+    connections = []
+    parents = [1]
+    size = None
+    in_arguments = False
+    for match in _TOKENS.finditer(statement):
+        token = match.group(0)
+        if token == "(":
+            in_arguments = True
+        elif token == ")":
+            in_arguments = False
+        elif token == "{":
+            if size is None:
+                parents.append(parents[-1])
+            else:
+                connections.append((size, parents[-1]))
+                parents.append(parents[-1] * size)
+            size = None
+        elif token == "}":
+            parents.pop()
+            size = None
+        elif in_arguments:
+            connection_size = _CONNECTION_SIZE.match(token)
+            if connection_size is not None:
+                value = connection_size.group(1)
+                size = page_size if value.startswith("$") else int(value)
+        else:
+            size = None
+    return connections
+
+
+def estimate(statement, page_size=MAX_PAGE_SIZE):
+    """
+    Return worst-case node count and rate limit cost of a statement
+    """
+    connections = get_connections(statement, page_size)
+    nodes = sum(size * parent_size for size, parent_size in connections)
+    requests = sum(parent_size for _, parent_size in connections)
+    return nodes, max(1, int(round(requests / 100.0)))
+
+
+def get_max_page_size(statement, max_page_size=MAX_PAGE_SIZE):
+    """
+    Return the largest page size keeping the statement under the node limit
+    """
+    for page_size in range(max_page_size, 0, -1):
+        nodes, _ = estimate(statement, page_size)
+        if nodes <= MAX_NODES:
+            return page_size
+    return 1
+
+
+class PageSizeTuner:
+    """
+    Adapt page size to the observed latency
+
+    Pages slower than `target_latency` shrink the next ones, fast pages let
+    them grow back to `max_page_size`. A page which timed out is fetched
+    again with half the page size.
+    """
+
+    def __init__(self, max_page_size, target_latency=TARGET_LATENCY):
+        self.max_page_size = max_page_size
+        self.target_latency = target_latency
+        self.page_size = max_page_size
+
+    def on_page(self, latency):
+        """ Adapt page size after a page was fetched in `latency` seconds """
+        if latency > self.target_latency:
+            self.page_size = max(1, int(self.page_size * self.target_latency / latency))
+        elif latency < self.target_latency / 2:
+            self.page_size = min(self.max_page_size, self.page_size * 2)
+
+    def on_timeout(self):
+        """ Adapt page size after a page failed to be fetched in time """
+        self.page_size = max(1, self.page_size // 2)
@@ -0,0 +1,136 @@
+"""
+Asynchronous execution engine
+
+Queries expose coroutines (`execute_async`) so independent queries can be
+awaited together; the synchronous API runs them through `run`.
+"""
+import asyncio
+
+import click
+
+_DRY_RUN = False
+_PLANS = []
+
+
+def set_dry_run(enabled):
+    """
+    Enable or disable dry run: queries plan their requests instead of reaching the network
+    """
+    global _DRY_RUN  # pylint: disable=global-statement
+    _DRY_RUN = enabled
+    del _PLANS[:]
+
+
+def is_dry_run():
+    """
+    Return True if queries must plan their requests instead of reaching the network
+    """
+    return _DRY_RUN
+
+
+def add_plan(plan):
+    """
+    Add a line to the requests planned by the command
+    """
+    _PLANS.append(plan)
+
+
+def exit_dry_run():
+    """
+    Print planned requests and stop the command, which has nothing fetched to work with
+
+    Called where a command needs fetched results, and once it returned. Nothing
+    happens if no request was planned.
+    """
+    if is_dry_run() and _PLANS:
+        for plan in _PLANS:
+            click.echo(plan)
+        del _PLANS[:]
+        click.get_current_context().exit()
+
+
+def run(coroutine):
+    """
+    Run a coroutine until completion in a dedicated event loop and return its result
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        asyncio.set_event_loop(loop)
+        return loop.run_until_complete(coroutine)
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+def iterate(async_iterator):
+    """
+    Iterate an asynchronous iterator from synchronous code
+
+    The event loop only runs while the next item is awaited.
+    """
+    loop = asyncio.new_event_loop()
+    try:
+        asyncio.set_event_loop(loop)
+        while True:
+            try:
+                item = loop.run_until_complete(async_iterator.__anext__())
+            except StopAsyncIteration:
+                return
+            yield item
+    finally:
+        asyncio.set_event_loop(None)
+        loop.close()
+
+
+class RowStream:
+    """
+    Asynchronous iterator over rows of a query, yielded as pages arrive
+
+    Rows come in arrival order. They are not kept by the query, nor are its
+    raw pages: the full result set is never held. The query is executed on
+    first iteration.
+    """
+
+    _END = object()
+
+    def __init__(self, query, spinner=None):
+        self.query = query
+        self.spinner = spinner
+        self.queue = None
+        self.task = None
+
+    async def _execute(self):
+        try:
+            await self.query.execute_async(self.spinner)
+        finally:
+            self.queue.put_nowait(self._END)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if self.task is None:
+            self.queue = asyncio.Queue()
+            self.query.rows.subscribe(self.queue.put_nowait, keep_rows=False)
+            self.query.keep_responses = False
+            self.task = asyncio.ensure_future(self._execute())
+        row = await self.queue.get()
+        if row is self._END:
+            self.queue.put_nowait(self._END)
+            await self.task
+            raise StopAsyncIteration
+        return row
+
+
+async def gather(*coroutines):
+    """
+    Await coroutines concurrently and return their results in order
+
+    Every coroutine runs to completion before the first error, if any, is raised:
+    no request is left running in the background.
+    """
+    results = await asyncio.gather(*coroutines, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return results
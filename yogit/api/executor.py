@@ -0,0 +1,107 @@
+"""
+Concurrent execution of several queries
+"""
+import asyncio
+from time import monotonic
+
+from yogit.api.batch import BatchClient
+from yogit.api.client import GraphQLClient
+from yogit.api.engine import run
+from yogit.utils.spinner import spin
+from yogit.yogit.logger import LOGGER
+from yogit.yogit.settings import Settings
+
+
+class QueryExecutor:
+    """
+    Execute queries concurrently
+
+    A query starts as soon as the queries it depends on succeeded, at most
+    `max_concurrency` queries run at the same time. Every query runs to
+    completion (or is skipped because a dependency failed) before errors are
+    raised, the first added query's error first.
+
+    GraphQL queries share a `BatchClient`: their concurrent pages are sent
+    as one request.
+    """
+
+    def __init__(self, max_concurrency=None, batch=True):
+        self.max_concurrency = max_concurrency or Settings().get_http_pool_maxsize()
+        self.batch_client = BatchClient() if batch else None
+        self.queries = []
+        self.dependencies = {}
+        self.timings = {}
+        self.errors = {}
+
+    def add(self, query, depends_on=()):
+        """
+        Add a query to execute once the `depends_on` ones succeeded, return it
+        """
+        for dependency in depends_on:
+            if dependency not in self.dependencies:
+                raise ValueError("Dependencies must be added before the queries depending on them")
+        if self.batch_client is not None and isinstance(getattr(query, "client", None), GraphQLClient):
+            query.client = self.batch_client
+        self.queries.append(query)
+        self.dependencies[query] = list(depends_on)
+        return query
+
+    async def _execute_query(self, query, tasks, semaphore, spinner):
+        for dependency in self.dependencies[query]:
+            await asyncio.wait([tasks[dependency]])
+            if dependency in self.errors:
+                LOGGER.info("%s skipped: %s failed", type(query).__name__, type(dependency).__name__)
+                return
+        async with semaphore:
+            start = monotonic()
+            try:
+                await query.execute_async(spinner)
+            except Exception as exception:  # pylint: disable=broad-except
+                self.errors[query] = exception
+            self.timings[query] = monotonic() - start
+
+    async def execute_async(self, spinner=None, raise_errors=True):
+        """
+        Execute queries without blocking the event loop
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks = {}
+        for query in self.queries:
+            tasks[query] = asyncio.ensure_future(self._execute_query(query, tasks, semaphore, spinner))
+        if tasks:
+            await asyncio.wait(list(tasks.values()))
+        self._log_report()
+        if raise_errors:
+            self.raise_errors()
+
+    @spin
+    def execute(self, spinner, raise_errors=True):
+        """
+        Execute queries
+        """
+        run(self.execute_async(spinner, raise_errors))
+
+    def raise_errors(self):
+        """
+        Raise error of the first failed query, if any
+        """
+        for query in self.queries:
+            if query in self.errors:
+                raise self.errors[query]
+
+    def _log_report(self):
+        for query in self.queries:
+            name = type(query).__name__
+            if query in self.errors:
+                LOGGER.error("%s failed in %.2fs: %s", name, self.timings[query], str(self.errors[query]))
+            elif query in self.timings:
+                LOGGER.info("%s executed in %.2fs", name, self.timings[query])
+
+    def get_rows(self):
+        """
+        Return rows of every query, in the order queries were added
+        """
+        rows = []
+        for query in self.queries:
+            rows.extend(getattr(query, "data", []))
+        return rows
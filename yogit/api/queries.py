@@ -2,17 +2,53 @@
 GraphQL queries used by yogit
 """
 import textwrap
+from time import monotonic
 
 import click
 from tabulate import tabulate
 
 import yogit.api.statements as S
-from yogit.api.client import GraphQLClient, RESTClient
+from yogit.api.checkpoint import Checkpoint
+from yogit.api.client import GraphQLClient, RESTClient, get_pacer, GRAPHQL_RESOURCE
+from yogit.api.cost import estimate, get_max_page_size, PageSizeTuner
+from yogit.api.engine import run, iterate, is_dry_run, add_plan, RowStream
+from yogit.api.executor import QueryExecutor
+from yogit.api.requester import RetryPolicy, TransientHTTPError
+from yogit.api.rows import (
+    ReviewRequestedRow,
+    ReviewRow,
+    OrganizationRow,
+    MemberRow,
+    PullRequestRow,
+    OrgaPullRequestRow,
+    StatRow,
+    ContributionRow,
+    OneDayContributionRow,
+    BranchRow,
+    DanglingBranchRow,
+)
 from yogit.api.statement import prepare, prepare_pagination
-from yogit.utils.dateutils import dt_for_str, days_ago_str
+from yogit.utils.accumulator import RowAccumulator
+from yogit.utils.dateutils import (
+    dt_for_str,
+    days_ago_str,
+    split_date_range,
+    str_for_timestamp,
+    timestamp_for_str,
+    utc_today,
+    utcnow_timestamp,
+)
 from yogit.utils.spinner import spin
 from yogit.yogit.logger import LOGGER
 
+PAGE_RETRY_COUNT = 3
+# Rate limit rejections aside, failed pages are retried by `_get_page`, with a smaller page size
+PAGE_RETRY_POLICY = RetryPolicy(retry_errors=False)
+YEAR_SHARD_DAYS = 365
+MONTH_SHARD_DAYS = 31
+SEARCH_LIMIT = 1000
+SEARCH_EPOCH = "2008-01-01T00:00:00Z"
+
 
 def shorten_str(full_string):
     """
@@ -22,37 +58,103 @@ def shorten_str(full_string):
     return textwrap.shorten(full_string, width=50, placeholder="...")
 
 
+def get_label_selection(labels):
+    """
+    Return the labels selection of pull request statements, only needed to filter by label
+    """
+    return S.PULL_REQUEST_LABELS_SELECTION if labels else ""
+
+
+def get_label_qualifiers(labels):
+    """
+    Return search qualifiers of pull requests having every label, quoted for a GraphQL string
+    """
+    return "".join(' label:\\"{}\\"'.format(label.replace('"', "").replace("\\", "")) for label in labels)
+
+
 class Query:
     """ Represent a GitHub query """
 
     def __init__(self):
         self._response = []
+        # Raw pages are not kept when rows are streamed
+        self.keep_responses = True
         self.client = None
+        self.rows = RowAccumulator()
+
+    @property
+    def data(self):
+        """ Ordered rows fetched so far """
+        return self.rows.get_rows()
 
     def _handle_response(self, response):
-        self._response.append(response)
+        if self.keep_responses:
+            self._response.append(response)
 
     def execute(self):
         """ Execute the query """
         raise NotImplementedError()
 
+    async def execute_async(self, spinner=None):
+        """ Execute the query without blocking the event loop """
+        raise NotImplementedError()
+
+    def stream(self, spinner=None):
+        """ Return an asynchronous iterator over rows, yielded as pages arrive """
+        return RowStream(self, spinner)
+
+    def iter_rows(self):
+        """ Yield rows as pages arrive """
+        yield from iterate(self.stream())
+
     def tabulate(self):
         """ Return tabulated result """
         raise NotImplementedError()
 
+    def get_headers(self):
+        """ Return column headers """
+        raise NotImplementedError()
+
+    def get_columns(self, row):
+        """ Return printed columns of a row """
+        return row
+
     def print(self):
         """ Print result """
         click.echo(self._response)
 
+    def get_mirror_source(self):
+        """ Return the name of the rows of this query in the local mirror, None if not mirrored """
+        return None
+
+    def load_mirror_rows(self, rows):
+        """ Add rows read from the local mirror """
+        self.rows.extend(rows)
+
+    def print_stream(self):
+        """ Print rows, tab separated, as pages arrive """
+        click.secho("\t".join(self.get_headers()), bold=True)
+        count = 0
+        for row in self.iter_rows():
+            click.echo("\t".join(str(x) for x in self.get_columns(row)))
+            count += 1
+        click.secho("Count: {}".format(count), bold=True)
+
 
 class GraphQLQuery(Query):
-    def __init__(self, statement, variables=[], extra_data={}, pagination_offset=None):
+    def __init__(self, statement, variables=[], extra_data={}, pagination_offset=None, cursor=None, max_pages=None):
         super().__init__()
         self.client = GraphQLClient()
         self.statement = statement
         self.variables = variables
         self.extra_data = extra_data
         self.pagination_offset = pagination_offset
+        self.cursor = cursor
+        self.max_pages = max_pages
+        # Cursor of the first page not fetched because of `max_pages`
+        self.next_cursor = None
+        # Pages are read from and stored in this checkpoint when set
+        self.checkpoint = None
 
     def get_pagination_info(self):
         raise NotImplementedError()
@@ -60,28 +162,93 @@ class GraphQLQuery(Query):
     def get_count(self):
         raise NotImplementedError()
 
+    async def _get_page(self, prepared_statement, cursor, tuner):
+        """
+        Fetch one page
+
+        Transient errors the transport left to us are retried here: the page
+        is fetched again from the same cursor with a smaller page size, pages
+        already fetched are kept. Errors it already retried, rate limit
+        rejections included, are not.
+        """
+        for attempt in range(PAGE_RETRY_COUNT):
+            paginated_statement = prepare_pagination(prepared_statement, tuner.page_size, cursor)
+            start = monotonic()
+            try:
+                response = await self.client.get_async(paginated_statement, PAGE_RETRY_POLICY)
+            except TransientHTTPError as error:
+                if error.retried or attempt + 1 == PAGE_RETRY_COUNT:
+                    raise
+                tuner.on_timeout()
+                LOGGER.warning("Page failed (%s), resuming from its cursor", str(error))
+            else:
+                tuner.on_page(monotonic() - start)
+                return response
+
+    def open_checkpoint(self, resume):
+        """
+        Store pages in a checkpoint named after the query
+
+        If `resume` is set, pages stored by an interrupted run are read back.
+        """
+        name = "{}\n{}".format(type(self).__name__, prepare(self.statement, self.variables, self.extra_data))
+        self.checkpoint = Checkpoint(name, resume)
+
+    async def _get_checkpointed_page(self, prepared_statement, cursor, tuner):
+        if self.checkpoint is None:
+            return await self._get_page(prepared_statement, cursor, tuner)
+        response = self.checkpoint.get(prepared_statement, cursor)
+        if response is None:
+            response = await self._get_page(prepared_statement, cursor, tuner)
+            self.checkpoint.put(prepared_statement, cursor, response)
+        return response
+
+    def plan_requests(self, prepared_statement):
+        """
+        Plan requests which would be sent, along with their worst-case cost
+        """
+        if self.pagination_offset is None:
+            nodes, cost = estimate(prepared_statement)
+            requests = "1 request"
+        else:
+            page_size = get_max_page_size(prepared_statement, self.pagination_offset)
+            nodes, cost = estimate(prepared_statement, page_size)
+            requests = "1 request per {} items".format(page_size)
+        add_plan("{}: {}, {} nodes, cost {} each".format(type(self).__name__, requests, nodes, cost))
+
     @spin
     def execute(self, spinner):
+        run(self.execute_async(spinner))
+
+    async def execute_async(self, spinner=None):
         prepared_statement = prepare(self.statement, self.variables, self.extra_data)
+        if is_dry_run():
+            self.plan_requests(prepared_statement)
+            return
+
         if self.pagination_offset is None:
-            response = self.client.get(prepared_statement)
+            response = await self.client.get_async(prepared_statement)
             super()._handle_response(response)
             self._handle_response(response)
             return
 
-        cursor = None
+        tuner = PageSizeTuner(get_max_page_size(prepared_statement, self.pagination_offset))
+        cursor = self.cursor
         has_next = True
-        while has_next:
-            paginated_statement = prepare_pagination(prepared_statement, self.pagination_offset, cursor)
-            response = self.client.get(paginated_statement)
+        pages = 0
+        while has_next and pages != self.max_pages:
+            response = await self._get_checkpointed_page(prepared_statement, cursor, tuner)
             super()._handle_response(response)
             self._handle_response(response)
             count = self.get_count()
-            if count > 0:
+            if count > 0 and spinner is not None:
                 spinner.text = "Loading... (yet {} entries found)".format(count)
             pagination_info = self.get_pagination_info(response)
             has_next = pagination_info["hasNextPage"]
             cursor = pagination_info["endCursor"]
+            pages += 1
+        if has_next:
+            self.next_cursor = cursor
 
 
 class RESTQuery(Query):
@@ -92,7 +259,13 @@ class RESTQuery(Query):
 
     @spin
     def execute(self, spinner):
-        response = self.client.get(self.endpoint)
+        run(self.execute_async(spinner))
+
+    async def execute_async(self, spinner=None):
+        if is_dry_run():
+            add_plan("{}: 1 request, GET {}".format(type(self).__name__, self.endpoint))
+            return
+        response = await self.client.get_async(self.endpoint)
         super()._handle_response(response)
         self._handle_response(response)
 
@@ -119,45 +292,58 @@ class ReviewRequestedQuery(GraphQLQuery):
             extra_data={"state": state},
             pagination_offset=100,
         )
-        self.data = []
+        # Sort by url, then by reversed date:
+        self.rows = RowAccumulator(sort_keys=[(lambda x: (x[2], x[3]), False), (lambda x: x[0], True)])
 
     def get_pagination_info(self, response):
         return response["data"]["search"]["pageInfo"]
 
     def get_count(self):
-        return len(self.data)
+        return len(self.rows)
+
+    def get_mirror_source(self):
+        return "review_requested:{}".format("closed" if self.is_closed else "open")
 
     def _handle_response(self, response):
+        today = utc_today()
         for pr in response["data"]["search"]["edges"]:
             title = shorten_str(pr["node"]["title"])
             url = pr["node"]["url"]
             updated = dt_for_str(pr["node"]["updatedAt"]).date()
-            updated_str = days_ago_str(updated)
-            self.data.append([updated, updated_str, url, title])
+            updated_str = days_ago_str(updated, today)
+            self.rows.append(ReviewRequestedRow(updated, updated_str, url, title))
 
-        self.data = sorted(self.data, key=lambda x: (x[2], x[3]))
-        self.data = sorted(self.data, key=lambda x: x[0], reverse=True)
+    def get_headers(self):
+        return ["UPDATED", "PULL REQUEST", "TITLE"]
+
+    def get_columns(self, row):
+        return row[1:]
 
     def print(self):
         if len(self.data) == 0:
             click.secho("All done! 🎉✨", bold=True)
         else:
-            click.echo(tabulate([x[1:] for x in self.data], headers=["UPDATED", "PULL REQUEST", "TITLE"]))
+            click.echo(tabulate([self.get_columns(x) for x in self.data], headers=self.get_headers()))
             click.secho("Count: {}".format(len(self.data)), bold=True)
 
 
 class ReviewListQuery(GraphQLQuery):
     def __init__(self):
         super().__init__(S.REVIEW_LIST_STATEMENT, pagination_offset=100)
-        self.data = []
+        # Sort by url, then by reversed date:
+        self.rows = RowAccumulator(sort_keys=[(lambda x: x[2], False), (lambda x: x[0], True)])
 
     def get_pagination_info(self, response):
         return response["data"]["viewer"]["contributionsCollection"]["pullRequestReviewContributions"]["pageInfo"]
 
     def get_count(self):
-        return len(self.data)
+        return len(self.rows)
+
+    def get_mirror_source(self):
+        return "reviews"
 
     def _handle_response(self, response):
+        today = utc_today()
         for review in response["data"]["viewer"]["contributionsCollection"]["pullRequestReviewContributions"]["edges"]:
             pr_state = review["node"]["pullRequest"]["state"]
             if pr_state != "OPEN":
@@ -175,17 +361,13 @@ class ReviewListQuery(GraphQLQuery):
             rv_updated = dt_for_str(rv_updated)
 
             up_to_date = rv_updated > last_commit_pushed
-            rv_updated_str = days_ago_str(rv_updated.date())
+            rv_updated_str = days_ago_str(rv_updated.date(), today)
 
             rv_state_str = rv_state
             if not up_to_date:
                 rv_state_str += " (new commits)"
 
-            self.data.append([rv_updated.date(), rv_updated_str, url, rv_state_str])
-
-        # Sort by url, then by reversed date:
-        self.data = sorted(self.data, key=lambda x: x[2])
-        self.data = sorted(self.data, key=lambda x: x[0], reverse=True)
+            self.rows.append(ReviewRow(rv_updated.date(), rv_updated_str, url, rv_state_str))
 
     def print(self):
         if len(self.data) == 0:
@@ -198,16 +380,17 @@ class ReviewListQuery(GraphQLQuery):
 class OrganizationListQuery(GraphQLQuery):
     def __init__(self):
         super().__init__(S.ORGANIZATION_LIST_STATEMENT)
-        self.data = []
+        self.rows = RowAccumulator(sort_keys=[(lambda x: x[0].lower(), False)])
+
+    def get_mirror_source(self):
+        return "organizations"
 
     def _handle_response(self, response):
         orgas = response["data"]["viewer"]["organizations"]["edges"]
         for orga in orgas:
             login = orga["node"]["login"]
             url = orga["node"]["url"]
-            self.data.append([login, url])
-
-        self.data = sorted(self.data, key=lambda x: x[0].lower())
+            self.rows.append(OrganizationRow(login, url))
 
     def print(self):
         if len(self.data) == 0:
@@ -222,14 +405,17 @@ class OrganizationMemberListQuery(GraphQLQuery):
         super().__init__(
             S.ORGANIZATION_MEMBER_LIST_STATEMENT, pagination_offset=100, extra_data={"organization": organization}
         )
-        self.data = []
+        self.rows = RowAccumulator(sort_keys=[(lambda x: x[0], False)])
         self.organization = organization
 
     def get_pagination_info(self, response):
         return response["data"]["viewer"]["organization"]["membersWithRole"]["pageInfo"]
 
     def get_count(self):
-        return len(self.data)
+        return len(self.rows)
+
+    def get_mirror_source(self):
+        return "members:{}".format(self.organization.lower())
 
     def _handle_response(self, response):
         for member in response["data"]["viewer"]["organization"]["membersWithRole"]["edges"]:
@@ -237,13 +423,14 @@ class OrganizationMemberListQuery(GraphQLQuery):
             email = member["node"]["email"]
             location = member["node"]["location"]
             role = member["role"]
-            self.data.append([login, email, location, role])
+            self.rows.append(MemberRow(login, email, location, role))
 
-        self.data = sorted(self.data, key=lambda x: x[0])
+    def get_headers(self):
+        return ["NAME", "EMAIL", "LOCATION", "ROLE"]
 
     def print(self):
         click.secho("{}'s members".format(self.organization), bold=True)
-        click.echo(tabulate(self.data, headers=["NAME", "EMAIL", "LOCATION", "ROLE"]))
+        click.echo(tabulate(self.data, headers=self.get_headers()))
         click.secho("Count: {}".format(len(self.data)), bold=True)
 
 
@@ -260,97 +447,290 @@ class RateLimitQuery(GraphQLQuery):
         self.remaining = rate_limit["remaining"]
         self.reset_at = rate_limit["resetAt"]
 
+    def load_last_known(self):
+        """
+        Fill budget with the last one seen by any request, without network call
+
+        Return False if it is unknown or already reset
+        """
+        budget = get_pacer().get_budget(GRAPHQL_RESOURCE)
+        if budget is None:
+            return False
+        self.limit = budget["limit"]
+        self.remaining = budget["remaining"]
+        self.reset_at = str_for_timestamp(budget["reset"])
+        return True
+
     def print(self):
         click.secho("GitHub usage: {}/{} until {}".format(self.remaining, self.limit, self.reset_at), bold=True)
 
 
 class PullRequestListQuery(GraphQLQuery):
     def __init__(self, labels):
-        super().__init__(S.PULL_REQUEST_LIST_STATEMENT)
-        self.data = []
+        super().__init__(S.PULL_REQUEST_LIST_STATEMENT, extra_data={"labels": get_label_selection(labels)})
+        # Sort by url, then by reversed date:
+        self.rows = RowAccumulator(sort_keys=[(lambda x: x[2], False), (lambda x: x[0], True)])
         self.labels = labels
 
+    def get_mirror_source(self):
+        return "pull_requests"
+
     def _handle_response(self, response):
+        today = utc_today()
         for pr in response["data"]["viewer"]["pullRequests"]["edges"]:
             created = dt_for_str(pr["node"]["createdAt"]).date()
             url = pr["node"]["url"]
             title = shorten_str(pr["node"]["title"])
             mergeable = pr["node"]["mergeable"]
-            created_str = days_ago_str(created)
             if self.labels:
                 pr_labels = [x["node"]["name"].lower() for x in pr["node"]["labels"]["edges"]]
                 if not set(self.labels).issubset(set(pr_labels)):
                     continue
-            self.data.append([created, created_str, url, title, mergeable])
-        # Sort by url, then by reversed date:
-        self.data = sorted(self.data, key=lambda x: x[2])
-        self.data = sorted(self.data, key=lambda x: x[0], reverse=True)
+            created_str = days_ago_str(created, today)
+            self.rows.append(PullRequestRow(created, created_str, url, title, mergeable))
+
+    def get_headers(self):
+        return ["CREATED", "URL", "TITLE", "MERGEABLE"]
+
+    def get_columns(self, row):
+        return row[1:]
 
     def print(self):
         if len(self.data) == 0:
             click.secho("Nothing... 😿 Time to push hard 💪", bold=True)
         else:
-            click.echo(tabulate([x[1:] for x in self.data], headers=["CREATED", "URL", "TITLE", "MERGEABLE"]))
+            click.echo(tabulate([self.get_columns(x) for x in self.data], headers=self.get_headers()))
             click.secho("Count: {}".format(len(self.data)), bold=True)
 
 
-class OrgaPullRequestListQuery(GraphQLQuery):
-    def __init__(self, labels, organization):
+class PullRequestSyncQuery(GraphQLQuery):
+    """
+    Pull requests updated since `high_water`, an `updatedAt` string, most recently updated first
+
+    Open pull requests are kept as rows, others are to be removed from the mirror.
+    """
+
+    def __init__(self, high_water=None):
+        super().__init__(S.PULL_REQUEST_SYNC_STATEMENT, pagination_offset=100)
+        self.high_water = high_water
+        self.new_high_water = high_water
+        self.open_rows = {}
+        self.closed_urls = []
+        self.is_caught_up = False
+
+    def get_mirror_source(self):
+        return "pull_requests"
+
+    def get_pagination_info(self, response):
+        if self.is_caught_up:
+            return {"hasNextPage": False, "endCursor": None}
+        return response["data"]["viewer"]["pullRequests"]["pageInfo"]
+
+    def get_count(self):
+        return len(self.open_rows) + len(self.closed_urls)
+
+    def _handle_response(self, response):
+        today = utc_today()
+        for pr in response["data"]["viewer"]["pullRequests"]["edges"]:
+            updated_at = pr["node"]["updatedAt"]
+            # ISO 8601 UTC strings are ordered as their dates
+            if self.high_water is not None and updated_at < self.high_water:
+                self.is_caught_up = True
+                return
+            if self.new_high_water is None or updated_at > self.new_high_water:
+                self.new_high_water = updated_at
+            url = pr["node"]["url"]
+            if pr["node"]["state"] != "OPEN":
+                self.closed_urls.append(url)
+                continue
+            created = dt_for_str(pr["node"]["createdAt"]).date()
+            title = shorten_str(pr["node"]["title"])
+            created_str = days_ago_str(created, today)
+            self.open_rows[url] = PullRequestRow(created, created_str, url, title, pr["node"]["mergeable"])
+
+
+class OrgaPullRequestShardQuery(GraphQLQuery):
+    """ Open pull requests of an organization created within a range of timestamps """
+
+    def __init__(self, parent, created_from=None, created_to=None, cursor=None, max_pages=None):
+        created = ""
+        if created_from is not None:
+            created = " created:{}..{}".format(str_for_timestamp(created_from), str_for_timestamp(created_to))
         super().__init__(
-            S.ORGA_PULL_REQUEST_LIST_STATEMENT, pagination_offset=10, extra_data={"organization": organization}
+            S.ORGA_PULL_REQUEST_LIST_STATEMENT,
+            pagination_offset=100,
+            extra_data=dict(parent.extra_data, created=created),
+            cursor=cursor,
+            max_pages=max_pages,
         )
-        self.data = []
-        self.labels = labels
+        self.parent = parent
+        self.created_from = created_from
+        self.created_to = created_to
+        self.issue_count = 0
+        self.checkpoint = parent.checkpoint
+        # Rows are handed to the parent, pages are not needed once handled
+        self.keep_responses = False
 
     def get_count(self):
-        return len(self.data)
+        return len(self.parent.rows)
 
     def get_pagination_info(self, response):
         return response["data"]["search"]["pageInfo"]
 
     def _handle_response(self, response):
-        for pr in response["data"]["search"]["edges"]:
-            created = dt_for_str(pr["node"]["createdAt"]).date()
+        self.issue_count = response["data"]["search"]["issueCount"]
+        self.parent.handle_pull_requests(response["data"]["search"]["edges"])
+
+    def split(self):
+        """
+        Return the shards fetching what remains of this one
+
+        A shard matching more pull requests than the search can return is
+        bisected, otherwise it is resumed from its last cursor.
+        """
+        if self.issue_count > SEARCH_LIMIT:
+            created_from = self.created_from
+            created_to = self.created_to
+            if created_from is None:
+                created_from = timestamp_for_str(SEARCH_EPOCH)
+                created_to = self.parent.searched_to
+            if created_from < created_to:
+                middle = (created_from + created_to) // 2
+                return [
+                    OrgaPullRequestShardQuery(self.parent, created_from, middle, max_pages=1),
+                    OrgaPullRequestShardQuery(self.parent, middle + 1, created_to, max_pages=1),
+                ]
+            LOGGER.warning("%d pull requests created at once, only %d listed", self.issue_count, SEARCH_LIMIT)
+        return [OrgaPullRequestShardQuery(self.parent, self.created_from, self.created_to, cursor=self.next_cursor)]
+
+
+class OrgaPullRequestListQuery(GraphQLQuery):
+    def __init__(self, labels, organization, resume=False):
+        super().__init__(
+            S.ORGA_PULL_REQUEST_LIST_STATEMENT,
+            pagination_offset=100,
+            extra_data={
+                "organization": organization,
+                "created": "",
+                "labels": get_label_selection(labels),
+                "label_qualifiers": get_label_qualifiers(labels),
+            },
+        )
+        # Sort by url, then by reversed date:
+        self.rows = RowAccumulator(sort_keys=[(lambda x: x[2], False), (lambda x: x[0], True)])
+        self.labels = labels
+        self.organization = organization
+        self.resume = resume
+        self.searched_to = None
+        self.urls = set()
+
+    def get_count(self):
+        return len(self.rows)
+
+    async def execute_async(self, spinner=None):
+        """
+        Fetch open pull requests, splitting the search by creation date until each part fits in GitHub's search limit
+
+        Shards are fetched concurrently, round after round: the first page of
+        a shard tells whether it must be bisected. Pull requests fetched twice
+        are listed once. Pages are checkpointed until every shard is fetched.
+        """
+        if is_dry_run():
+            self.plan_requests(prepare(self.statement, self.variables, self.extra_data))
+            return
+        self.open_checkpoint(self.resume)
+        # Shards are bisected from the same bounds on resume, so that their pages are found in the checkpoint
+        self.searched_to = self.checkpoint.setdefault("searched_to", utcnow_timestamp())
+        shards = [OrgaPullRequestShardQuery(self, max_pages=1)]
+        while shards:
+            executor = QueryExecutor()
+            for shard in shards:
+                executor.add(shard)
+            await executor.execute_async(spinner)
+            shards = [next_shard for shard in shards if shard.next_cursor is not None for next_shard in shard.split()]
+        self.checkpoint.clear()
+
+    def handle_pull_requests(self, edges):
+        """ Add rows of pull requests not listed yet """
+        today = utc_today()
+        for pr in edges:
             url = pr["node"]["url"]
+            if url in self.urls:
+                continue
+            self.urls.add(url)
+            created = dt_for_str(pr["node"]["createdAt"]).date()
             title = shorten_str(pr["node"]["title"])
-            created_str = days_ago_str(created)
             if self.labels:
                 pr_labels = [x["node"]["name"].lower() for x in pr["node"]["labels"]["edges"]]
                 if not set(self.labels).issubset(set(pr_labels)):
                     continue
-            self.data.append([created, created_str, url, title])
-        # Sort by url, then by reversed date:
-        self.data = sorted(self.data, key=lambda x: x[2])
-        self.data = sorted(self.data, key=lambda x: x[0], reverse=True)
+            created_str = days_ago_str(created, today)
+            self.rows.append(OrgaPullRequestRow(created, created_str, url, title))
+
+    def get_headers(self):
+        return ["CREATED", "URL", "TITLE"]
+
+    def get_columns(self, row):
+        return row[1:]
 
     def print(self):
         if len(self.data) == 0:
             click.secho("Nothing... 😿 Time to push hard 💪", bold=True)
         else:
-            click.echo(tabulate([x[1:] for x in self.data], headers=["CREATED", "URL", "TITLE"]))
+            click.echo(tabulate([self.get_columns(x) for x in self.data], headers=self.get_headers()))
             click.secho("Count: {}".format(len(self.data)), bold=True)
 
 
 class ContributionListQuery:
+    """
+    Pull requests and reviews of a date range of any length
+
+    GitHub limits a contributions collection to one year: the range is split
+    in yearly shards, fetched concurrently. Shards holding more than one page
+    are fetched again as monthly shards so their pages come concurrently too,
+    rather than one after the other.
+    """
+
     def __init__(self, dt_from, dt_to, organization=None):
-        # TODO reengineer this class - create a generic one capable of executing
-        #      queries sequentially
-        self.pr_query = PullRequestContributionListQuery(dt_from, dt_to, organization)
-        self.rv_query = PullRequestReviewContributionListQuery(dt_from, dt_to, organization)
+        self.dt_from = dt_from
+        self.dt_to = dt_to
+        self.organization = organization
+        # Sort by url, then by reversed date:
+        self.rows = RowAccumulator(sort_keys=[(lambda x: (x[1], x[2], x[3]), False), (lambda x: x[0], True)])
 
-    def execute(self):
-        self.pr_query.execute()
-        self.rv_query.execute()
+    @property
+    def data(self):
+        """ Ordered rows of every shard """
+        return self.rows.get_rows()
 
-    def print(self):
-        data = []
-        data.extend(self.pr_query.data)
-        data.extend(self.rv_query.data)
+    def _add_shards(self, executor, query_class, dt_from, dt_to, days):
+        for shard_from, shard_to in split_date_range(dt_from, dt_to, days):
+            # Only shards longer than a month can be split further
+            max_pages = 1 if (shard_to - shard_from).days >= MONTH_SHARD_DAYS else None
+            executor.add(query_class(shard_from, shard_to, self.organization, max_pages=max_pages))
 
-        # Sort by url, then by reversed date:
-        data = sorted(data, key=lambda x: (x[1], x[2], x[3]))
-        data = sorted(data, key=lambda x: x[0], reverse=True)
+    @spin
+    def execute(self, spinner):
+        run(self.execute_async(spinner))
+
+    async def execute_async(self, spinner=None):
+        executor = QueryExecutor()
+        for query_class in (PullRequestContributionListQuery, PullRequestReviewContributionListQuery):
+            self._add_shards(executor, query_class, self.dt_from, self.dt_to, YEAR_SHARD_DAYS)
+        await executor.execute_async(spinner)
+
+        busy_executor = QueryExecutor()
+        for query in executor.queries:
+            if query.next_cursor is None:
+                self.rows.extend(query.data)
+            else:
+                LOGGER.info("Busy shard from %s to %s, splitting it", query.dt_from, query.dt_to)
+                self._add_shards(busy_executor, type(query), query.dt_from, query.dt_to, MONTH_SHARD_DAYS)
+        await busy_executor.execute_async(spinner)
+        self.rows.extend(busy_executor.get_rows())
 
+    def print(self):
+        data = self.data
         if len(data) == 0:
             click.secho("Nothing... 😿 Time to push hard 💪", bold=True)
         else:
@@ -361,15 +741,14 @@ class ContributionListQuery:
 class ContributionStatsQuery(GraphQLQuery):
     def __init__(self):
         super().__init__(S.CONTRIBUTION_STATS_STATEMENT)
-        self.data = []
+        self.rows = RowAccumulator(sort_keys=[(lambda x: x[0], False)])
 
     def _handle_response(self, response):
         for k, v in response["data"]["viewer"]["contributionsCollection"].items():
             # `camelCase` to `Title case`
             key = "".join([" " + x.lower() if x.isupper() else x for x in k])
             key = key[0].upper() + key[1:]
-            self.data.append([key, v])
-        self.data = sorted(self.data, key=lambda x: x[0])
+            self.rows.append(StatRow(key, v))
 
     def tabulate(self):
         return tabulate(self.data, headers=["STAT", "VALUE"])
@@ -379,16 +758,20 @@ class ContributionStatsQuery(GraphQLQuery):
 
 
 class PullRequestContributionListQuery(GraphQLQuery):
-    def __init__(self, dt_from, dt_to, organization=None):
+    def __init__(self, dt_from, dt_to, organization=None, max_pages=None):
         super().__init__(
             S.PULL_REQUEST_CONTRIBUTION_LIST_STATEMENT,
             pagination_offset=100,
             extra_data={"organization": organization, "from": dt_from.isoformat(), "to": dt_to.isoformat()},
+            max_pages=max_pages,
         )
-        self.data = []
+        self.dt_from = dt_from
+        self.dt_to = dt_to
+        # Sort by url, then by reversed date:
+        self.rows = RowAccumulator(sort_keys=[(lambda x: (x[1], x[2], x[3]), False), (lambda x: x[0], True)])
 
     def get_count(self):
-        return len(self.data)
+        return len(self.rows)
 
     def get_pagination_info(self, response):
         return response["data"]["viewer"]["contributionsCollection"]["pullRequestContributions"]["pageInfo"]
@@ -400,11 +783,7 @@ class PullRequestContributionListQuery(GraphQLQuery):
             created = dt_for_str(pr_contribution["node"]["pullRequest"]["createdAt"]).date()
             url = pr_contribution["node"]["pullRequest"]["url"]
             title = shorten_str(pr_contribution["node"]["pullRequest"]["title"])
-            self.data.append([created, url, "OWNER", title])
-
-        # Sort by url, then by reversed date:
-        self.data = sorted(self.data, key=lambda x: (x[1], x[2], x[3]))
-        self.data = sorted(self.data, key=lambda x: x[0], reverse=True)
+            self.rows.append(ContributionRow(created, url, "OWNER", title))
 
     def tabulate(self):
         return tabulate(self.data, headers=["CREATED", "PULL REQUEST", "ROLE", "TITLE"])
@@ -418,16 +797,20 @@ class PullRequestContributionListQuery(GraphQLQuery):
 
 
 class PullRequestReviewContributionListQuery(GraphQLQuery):
-    def __init__(self, dt_from, dt_to, organization=None):
+    def __init__(self, dt_from, dt_to, organization=None, max_pages=None):
         super().__init__(
             S.PULL_REQUEST_REVIEW_CONTRIBUTION_LIST_STATEMENT,
             pagination_offset=100,
             extra_data={"organization": organization, "from": dt_from.isoformat(), "to": dt_to.isoformat()},
+            max_pages=max_pages,
         )
-        self.data = []
+        self.dt_from = dt_from
+        self.dt_to = dt_to
+        # Sort by url, then by reversed date:
+        self.rows = RowAccumulator(sort_keys=[(lambda x: (x[1], x[2], x[3]), False), (lambda x: x[0], True)])
 
     def get_count(self):
-        return len(self.data)
+        return len(self.rows)
 
     def get_pagination_info(self, response):
         return response["data"]["viewer"]["contributionsCollection"]["pullRequestReviewContributions"]["pageInfo"]
@@ -441,11 +824,7 @@ class PullRequestReviewContributionListQuery(GraphQLQuery):
             created = dt_for_str(rv_contribution["node"]["pullRequestReview"]["publishedAt"]).date()
             url = rv_contribution["node"]["pullRequest"]["url"]
             title = shorten_str(rv_contribution["node"]["pullRequest"]["title"])
-            self.data.append([created, url, "REVIEWER", title])
-
-        # Sort by url, then by reversed date:
-        self.data = sorted(self.data, key=lambda x: (x[1], x[2], x[3]))
-        self.data = sorted(self.data, key=lambda x: x[0], reverse=True)
+            self.rows.append(ContributionRow(created, url, "REVIEWER", title))
 
     def tabulate(self):
         return tabulate(self.data, headers=["CREATED", "PULL REQUEST", "ROLE", "TITLE"])
@@ -461,7 +840,7 @@ class PullRequestReviewContributionListQuery(GraphQLQuery):
 class OneDayContributionListQuery(GraphQLQuery):
     def __init__(self, report_dt):
         super().__init__(S.ONE_DAY_CONTRIBUTION_LIST_STATEMENT, [], extra_data={"date": report_dt.isoformat()})
-        self.data = []
+        self.rows = RowAccumulator(sort_keys=[(lambda x: (x[0], x[1], x[2], x[3]), False)])
 
     def _handle_response(self, response):
         pr_contributions = response["data"]["viewer"]["contributionsCollection"]["pullRequestContributions"]["edges"]
@@ -473,15 +852,13 @@ class OneDayContributionListQuery(GraphQLQuery):
             url = pr_contribution["node"]["pullRequest"]["url"]
             title = shorten_str(pr_contribution["node"]["pullRequest"]["title"])
             state = pr_contribution["node"]["pullRequest"]["state"]
-            self.data.append([url, "OWNER", state, title])
+            self.rows.append(OneDayContributionRow(url, "OWNER", state, title))
 
         for rv_contribution in rv_contributions:
             url = rv_contribution["node"]["pullRequest"]["url"]
             title = shorten_str(rv_contribution["node"]["pullRequest"]["title"])
             state = rv_contribution["node"]["pullRequestReview"]["state"]
-            self.data.append([url, "REVIEWER", state, title])
-
-        self.data = sorted(self.data, key=lambda x: (x[0], x[1], x[2], x[3]))
+            self.rows.append(OneDayContributionRow(url, "REVIEWER", state, title))
 
     def tabulate(self):
         return tabulate([x[:-1] for x in self.data], headers=["PULL REQUEST", "ROLE", "STATE"])
@@ -493,39 +870,143 @@ class OneDayContributionListQuery(GraphQLQuery):
         return ["{} ({})".format(x[3], x[1].lower()) for x in self.data]
 
 
+def has_next_page(connection):
+    """
+    Return True if a nested connection has more items than the ones fetched
+    """
+    return connection.get("pageInfo", {}).get("hasNextPage", False)
+
+
+class BranchRefListQuery(GraphQLQuery):
+    """ Remaining branches of a repository """
+
+    def __init__(self, repository_id, repository_url, cursor):
+        super().__init__(
+            S.BRANCH_REF_LIST_STATEMENT,
+            pagination_offset=100,
+            extra_data={"repository_id": repository_id},
+            cursor=cursor,
+        )
+        self.repository_url = repository_url
+        self.branches = []
+
+    def get_pagination_info(self, response):
+        return response["data"]["node"]["refs"]["pageInfo"]
+
+    def get_count(self):
+        return len(self.branches)
+
+    def _handle_response(self, response):
+        self.branches.extend(response["data"]["node"]["refs"]["edges"])
+
+
+class BranchPullRequestListQuery(GraphQLQuery):
+    """ Remaining pull requests associated to a branch """
+
+    def __init__(self, repository_url, branch, pr_list):
+        super().__init__(
+            S.BRANCH_PULL_REQUEST_LIST_STATEMENT,
+            pagination_offset=100,
+            extra_data={"ref_id": branch["id"]},
+            cursor=branch["associatedPullRequests"]["pageInfo"]["endCursor"],
+        )
+        self.repository_url = repository_url
+        self.branch = branch
+        self.pr_list = pr_list
+
+    def get_pagination_info(self, response):
+        return response["data"]["node"]["associatedPullRequests"]["pageInfo"]
+
+    def get_count(self):
+        return len(self.pr_list)
+
+    def _handle_response(self, response):
+        for pr in response["data"]["node"]["associatedPullRequests"]["edges"]:
+            self.pr_list.append(pr["node"]["url"])
+
+
 class BranchListQuery(GraphQLQuery):
-    def __init__(self, emails=None, is_dangling=False):
-        super().__init__(S.BRANCH_LIST_STATEMENT, pagination_offset=10)
-        self.data = []
+    def __init__(self, emails=None, is_dangling=False, resume=False, is_checkpointed=True):
+        super().__init__(S.BRANCH_LIST_STATEMENT, pagination_offset=100)
+        self.rows = RowAccumulator(sort_keys=[(lambda x: (x[0], x[1]), False)])
         self.emails = emails
         self.is_dangling = is_dangling
+        self.resume = resume
+        self.is_checkpointed = is_checkpointed
+        self.continuations = []
 
     def get_pagination_info(self, response):
         return response["data"]["viewer"]["repositoriesContributedTo"]["pageInfo"]
 
     def get_count(self):
-        return len(self.data)
+        return len(self.rows)
+
+    def get_mirror_source(self):
+        return "branches"
+
+    def load_mirror_rows(self, rows):
+        """ Add branches read from the local mirror, where they are stored with their pull requests """
+        for row in rows:
+            if not self.is_dangling:
+                self.rows.append(row)
+            elif not row.pull_requests:
+                self.rows.append(DanglingBranchRow(row.repository, row.branch))
+
+    async def execute_async(self, spinner=None):
+        """
+        Fetch repositories, then branches and pull requests which did not fit in their pages
+
+        Continuations of every repository are fetched concurrently, round after round.
+        Unless `is_checkpointed` is unset, pages are checkpointed until every continuation is fetched.
+        """
+        if self.is_checkpointed and not is_dry_run():
+            self.open_checkpoint(self.resume)
+        await super().execute_async(spinner)
+        while self.continuations:
+            continuations = self.continuations
+            self.continuations = []
+            executor = QueryExecutor()
+            for continuation in continuations:
+                continuation.checkpoint = self.checkpoint
+                executor.add(continuation)
+            await executor.execute_async(spinner)
+            for continuation in continuations:
+                if isinstance(continuation, BranchRefListQuery):
+                    self._handle_branches(continuation.repository_url, continuation.branches)
+                else:
+                    self._handle_branch(continuation.repository_url, continuation.branch, continuation.pr_list)
+        if self.checkpoint is not None:
+            self.checkpoint.clear()
+
+    def _handle_branch(self, repo_url, branch, pr_list):
+        if self.is_dangling and pr_list:
+            return
+        pr_list = sorted(pr_list)
+        if self.is_dangling:
+            self.rows.append(DanglingBranchRow(repo_url, branch["name"]))
+        else:
+            self.rows.append(BranchRow(repo_url, branch["name"], "\n".join(pr_list)))
+
+    def _handle_branches(self, repo_url, branches):
+        for branch in branches:
+            if self.emails is None or branch["node"]["target"]["author"]["email"] not in self.emails:
+                continue
+            pull_requests = branch["node"]["associatedPullRequests"]
+            pr_list = [pr["node"]["url"] for pr in pull_requests["edges"]]
+            if has_next_page(pull_requests) and not (self.is_dangling and pr_list):
+                self.continuations.append(BranchPullRequestListQuery(repo_url, branch["node"], pr_list))
+            else:
+                self._handle_branch(repo_url, branch["node"], pr_list)
 
     def _handle_response(self, response):
         for repo in response["data"]["viewer"]["repositoriesContributedTo"]["edges"]:
             repo_url = repo["node"]["url"]
-            for branch in repo["node"]["refs"]["edges"]:
-                branch_name = branch["node"]["name"]
-                author_email = branch["node"]["target"]["author"]["email"]
-                pr_list = []
-                for pr in branch["node"]["associatedPullRequests"]["edges"]:
-                    pr_list.append(pr["node"]["url"])
-                if self.is_dangling and pr_list:
-                    continue
-                pr_list = sorted(pr_list)
-                if self.emails is not None:
-                    if author_email in self.emails:
-                        if self.is_dangling:
-                            self.data.append([repo_url, branch_name])
-                        else:
-                            self.data.append([repo_url, branch_name, "\n".join(pr_list)])
-
-        self.data = sorted(self.data, key=lambda x: (x[0], x[1]))
+            refs = repo["node"]["refs"]
+            self._handle_branches(repo_url, refs["edges"])
+            if has_next_page(refs):
+                self.continuations.append(
+                    BranchRefListQuery(repo["node"]["id"], repo_url, refs["pageInfo"]["endCursor"])
+                )
 
     def print(self):
         no_results_message = "Nothing... 😿 Time to push hard 💪"
@@ -1,28 +1,223 @@
+import asyncio
+import random
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from time import sleep, time
+
 import requests
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ChunkedEncodingError, ConnectTimeout
 
 import click
 from requests_toolbelt.utils import dump
 
 from yogit.yogit.logger import LOGGER
+from yogit.yogit.settings import Settings
+
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+_SESSION = None
+_EXECUTOR = None
 
 
-def http_call(method, url, **kwargs):
+def create_session(pool_connections, pool_maxsize):
     """
-    Perform HTTP call
+    Create a keep-alive HTTP session
 
-    - Check status code
-    - Check JSON validity
-    - Return reponse content as a dict
+    - `pool_connections`: number of per-host connection pools kept alive
+    - `pool_maxsize`: maximum number of connections kept alive per host
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_session():
+    """
+    Return the HTTP session shared by every yogit client
+
+    Connections are pooled so consecutive calls to the same host reuse
+    the same TCP/TLS connection.
+    """
+    global _SESSION  # pylint: disable=global-statement
+    if _SESSION is None:
+        settings = Settings()
+        _SESSION = create_session(settings.get_http_pool_connections(), settings.get_http_pool_maxsize())
+    return _SESSION
+
+
+def get_executor():
+    """
+    Return the worker pool performing HTTP calls on behalf of coroutines
+
+    It is as large as the per-host connection pool, so concurrent calls
+    never wait for a connection.
+    """
+    global _EXECUTOR  # pylint: disable=global-statement
+    if _EXECUTOR is None:
+        _EXECUTOR = ThreadPoolExecutor(max_workers=Settings().get_http_pool_maxsize())
+    return _EXECUTOR
+
+
+async def async_http_call(method, url, **kwargs):
+    """
+    Perform HTTP call without blocking the event loop
+
+    Same checks and result as `http_call`
+    """
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(get_executor(), partial(http_call, method, url, **kwargs))
+
+
+async def async_http_send(method, url, **kwargs):
+    """
+    Perform HTTP call without blocking the event loop
+
+    Same result as `http_send`
     """
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(get_executor(), partial(http_send, method, url, **kwargs))
+
+
+def _is_rate_limited(response):
+    """
+    Return True if the response is a primary or secondary rate limit rejection
+    """
+    if response.status_code == 429:
+        return True
+    return response.status_code == 403 and (
+        "Retry-After" in response.headers or response.headers.get("X-RateLimit-Remaining") == "0"
+    )
+
+
+def _get_server_delay(response):
+    """
+    Return seconds the server asks to wait before retrying, None if it does not tell
+    """
+    retry_after = response.headers.get("Retry-After")
+    if retry_after is not None and retry_after.isdigit():
+        return float(retry_after)
+    reset = response.headers.get("X-RateLimit-Reset")
+    if response.headers.get("X-RateLimit-Remaining") == "0" and reset is not None and reset.isdigit():
+        return max(0.0, int(reset) - time()) + 1
+    return None
+
+
+class TransientHTTPError(click.ClickException):
+    """
+    HTTP call failed on a transient error (connection error, 5xx, rate limit) despite retries
+
+    `retried` is unset when the retry policy left the failure to the caller.
+    """
+
+    def __init__(self, message, retried=True):
+        super().__init__(message)
+        self.retried = retried
+
+
+class RetryPolicy:
+    """
+    Retry policy of HTTP calls
+
+    Transient failures are retried with exponential backoff and full jitter,
+    unless the server tells how long to wait (`Retry-After`, `X-RateLimit-Reset`).
+    Requests which are not idempotent are only retried when the server surely
+    did not process them. Without `retry_errors`, only rate limit rejections
+    are retried: the caller handles other failures itself.
+    """
+
+    def __init__(
+        self, idempotent=True, max_attempts=5, backoff_factor=1.0, max_backoff=60, max_wait=600, retry_errors=True
+    ):
+        self.idempotent = idempotent
+        self.max_attempts = max_attempts
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.max_wait = max_wait
+        self.retry_errors = retry_errors
+
+    def is_transient(self, response=None, exception=None):
+        """
+        Return True if the failure may not happen again
+        """
+        if exception is not None:
+            return isinstance(exception, (requests.ConnectionError, requests.Timeout, ChunkedEncodingError))
+        return response.status_code in RETRY_STATUS_CODES or _is_rate_limited(response)
+
+    def _is_unprocessed(self, response=None, exception=None):
+        if exception is not None:
+            return isinstance(exception, ConnectTimeout)
+        return _is_rate_limited(response)
+
+    def get_retry_delay(self, attempt, response=None, exception=None):
+        """
+        Return seconds to wait before retrying the `attempt`-th call (0-based), None if it must not be retried
+        """
+        if attempt + 1 >= self.max_attempts or not self.is_transient(response, exception):
+            return None
+        if not self.retry_errors and (response is None or not _is_rate_limited(response)):
+            return None
+        if not self.idempotent and not self._is_unprocessed(response, exception):
+            return None
+        delay = _get_server_delay(response) if response is not None else None
+        if delay is None:
+            delay = random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+        if delay > self.max_wait:
+            return None
+        return delay
+
+
+def _send(method, url, **kwargs):
     try:
-        response = requests.request(method, url, **kwargs)
+        response = get_session().request(method, url, **kwargs)
         if response:
             LOGGER.info("Response: %s", response.status_code)
         else:
             LOGGER.info("Response: %s", dump.dump_all(response).decode("utf-8"))
     except requests.RequestException as exception:
         LOGGER.error(str(exception))
+        return None, exception
+    return response, None
+
+
+def http_send(method, url, retry_policy=None, **kwargs):
+    """
+    Perform HTTP call, retrying transient failures according to `retry_policy`
+
+    Return the response whatever its status code, raise if no response was received.
+    """
+    policy = retry_policy or RetryPolicy()
+    attempt = 0
+    while True:
+        response, exception = _send(method, url, **kwargs)
+        if exception is None and response.status_code in (200, 304):
+            return response
+        delay = policy.get_retry_delay(attempt, response, exception)
+        if delay is None:
+            break
+        attempt += 1
+        LOGGER.warning(
+            "Retrying %s %s in %.1fs (attempt %d/%d)", method.upper(), url, delay, attempt + 1, policy.max_attempts
+        )
+        sleep(delay)
+
+    if exception is not None:
+        if policy.is_transient(exception=exception):
+            raise TransientHTTPError(str(exception), retried=policy.retry_errors)
         raise click.ClickException(str(exception))
+    return response
+
+
+def check_response(response, retry_policy=None):
+    """
+    Check status code and JSON validity, return reponse content as a dict
+    """
+    policy = retry_policy or RetryPolicy()
+    error_class = click.ClickException
+    if policy.is_transient(response):
+        error_class = partial(TransientHTTPError, retried=policy.retry_errors or _is_rate_limited(response))
 
     LOGGER.debug(response.content[:500])
     if response.status_code == 200:
@@ -36,6 +231,19 @@ def http_call(method, url, **kwargs):
     elif response.status_code == 401:
         raise click.ClickException("Unauthorized")
     elif response.status_code == 500:
-        raise click.ClickException("Internal server error")
+        raise error_class("Internal server error")
     else:
-        raise click.ClickException(response.text)
+        raise error_class(response.text)
+
+
+def http_call(method, url, retry_policy=None, **kwargs):
+    """
+    Perform HTTP call
+
+    - Retry transient failures according to `retry_policy`
+    - Check status code
+    - Check JSON validity
+    - Return reponse content as a dict
+    """
+    response = http_send(method, url, retry_policy=retry_policy, **kwargs)
+    return check_response(response, retry_policy)
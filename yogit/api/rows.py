@@ -0,0 +1,18 @@
+"""
+Rows produced by yogit queries
+
+Rows are named tuples: they can be read by field name as well as by index.
+"""
+from collections import namedtuple
+
+ReviewRequestedRow = namedtuple("ReviewRequestedRow", ["updated", "updated_str", "url", "title"])
+ReviewRow = namedtuple("ReviewRow", ["updated", "updated_str", "url", "state"])
+OrganizationRow = namedtuple("OrganizationRow", ["login", "url"])
+MemberRow = namedtuple("MemberRow", ["login", "email", "location", "role"])
+PullRequestRow = namedtuple("PullRequestRow", ["created", "created_str", "url", "title", "mergeable"])
+OrgaPullRequestRow = namedtuple("OrgaPullRequestRow", ["created", "created_str", "url", "title"])
+StatRow = namedtuple("StatRow", ["stat", "value"])
+ContributionRow = namedtuple("ContributionRow", ["created", "url", "role", "title"])
+OneDayContributionRow = namedtuple("OneDayContributionRow", ["url", "role", "state", "title"])
+BranchRow = namedtuple("BranchRow", ["repository", "branch", "pull_requests"])
+DanglingBranchRow = namedtuple("DanglingBranchRow", ["repository", "branch"])
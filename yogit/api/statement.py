@@ -7,6 +7,8 @@ from yogit.yogit.settings import Settings
 import yogit.api.statements as S
 from yogit.utils.dateutils import today_earliest_str
 
+RATE_LIMIT_SELECTION = "rateLimit { limit cost remaining resetAt }"
+
 
 def prepare(statement, variables, extra_data={}):
     """
@@ -26,3 +28,24 @@ def prepare_pagination(statement, offset, cursor=None):
     template = Template(statement)
     data = {"offset": offset, "after": 'after: "{}"'.format(cursor) if cursor is not None else ""}
     return template.safe_substitute(data)
+
+
+def is_mutation(statement):
+    """
+    Return True if the statement is a GraphQL mutation, which must not be replayed
+    """
+    return isinstance(statement, str) and statement.lstrip().startswith("mutation")
+
+
+def with_rate_limit(statement):
+    """
+    Add rate limit budget to the selection of a GraphQL query
+
+    Mutations and statements already selecting it are left untouched.
+    """
+    if not isinstance(statement, str) or is_mutation(statement) or "rateLimit" in statement:
+        return statement
+    index = statement.find("{")
+    if index == -1:
+        return statement
+    return statement[: index + 1] + "\n    " + RATE_LIMIT_SELECTION + statement[index + 1 :]
@@ -120,6 +120,10 @@ RATE_LIMIT_STATEMENT = """
 """
 
 
+# Selected in `$labels` of pull request statements when filtering by label
+PULL_REQUEST_LABELS_SELECTION = "labels(first: 100) { edges { node { name } } }"
+
+
 PULL_REQUEST_LIST_STATEMENT = """
 {
     viewer {
@@ -130,13 +134,30 @@ PULL_REQUEST_LIST_STATEMENT = """
                     url
                     title
                     mergeable
-                    labels(first: 100) {
-                        edges {
-                            node {
-                                name
-                            }
-                        }
-                    }
+                    $labels
+                }
+            }
+        }
+    }
+}
+"""
+
+PULL_REQUEST_SYNC_STATEMENT = """
+{
+    viewer {
+        pullRequests(first: $offset $after, orderBy: {field: UPDATED_AT, direction: DESC}) {
+            pageInfo {
+                hasNextPage
+                endCursor
+            }
+            edges {
+                node {
+                    createdAt
+                    updatedAt
+                    state
+                    url
+                    title
+                    mergeable
                 }
             }
         }
@@ -146,7 +167,11 @@ PULL_REQUEST_LIST_STATEMENT = """
 
 ORGA_PULL_REQUEST_LIST_STATEMENT = """
 {
-    search(query: "is:open is:pr archived:false user:$organization", type: ISSUE, first: $offset $after) {
+    search(
+        query: "is:open is:pr archived:false user:$organization$created$label_qualifiers", type: ISSUE,
+        first: $offset $after
+    ) {
+        issueCount
         pageInfo {
             hasNextPage
             endCursor
@@ -161,13 +186,7 @@ ORGA_PULL_REQUEST_LIST_STATEMENT = """
                     number
                     url
                     title
-                    labels(first: 100) {
-                        edges {
-                            node {
-                                name
-                            }
-                        }
-                    }
+                    $labels
                 }
             }
         }
@@ -290,11 +309,21 @@ BRANCH_LIST_STATEMENT = """
             },
             edges {
                 node {
+                    id
                     url
                     refs(first: 100, refPrefix: "refs/heads/") {
+                        pageInfo {
+                            hasNextPage
+                            endCursor
+                        }
                         edges {
                             node {
+                                id
                                 associatedPullRequests(first: 10) {
+                                    pageInfo {
+                                        hasNextPage
+                                        endCursor
+                                    }
                                     edges {
                                         node {
                                             url
@@ -320,3 +349,64 @@ BRANCH_LIST_STATEMENT = """
     }
 }
 """
+
+BRANCH_REF_LIST_STATEMENT = """
+{
+    node(id: "$repository_id") {
+        ... on Repository {
+            refs(first: $offset $after refPrefix: "refs/heads/") {
+                pageInfo {
+                    hasNextPage
+                    endCursor
+                }
+                edges {
+                    node {
+                        id
+                        associatedPullRequests(first: 10) {
+                            pageInfo {
+                                hasNextPage
+                                endCursor
+                            }
+                            edges {
+                                node {
+                                    url
+                                    headRefName
+                                }
+                            }
+                        }
+                        name
+                        target {
+                            ... on Commit {
+                                author {
+                                    email
+                                    name
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+}
+"""
+
+BRANCH_PULL_REQUEST_LIST_STATEMENT = """
+{
+    node(id: "$ref_id") {
+        ... on Ref {
+            associatedPullRequests(first: $offset $after) {
+                pageInfo {
+                    hasNextPage
+                    endCursor
+                }
+                edges {
+                    node {
+                        url
+                    }
+                }
+            }
+        }
+    }
+}
+"""
@@ -0,0 +1,45 @@
+"""
+Validators (ETag, Last-Modified) of REST responses
+
+They are sent back as `If-None-Match` / `If-Modified-Since` so GitHub can
+answer `304 Not Modified`, in which case the body is served from this store.
+"""
+from yogit.storage.storage import load_json, save_json
+from yogit.yogit.paths import get_validators_path
+
+
+class ValidatorStore:
+    """ Validators and bodies of REST responses, per URL """
+
+    def __init__(self):
+        self.filename = get_validators_path()
+
+    def get(self, url):
+        """
+        Return stored entry of `url` or None
+        """
+        return load_json(self.filename).get(url)
+
+    def put(self, url, etag, last_modified, body):
+        """
+        Store validators and body of `url`, nothing is stored without validator
+        """
+        if etag is None and last_modified is None:
+            return
+        data = load_json(self.filename)
+        data[url] = {"etag": etag, "last_modified": last_modified, "body": body}
+        save_json(self.filename, data)
+
+
+def get_conditional_headers(entry):
+    """
+    Return headers making a request conditional to stored `entry`
+    """
+    headers = {}
+    if entry is None:
+        return headers
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
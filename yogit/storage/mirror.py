@@ -0,0 +1,133 @@
+"""
+yogit local mirror
+
+Rows of list queries are stored in SQLite by `yogit sync`, so commands can
+answer without reaching GitHub. Each GitHub login has its own database.
+"""
+import json
+import os
+import sqlite3
+from datetime import datetime
+from time import time
+
+import yogit.api.rows as R
+from yogit.utils.dateutils import days_ago_str, utc_today
+from yogit.yogit.paths import get_mirror_path
+from yogit.yogit.settings import Settings
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rows (
+    source TEXT NOT NULL,
+    key TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (source, key)
+);
+CREATE TABLE IF NOT EXISTS syncs (
+    source TEXT PRIMARY KEY,
+    synced_at REAL NOT NULL,
+    high_water TEXT
+);
+"""
+
+# Fields holding a date, and the fields displaying how old they are
+DATE_FIELDS = {"created": "created_str", "updated": "updated_str"}
+
+
+def encode_row(row):
+    """
+    Return JSON string of a row, along with its type
+    """
+    fields = [x.isoformat() if hasattr(x, "isoformat") else x for x in row]
+    return json.dumps([type(row).__name__] + fields)
+
+
+def decode_row(data, today=None):
+    """
+    Return row of a JSON string, relative dates being computed again
+    """
+    values = json.loads(data)
+    row = getattr(R, values[0])(*values[1:])
+    for field, str_field in DATE_FIELDS.items():
+        if field in row._fields:
+            dte = datetime.strptime(getattr(row, field), "%Y-%m-%d").date()
+            row = row._replace(**{field: dte})
+            if str_field in row._fields:
+                row = row._replace(**{str_field: days_ago_str(dte, today)})
+    return row
+
+
+class Mirror:
+    """ Rows of queries, per source, stored in SQLite """
+
+    def __init__(self, path=None):
+        self.path = path or get_mirror_path(Settings().get_github_login())
+        self.connection = None
+
+    def _connect(self):
+        if self.connection is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.connection = sqlite3.connect(self.path)
+            self.connection.executescript(SCHEMA)
+        return self.connection
+
+    def close(self):
+        """ Close database """
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def get_sync(self, source):
+        """
+        Return time and high-water mark of the last sync of `source`, None if never synced
+        """
+        return self._connect().execute("SELECT synced_at, high_water FROM syncs WHERE source = ?", (source,)).fetchone()
+
+    def _set_sync(self, connection, source, high_water):
+        connection.execute(
+            "INSERT OR REPLACE INTO syncs (source, synced_at, high_water) VALUES (?, ?, ?)",
+            (source, time(), high_water),
+        )
+
+    def replace(self, source, rows):
+        """
+        Replace rows of `source`
+        """
+        connection = self._connect()
+        with connection:
+            connection.execute("DELETE FROM rows WHERE source = ?", (source,))
+            connection.executemany(
+                "INSERT INTO rows (source, key, data) VALUES (?, ?, ?)",
+                [(source, str(index), encode_row(row)) for index, row in enumerate(rows)],
+            )
+            self._set_sync(connection, source, None)
+
+    def update(self, source, rows, deleted_keys, high_water):
+        """
+        Insert or replace rows of `source` by key, delete the `deleted_keys` ones
+
+        `rows` maps keys to rows.
+        """
+        connection = self._connect()
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO rows (source, key, data) VALUES (?, ?, ?)",
+                [(source, key, encode_row(row)) for key, row in rows.items()],
+            )
+            connection.executemany(
+                "DELETE FROM rows WHERE source = ? AND key = ?", [(source, key) for key in deleted_keys]
+            )
+            self._set_sync(connection, source, high_water)
+
+    def count(self, source):
+        """
+        Return number of rows of `source`
+        """
+        return self._connect().execute("SELECT COUNT(*) FROM rows WHERE source = ?", (source,)).fetchone()[0]
+
+    def load(self, source):
+        """
+        Return rows of `source`
+        """
+        cursor = self._connect().execute("SELECT data FROM rows WHERE source = ?", (source,))
+        today = utc_today()
+        return [decode_row(data, today) for data, in cursor]
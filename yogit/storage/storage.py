@@ -1,14 +1,119 @@
 """
 yogit storage
+
+Parsed files are kept per process and parsed again only once they changed
+on disk, according to their modification time and size. Across processes,
+parsed data is kept in a JSON sidecar file, so YAML (imported lazily) is
+only parsed once the file was edited.
+
+Files are replaced atomically, readers never see a partial file and never
+wait. Read-modify-write cycles hold an advisory lock.
 """
 
+import copy
+import json
 import os
-import yaml
+import tempfile
+from contextlib import contextmanager
 
 import click
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
 from yogit.yogit.logger import LOGGER
 
+# Parsed data per filename, along with the stat key it was read at
+_SNAPSHOTS = {}
+
+
+def _get_stat_key(filename):
+    stat = os.stat(filename)
+    return [stat.st_ino, stat.st_mtime_ns, stat.st_size]
+
+
+def get_sidecar_path(filename):
+    """ Get path of the parsed data of `filename` """
+    return filename + ".json"
+
+
+@contextmanager
+def atomic_open(filename, mode="w"):
+    """
+    Open a temporary file, moved over `filename` once the block succeeded
+    """
+    directory, name = os.path.split(filename)
+    handle, tmp_path = tempfile.mkstemp(dir=directory or ".", prefix=name + ".", suffix=".tmp")
+    try:
+        with os.fdopen(handle, mode) as tmp_file:
+            yield tmp_file
+        os.replace(tmp_path, filename)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+@contextmanager
+def file_lock(filename):
+    """
+    Hold an exclusive advisory lock on `filename` for the block, across processes
+    """
+    with open(filename + ".lock", "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+def load_json(filename):
+    """
+    Return data of a JSON file, an empty dict if it cannot be read
+    """
+    try:
+        with open(filename, "r") as json_file:
+            return json.load(json_file)
+    except OSError:
+        return {}
+    except ValueError as error:
+        LOGGER.error("Cannot parse `%s`: %s", filename, str(error))
+        return {}
+
+
+def save_json(filename, data):
+    """
+    Replace a JSON file with `data`, errors are logged
+    """
+    try:
+        with atomic_open(filename) as json_file:
+            json.dump(data, json_file)
+    except OSError as error:
+        LOGGER.error(str(error))
+
+
+def _parse_yaml(yaml_file):
+    import yaml
+
+    # libyaml bindings are much faster, when available
+    return yaml.load(yaml_file, Loader=getattr(yaml, "CFullLoader", yaml.FullLoader))
+
+
+def _dump_yaml(data, yaml_file):
+    import yaml
+
+    yaml.dump(data, stream=yaml_file, Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper), indent=4)
+
 
 class Storage:
     """ Storage based on YAML file """
@@ -23,12 +128,40 @@ class Storage:
         """
         return self.filename
 
-    def load(self):
-        """ Load YAML """
+    def _load_sidecar(self, stat_key):
         try:
-            with open(self.filename, "r") as yaml_file:
-                return yaml.load(yaml_file, Loader=yaml.FullLoader) or {}
+            with open(get_sidecar_path(self.filename), "r") as json_file:
+                sidecar = json.load(json_file)
+        except (OSError, ValueError):
+            return None
+        if sidecar.get("stat") != stat_key:
+            return None
+        return sidecar.get("data")
+
+    def _save_sidecar(self, stat_key, data):
+        try:
+            with atomic_open(get_sidecar_path(self.filename)) as json_file:
+                json.dump({"stat": stat_key, "data": data}, json_file)
+        except (OSError, TypeError, ValueError) as error:
+            # Data YAML can hold but JSON cannot is parsed from YAML every time
+            LOGGER.info("No sidecar for `%s`: %s", self.filename, str(error))
+
+    def load(self, fresh=False):
+        """ Load YAML, parsed again only if the file changed since last load or if `fresh` """
+        try:
+            stat_key = _get_stat_key(self.filename)
+            snapshot = _SNAPSHOTS.get(self.filename)
+            if fresh or snapshot is None or snapshot[0] != stat_key:
+                data = None if fresh else self._load_sidecar(stat_key)
+                if data is None:
+                    with open(self.filename, "r") as yaml_file:
+                        data = _parse_yaml(yaml_file) or {}
+                    self._save_sidecar(stat_key, data)
+                snapshot = (stat_key, data)
+                _SNAPSHOTS[self.filename] = snapshot
+            return copy.deepcopy(snapshot[1])
         except OSError as error:
+            _SNAPSHOTS.pop(self.filename, None)
             LOGGER.error(str(error))
             return {}
         except Exception as error:
@@ -36,10 +169,26 @@ class Storage:
             LOGGER.error(str(error))
 
     def save(self, data):
-        with open(self.filename, "w") as yaml_file:
+        with atomic_open(self.filename) as yaml_file:
             if data is not None and self.version is not None:
                 data["version"] = self.version
-            yaml.safe_dump(data, stream=yaml_file, indent=4)
+            _dump_yaml(data, yaml_file)
+        stat_key = _get_stat_key(self.filename)
+        _SNAPSHOTS[self.filename] = (stat_key, copy.deepcopy(data) or {})
+        self._save_sidecar(stat_key, data or {})
+
+    @contextmanager
+    def edit(self):
+        """
+        Yield loaded data to be modified, save it once the block succeeded
+
+        Other processes editing the file wait for the block to end.
+        """
+        with file_lock(self.filename):
+            # Timestamps may be too coarse to tell the last write apart
+            data = self.load(fresh=True)
+            yield data
+            self.save(data)
 
     def get_version(self):
         data = self.load()
@@ -15,3 +15,25 @@ def disable_update_check():
     with patch("yogit.yogit.checks._check_update"):
         print("Disable update check")
         yield
+
+
+@pytest.fixture(scope="session", autouse=True)
+def disable_retry_delay():
+    with patch("yogit.api.requester.sleep"):
+        print("Disable retry delay")
+        yield
+
+
+@pytest.fixture(scope="session", autouse=True)
+def disable_response_cache():
+    with patch("yogit.yogit.caching.set_cache_policy"):
+        print("Disable response cache")
+        yield
+
+
+@pytest.fixture(scope="function", autouse=True)
+def temporary_yogit_dir(tmp_path):
+    with patch("yogit.yogit.paths.SETTINGS_DIR", str(tmp_path)), patch("yogit.api.client._PACER", None), patch(
+        "yogit.api.cache._CACHE", None
+    ):
+        yield
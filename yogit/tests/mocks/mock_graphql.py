@@ -0,0 +1,64 @@
+import json
+import re
+import threading
+
+import responses
+
+from yogit.api.batch import get_fields, get_selection
+from yogit.api.client import GITHUB_API_URL_V4
+
+BATCH_ALIAS = re.compile(r"\bq\d+_\w+:")
+
+
+class GraphQLRouter:
+    """
+    Serve GraphQL responses according to the content of the query
+
+    Queries executed concurrently reach the mock in any order, so responses
+    are routed by a pattern found in the query rather than by registration order.
+    Like `responses`, the last response of a route is served again and again.
+    Batched documents are split and each statement is routed on its own.
+    """
+
+    def __init__(self):
+        self.routes = []
+        self.lock = threading.Lock()
+        responses.add_callback(responses.POST, GITHUB_API_URL_V4, callback=self._callback)
+
+    def add(self, pattern, json_body, status=200):
+        """ Serve `json_body` to the next query containing `pattern`, or every pattern of a tuple """
+        patterns = pattern if isinstance(pattern, tuple) else (pattern,)
+        self.routes.append((patterns, status, json_body))
+
+    def _pop(self, query):
+        with self.lock:
+            matches = [route for route in self.routes if all(pattern in query for pattern in route[0])]
+            if not matches:
+                return 404, {"message": "No route for query"}
+            if len(matches) > 1:
+                self.routes.remove(matches[0])
+            return matches[0][1], matches[0][2]
+
+    def _route_batch(self, query):
+        statements = {}
+        for alias, _, text in get_fields(get_selection(query)):
+            if alias is not None:
+                index, key = alias.split("_", 1)
+                statements.setdefault(index, {})[alias] = (key, text)
+        data = {}
+        for fields in statements.values():
+            status, json_body = self._pop("{ " + " ".join(text for _, text in fields.values()) + " }")
+            if status != 200:
+                return status, json_body
+            for alias, (key, _) in fields.items():
+                data[alias] = json_body["data"][key]
+        return 200, {"data": data}
+
+    def _callback(self, request):
+        body = request.body.decode("utf-8") if isinstance(request.body, bytes) else request.body
+        query = json.loads(body)["query"]
+        if BATCH_ALIAS.search(query):
+            status, json_body = self._route_batch(query)
+        else:
+            status, json_body = self._pop(query)
+        return status, {}, json.dumps(json_body)
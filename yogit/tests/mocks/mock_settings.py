@@ -5,6 +5,7 @@ from unittest.mock import patch
 
 import pytest
 
+from yogit.storage.storage import get_sidecar_path
 from yogit.yogit.settings import Settings
 
 
@@ -23,6 +24,9 @@ def named_temporary_file(*args, **kwds):
     finally:
         tmpfile.close()
         os.unlink(tmpfile.name)
+        for path in [get_sidecar_path(tmpfile.name), tmpfile.name + ".lock"]:
+            if os.path.exists(path):
+                os.unlink(path)
 
 
 @pytest.fixture(scope="function")
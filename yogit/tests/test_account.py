@@ -1,4 +1,4 @@
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 import responses
 import pytest
 from click.testing import CliRunner
@@ -7,7 +7,7 @@ from yogit.yogit import cli
 from yogit.yogit.settings import Settings
 from yogit.yogit.errors import ExitCode
 from yogit.yogit.account import get_welcome_text, get_github_text, get_slack_text
-from yogit.api.client import GITHUB_API_URL_V4, GITHUB_API_URL_V3
+from yogit.api.client import GITHUB_API_URL_V4, GITHUB_API_URL_V3, get_pacer
 from yogit.yogit.slack import SLACK_API_URL, SLACK_AUTH_CHECK_ENDPOINT, SLACK_CHANNEL_LIST_ENDPOINT
 from yogit.tests.mocks.mock_settings import temporary_settings, mock_settings, assert_empty_settings
 
@@ -102,3 +102,22 @@ def test_ratelimit_ok(runner):
     result = runner.invoke(cli.main, ["account", "usage"])
     assert result.exit_code == ExitCode.NO_ERROR.value
     assert result.output == "GitHub usage: 4000/5000 until 2019-07-11T23:39:39Z\n"
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+@patch("yogit.api.client.time", return_value=1562880000)
+def test_ratelimit_last_known(mock_time, runner):
+    get_pacer().update("graphql", 5000, 3000, 1562888379)
+    result = runner.invoke(cli.main, ["account", "usage"])
+    assert result.exit_code == ExitCode.NO_ERROR.value
+    assert result.output == "GitHub usage: 3000/5000 until 2019-07-11T23:39:39Z\n"
+    assert len(responses.calls) == 0
+
+    _add_graphql_response(
+        200, {"data": {"rateLimit": {"limit": 5000, "cost": 1, "remaining": 2999, "resetAt": "2019-07-11T23:39:39Z"}}}
+    )
+    result = runner.invoke(cli.main, ["account", "usage", "--refresh"])
+    assert result.exit_code == ExitCode.NO_ERROR.value
+    assert result.output == "GitHub usage: 2999/5000 until 2019-07-11T23:39:39Z\n"
+    assert len(responses.calls) == 1
@@ -0,0 +1,27 @@
+from yogit.utils.accumulator import RowAccumulator
+
+
+def test_rows_are_ordered_once_read():
+    rows = RowAccumulator(sort_keys=[(lambda x: x[1], False), (lambda x: x[0], True)])
+    rows.extend([[1, "b"], [2, "c"]])
+    rows.append([1, "a"])
+    assert len(rows) == 3
+    assert rows.get_rows() == [[2, "c"], [1, "a"], [1, "b"]]
+    rows.append([3, "z"])
+    assert rows.get_rows() == [[3, "z"], [2, "c"], [1, "a"], [1, "b"]]
+
+
+def test_rows_only_streamed():
+    rows = RowAccumulator()
+    streamed = []
+    rows.subscribe(streamed.append, keep_rows=False)
+    rows.extend([[2], [1]])
+    assert streamed == [[2], [1]]
+    assert rows.get_rows() == []
+    assert len(rows) == 2
+
+
+def test_rows_without_order():
+    rows = RowAccumulator()
+    rows.extend([[2], [1]])
+    assert rows.get_rows() == [[2], [1]]
@@ -0,0 +1,111 @@
+import asyncio
+import json
+
+import pytest
+import responses
+
+import yogit.api.statements as S
+from yogit.api.batch import BatchClient, get_fields, get_selection, merge, split
+from yogit.api.client import GITHUB_API_URL_V4
+from yogit.api.engine import run, gather
+from yogit.api.executor import QueryExecutor
+from yogit.api.queries import LoginQuery, RateLimitQuery
+from yogit.tests.mocks.mock_settings import mock_settings
+
+
+def test_get_fields():
+    selection = get_selection('query { a: viewer(x: "y {") { login } rateLimit { limit }, search(first: 10) { n } }')
+    assert get_fields(selection) == [
+        ("a", "viewer", 'viewer(x: "y {") { login }'),
+        (None, "rateLimit", "rateLimit { limit },"),
+        (None, "search", "search(first: 10) { n }"),
+    ]
+
+
+def test_merge_and_split():
+    document, aliases = merge([S.LOGIN_STATEMENT, "{ a: viewer { name } rateLimit { limit } }"])
+    assert aliases == [{"q0_viewer": "viewer"}, {"q1_a": "a", "q1_rateLimit": "rateLimit"}]
+    assert [x[0] for x in get_fields(get_selection(document))] == [None, "q0_viewer", "q1_a", "q1_rateLimit"]
+
+    response = {
+        "data": {"rateLimit": {}, "q0_viewer": {"login": "l"}, "q1_a": None, "q1_rateLimit": {"limit": 1}},
+        "errors": [{"message": "m", "path": ["q1_a", "name"]}],
+    }
+    assert split(response, aliases[0]) == {"data": {"viewer": {"login": "l"}}}
+    assert split(response, aliases[1]) == {
+        "data": {"a": None, "rateLimit": {"limit": 1}},
+        "errors": [{"message": "m", "path": ["a", "name"]}],
+    }
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+def test_concurrent_queries_share_one_request():
+    responses.add(
+        responses.POST,
+        GITHUB_API_URL_V4,
+        json={
+            "data": {
+                "rateLimit": {"limit": 5000, "cost": 1, "remaining": 4999, "resetAt": "2019-07-11T23:39:39Z"},
+                "q0_viewer": {"login": "user1"},
+                "q1_rateLimit": {"limit": 5000, "cost": 1, "remaining": 4999, "resetAt": "2019-07-11T23:39:39Z"},
+            }
+        },
+    )
+    executor = QueryExecutor()
+    login_query = executor.add(LoginQuery())
+    rate_limit_query = executor.add(RateLimitQuery())
+    executor.execute()
+
+    assert len(responses.calls) == 1
+    assert login_query.get_login() == "user1"
+    assert rate_limit_query.remaining == 4999
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+def test_batch_error_reaches_every_statement():
+    responses.add(responses.POST, GITHUB_API_URL_V4, json={}, status=401)
+    client = BatchClient()
+
+    async def get_both():
+        coroutines = [client.get_async(S.LOGIN_STATEMENT), client.get_async(S.RATE_LIMIT_STATEMENT)]
+        return await asyncio.gather(*coroutines, return_exceptions=True)
+
+    results = run(get_both())
+    assert [str(x) for x in results] == ["Unauthorized", "Unauthorized"]
+    assert len(responses.calls) == 1
+
+
+def test_split_document_error():
+    response = {"data": None, "errors": [{"message": "Something went wrong"}]}
+    assert split(response, {"q0_viewer": "viewer"}) == {
+        "data": {"viewer": None},
+        "errors": [{"message": "Something went wrong"}],
+    }
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+def test_batch_document_error_reaches_every_statement():
+    responses.add(responses.POST, GITHUB_API_URL_V4, json={"data": None, "errors": [{"message": "Parse error"}]})
+    client = BatchClient()
+
+    async def get_both():
+        coroutines = [client.get_async(S.LOGIN_STATEMENT), client.get_async(S.RATE_LIMIT_STATEMENT)]
+        return await asyncio.gather(*coroutines, return_exceptions=True)
+
+    results = run(get_both())
+    assert [str(x) for x in results] == ["Parse error", "Parse error"]
+    assert len(responses.calls) == 1
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+def test_mutation_is_not_batched():
+    responses.add(responses.POST, GITHUB_API_URL_V4, json={"data": {"viewer": {"login": "user1"}}})
+    client = BatchClient()
+    run(gather(client.get_async(S.LOGIN_STATEMENT), client.get_async("mutation { addStar }")))
+    queries = sorted(json.loads(x.request.body)["query"] for x in responses.calls)
+    assert len(queries) == 2
+    assert queries[1] == "mutation { addStar }"
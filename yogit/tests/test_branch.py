@@ -1,3 +1,5 @@
+import json
+
 import responses
 import pytest
 from click.testing import CliRunner
@@ -5,6 +7,7 @@ from click.testing import CliRunner
 from yogit.yogit import cli
 from yogit.yogit.errors import ExitCode
 from yogit.api.client import GITHUB_API_URL_V4
+from yogit.tests.mocks.mock_graphql import GraphQLRouter
 from yogit.tests.mocks.mock_settings import mock_settings
 
 
@@ -309,3 +312,143 @@ def test_br_list(runner):
         "https://xyz  xyz\n"
         "Count: 3\n"
     )
+
+
+def _branch(ref_id, name, email, pr_urls, pr_cursor=None):
+    return {
+        "node": {
+            "id": ref_id,
+            "associatedPullRequests": {
+                "pageInfo": {"hasNextPage": pr_cursor is not None, "endCursor": pr_cursor},
+                "edges": [{"node": {"url": x}} for x in pr_urls],
+            },
+            "name": name,
+            "target": {"author": {"email": email, "name": "user1"}},
+        }
+    }
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+def test_br_list_nested_pagination(runner):
+    router = GraphQLRouter()
+    router.add(
+        "repositoriesContributedTo",
+        {
+            "data": {
+                "viewer": {
+                    "repositoriesContributedTo": {
+                        "pageInfo": {"hasNextPage": False, "endCursor": None},
+                        "edges": [
+                            {
+                                "node": {
+                                    "id": "repo1",
+                                    "url": "https://abc",
+                                    "refs": {
+                                        "pageInfo": {"hasNextPage": True, "endCursor": "refs_cursor"},
+                                        "edges": [
+                                            _branch("ref1", "b1", "user1@company1.com", ["https://pr1"], "pr_cursor"),
+                                            _branch("ref2", "b2", "notme@company1.fr", ["https://pr2"], "pr_cursor"),
+                                        ],
+                                    },
+                                }
+                            }
+                        ],
+                    }
+                }
+            }
+        },
+    )
+    router.add(
+        'node(id: "repo1")',
+        {
+            "data": {
+                "node": {
+                    "refs": {
+                        "pageInfo": {"hasNextPage": False, "endCursor": None},
+                        "edges": [_branch("ref3", "b3", "user1@company1.com", ["https://pr3"], "pr_cursor")],
+                    }
+                }
+            }
+        },
+    )
+    for ref_id, pr_url in [("ref1", "https://pr4"), ("ref3", "https://pr5")]:
+        router.add(
+            'node(id: "{}")'.format(ref_id),
+            {
+                "data": {
+                    "node": {
+                        "associatedPullRequests": {
+                            "pageInfo": {"hasNextPage": False, "endCursor": None},
+                            "edges": [{"node": {"url": pr_url}}],
+                        }
+                    }
+                }
+            },
+        )
+
+    result = runner.invoke(cli.main, ["branch", "list"])
+    assert result.exit_code == ExitCode.NO_ERROR.value
+    assert result.output == (
+        "REPO         BRANCH    PULL REQUEST\n"
+        "-----------  --------  --------------\n"
+        "https://abc  b1        https://pr1\n"
+        "                       https://pr4\n"
+        "https://abc  b3        https://pr3\n"
+        "                       https://pr5\n"
+        "Count: 2\n"
+    )
+    # Branches of others are not followed, continuations of a round share one request
+    assert len(responses.calls) == 3
+    bodies = [json.loads(x.request.body)["query"] for x in responses.calls]
+    assert 'after: "refs_cursor"' in bodies[1]
+    assert 'after: "pr_cursor"' in bodies[1]
+    assert 'node(id: "ref3")' in bodies[2]
+
+    # Dangling branches do not need their other pull requests
+    result = runner.invoke(cli.main, ["branch", "list", "--dangling"])
+    assert result.exit_code == ExitCode.NO_ERROR.value
+    assert result.output == "Everything is clean 👏\n"
+    assert len(responses.calls) == 5
+
+
+def _repositories(end_cursor, url, branches):
+    return {
+        "data": {
+            "viewer": {
+                "repositoriesContributedTo": {
+                    "pageInfo": {"hasNextPage": end_cursor is not None, "endCursor": end_cursor},
+                    "edges": [{"node": {"id": url, "url": url, "refs": {"edges": branches}}}],
+                }
+            }
+        }
+    }
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+def test_br_list_resume(runner):
+    _add_graphql_response(
+        _repositories("repo_cursor", "https://abc", [_branch("ref1", "b1", "user1@company1.com", [])])
+    )
+    responses.add(responses.POST, GITHUB_API_URL_V4, json={"message": "Bad credentials"}, status=401)
+    _add_graphql_response(_repositories(None, "https://def", [_branch("ref2", "b2", "user1@company1.com", [])]))
+
+    result = runner.invoke(cli.main, ["branch", "list", "--dangling"])
+    assert result.exit_code == ExitCode.DEFAULT_ERROR.value
+    assert result.output == "Error: Unauthorized\n"
+
+    # Pages fetched before the failure are not requested again
+    result = runner.invoke(cli.main, ["branch", "list", "--dangling", "--resume"])
+    assert result.exit_code == ExitCode.NO_ERROR.value
+    assert result.output == (
+        "REPO         BRANCH\n" "-----------  --------\n" "https://abc  b1\n" "https://def  b2\n" "Count: 2\n"
+    )
+    assert len(responses.calls) == 3
+    assert 'after: "repo_cursor"' in json.loads(responses.calls[2].request.body)["query"]
+
+    # The checkpoint of a complete listing is dropped
+    result = runner.invoke(cli.main, ["branch", "list", "--dangling", "--resume"])
+    assert result.exit_code == ExitCode.NO_ERROR.value
+    assert len(responses.calls) == 4
+    assert 'after: "repo_cursor"' not in json.loads(responses.calls[3].request.body)["query"]
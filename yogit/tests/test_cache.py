@@ -0,0 +1,77 @@
+import os
+from unittest.mock import patch
+
+import pytest
+import responses
+from click.testing import CliRunner
+
+from yogit.yogit import cli
+from yogit.yogit.errors import ExitCode
+from yogit.api.cache import ResponseCache, set_cache_policy
+from yogit.api.client import GITHUB_API_URL_V4
+from yogit.tests.mocks.mock_settings import mock_settings
+
+
+@pytest.fixture
+def runner():
+    return CliRunner()
+
+
+def test_response_cache(tmp_path):
+    statement = "{ viewer { login } }"
+    response = {"data": {"viewer": {"login": "user1"}}}
+    cache = ResponseCache(str(tmp_path), "user1")
+    assert cache.get("url", statement, 60) is None
+    cache.put("url", statement, response)
+
+    # Insignificant whitespaces do not matter, login and URL do
+    assert cache.get("url", "{\n    viewer {\n        login\n    }\n}\n", 60) == response
+    assert ResponseCache(str(tmp_path), "user2").get("url", statement, 60) is None
+    assert cache.get("other url", statement, 60) is None
+
+    stored = os.stat(cache._get_path("url", statement)).st_mtime
+    with patch("yogit.api.cache.time", return_value=stored + 61):
+        assert cache.get("url", statement, 60) is None
+    assert cache.get_stats() == "Response cache: 1 hits, 3 misses"
+
+    # Corrupted entries are misses
+    with open(cache._get_path("url", statement), "wb") as cache_file:
+        cache_file.write(b"corrupted")
+    assert cache.get("url", statement, 60) is None
+
+
+def test_response_cache_eviction(tmp_path):
+    cache = ResponseCache(str(tmp_path), "user1")
+    for index in range(2):
+        cache.put("url", str(index), {"data": index})
+        os.utime(cache._get_path("url", str(index)), (1000 + index, 1000 + index))
+    cache.max_size = cache.size
+    assert cache.get("url", "0", 1e10) == {"data": 0}
+
+    # Least recently used entry goes first
+    cache.put("url", "2", {"data": 2})
+    assert sorted(os.listdir(str(tmp_path))) == sorted(
+        os.path.basename(cache._get_path("url", str(index))) for index in [0, 2]
+    )
+    assert cache.size == cache.max_size
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+def test_pr_list_cached(runner):
+    responses.add(
+        responses.POST, GITHUB_API_URL_V4, json={"data": {"viewer": {"pullRequests": {"edges": []}}}}, status=200
+    )
+    with patch("yogit.yogit.caching.set_cache_policy", set_cache_policy):
+        for args, calls in [
+            ([], 1),
+            ([], 1),
+            (["--refresh"], 2),
+            ([], 2),
+            (["--no-cache"], 3),
+            (["--max-age", "0"], 4),
+        ]:
+            result = runner.invoke(cli.main, ["pr", "list"] + args)
+            assert result.exit_code == ExitCode.NO_ERROR.value
+            assert result.output == "Nothing... 😿 Time to push hard 💪\n"
+            assert len(responses.calls) == calls
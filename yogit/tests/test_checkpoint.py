@@ -0,0 +1,30 @@
+import os
+
+from yogit.api.checkpoint import Checkpoint
+
+
+def test_checkpoint():
+    checkpoint = Checkpoint("query")
+    checkpoint.put("statement", None, {"page": 1})
+    checkpoint.put("statement", "cursor1", {"page": 2})
+    checkpoint.put("other statement", None, {"page": 3})
+    with open(checkpoint.filename, "a") as ndjson_file:
+        ndjson_file.write('{"key": "interrupted wri')
+
+    checkpoint = Checkpoint("query", resume=True)
+    assert checkpoint.get("statement", None) == {"page": 1}
+    assert checkpoint.get("statement", None) is None
+    assert checkpoint.get("statement", "cursor1") == {"page": 2}
+    assert checkpoint.get("other statement", None) == {"page": 3}
+    assert Checkpoint("other query", resume=True).get("statement", None) is None
+
+    # Values are stored once and read back on resume
+    assert checkpoint.setdefault("value", 1) == 1
+    assert checkpoint.setdefault("value", 2) == 1
+    assert Checkpoint("query", resume=True).setdefault("value", 3) == 1
+
+    # Without resume, pages and values of a previous run are dropped
+    checkpoint = Checkpoint("query")
+    assert not os.path.exists(checkpoint.filename)
+    assert Checkpoint("query", resume=True).get("statement", None) is None
+    assert Checkpoint("query").setdefault("value", 4) == 4
@@ -9,6 +9,7 @@ from yogit.yogit import cli
 from yogit.yogit.errors import ExitCode
 from yogit.api.client import GITHUB_API_URL_V4
 from yogit.tests.mocks.mock_settings import mock_settings
+from yogit.tests.mocks.mock_graphql import GraphQLRouter
 from yogit.utils.dateutils import today_str
 
 
@@ -24,7 +25,9 @@ def runner():
 @pytest.mark.usefixtures("mock_settings")
 @responses.activate
 def test_empty_ct_list(runner):
-    _add_graphql_response(
+    router = GraphQLRouter()
+    router.add(
+        "pullRequestContributions",
         {
             "data": {
                 "viewer": {
@@ -33,9 +36,10 @@ def test_empty_ct_list(runner):
                     }
                 }
             }
-        }
+        },
     )
-    _add_graphql_response(
+    router.add(
+        "pullRequestReviewContributions",
         {
             "data": {
                 "viewer": {
@@ -47,7 +51,7 @@ def test_empty_ct_list(runner):
                     }
                 }
             }
-        }
+        },
     )
     result = runner.invoke(cli.main, ["contrib", "list"])
     assert result.exit_code == ExitCode.NO_ERROR.value
@@ -63,7 +67,9 @@ def test_empty_ct_list(runner):
     return_value=(datetime(2019, 7, 10, 1, 15, 59, 666), datetime(2019, 7, 10, 1, 15, 59, 666)),
 )
 def test_ct_list_today_ok(mock_compute_date, runner):
-    _add_graphql_response(
+    router = GraphQLRouter()
+    router.add(
+        "pullRequestContributions",
         {
             "data": {
                 "viewer": {
@@ -94,9 +100,10 @@ def test_ct_list_today_ok(mock_compute_date, runner):
                     }
                 }
             }
-        }
+        },
     )
-    _add_graphql_response(
+    router.add(
+        "pullRequestReviewContributions",
         {
             "data": {
                 "viewer": {
@@ -121,7 +128,7 @@ def test_ct_list_today_ok(mock_compute_date, runner):
                     }
                 }
             }
-        }
+        },
     )
     result = runner.invoke(cli.main, ["contrib", "list"])
     assert result.exit_code == ExitCode.NO_ERROR.value
@@ -140,7 +147,9 @@ def test_ct_list_today_ok(mock_compute_date, runner):
 @pytest.mark.usefixtures("mock_settings")
 @responses.activate
 def test_ct_list_ok(runner):
-    _add_graphql_response(
+    router = GraphQLRouter()
+    router.add(
+        "pullRequestContributions",
         {
             "data": {
                 "viewer": {
@@ -180,9 +189,10 @@ def test_ct_list_ok(runner):
                     }
                 }
             }
-        }
+        },
     )
-    _add_graphql_response(
+    router.add(
+        "pullRequestReviewContributions",
         {
             "data": {
                 "viewer": {
@@ -207,7 +217,7 @@ def test_ct_list_ok(runner):
                     }
                 }
             }
-        }
+        },
     )
     result = runner.invoke(cli.main, ["contrib", "list", "--from", "2019-08-01", "--to", "2019-08-15"])
     assert result.exit_code == ExitCode.NO_ERROR.value
@@ -236,11 +246,54 @@ def test_wrong_dates(runner):
         assert result.output == ("Error: Bad date format, should be `%Y-%m-%d`\n")
 
 
+def _contribution_response(connection, has_next_page, contributions):
+    edges = []
+    for title, day in contributions:
+        url = "https://{}".format(title.lower())
+        date = "{}T10:00:00Z".format(day)
+        if connection == "pullRequestContributions":
+            node = {"pullRequest": {"url": url, "title": title, "createdAt": date}}
+        else:
+            node = {"pullRequestReview": {"publishedAt": date}, "pullRequest": {"url": url, "title": title}}
+        edges.append({"node": node})
+    return {
+        "data": {
+            "viewer": {
+                "contributionsCollection": {
+                    connection: {"pageInfo": {"hasNextPage": has_next_page, "endCursor": "next"}, "edges": edges}
+                }
+            }
+        }
+    }
+
+
 @pytest.mark.usefixtures("mock_settings")
-def test_range_too_large(runner):
-    result = runner.invoke(cli.main, ["contrib", "list", "--from", "2019-08-01", "--to", "2020-08-02"])
-    assert result.exit_code == ExitCode.DEFAULT_ERROR.value
-    assert result.output == ("Error: Date range must not exceed one year\n")
+@responses.activate
+def test_ct_list_sharded(runner):
+    pr, rv = "pullRequestContributions", "pullRequestReviewContributions"
+    router = GraphQLRouter()
+    # Yearly shards
+    router.add((pr, 'from: "2019-08-01'), _contribution_response(pr, False, [("A", "2020-01-10")]))
+    router.add((pr, 'from: "2020-07-31'), _contribution_response(pr, False, [("B", "2020-08-01")]))
+    router.add((rv, 'from: "2019-08-01'), _contribution_response(rv, False, [("C", "2019-12-24")]))
+    # Busy shard, fetched again month by month
+    router.add((rv, '"2020-07-31T00:00:00", to: "2020-09-15'), _contribution_response(rv, True, [("X", "2020-09-01")]))
+    router.add((rv, 'to: "2020-08-30'), _contribution_response(rv, False, [("D", "2020-08-02")]))
+    router.add((rv, 'from: "2020-08-31'), _contribution_response(rv, False, [("E", "2020-09-01")]))
+
+    result = runner.invoke(cli.main, ["contrib", "list", "--from", "2019-08-01", "--to", "2020-09-15"])
+    assert result.exit_code == ExitCode.NO_ERROR.value
+    assert result.output == (
+        "Contributions from 2019-08-01 to 2020-09-15\n"
+        "CREATED     PULL REQUEST    ROLE      TITLE\n"
+        "----------  --------------  --------  -------\n"
+        "2020-09-01  https://e       REVIEWER  E\n"
+        "2020-08-02  https://d       REVIEWER  D\n"
+        "2020-08-01  https://b       OWNER     B\n"
+        "2020-01-10  https://a       OWNER     A\n"
+        "2019-12-24  https://c       REVIEWER  C\n"
+        "Count: 5\n"
+    )
 
 
 @pytest.mark.usefixtures("mock_settings")
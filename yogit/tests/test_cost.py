@@ -0,0 +1,46 @@
+import yogit.api.statements as S
+from yogit.api.cost import estimate, get_connections, get_max_page_size, PageSizeTuner
+from yogit.api.statement import prepare
+
+LABELLED_ORGA_PULL_REQUEST_LIST_STATEMENT = prepare(
+    S.ORGA_PULL_REQUEST_LIST_STATEMENT, [], {"labels": S.PULL_REQUEST_LABELS_SELECTION}
+)
+
+
+def test_connections():
+    assert get_connections(S.LOGIN_STATEMENT, 10) == []
+    assert get_connections(S.BRANCH_LIST_STATEMENT, 10) == [(10, 1), (100, 10), (10, 1000)]
+    assert get_connections(S.ORGA_PULL_REQUEST_LIST_STATEMENT, 10) == [(10, 1)]
+    assert get_connections(LABELLED_ORGA_PULL_REQUEST_LIST_STATEMENT, 10) == [(10, 1), (100, 10)]
+    assert get_connections(S.REVIEW_LIST_STATEMENT, 10) == [(10, 1), (1, 10)]
+
+
+def test_estimate():
+    assert estimate(S.LOGIN_STATEMENT) == (0, 1)
+    assert estimate(S.BRANCH_LIST_STATEMENT, 10) == (11010, 10)
+    assert estimate(S.BRANCH_LIST_STATEMENT, 100) == (110100, 101)
+    assert estimate(S.ORGA_PULL_REQUEST_LIST_STATEMENT, 10) == (10, 1)
+    assert estimate(LABELLED_ORGA_PULL_REQUEST_LIST_STATEMENT, 10) == (1010, 1)
+
+
+def test_max_page_size():
+    assert get_max_page_size(S.BRANCH_LIST_STATEMENT) == 100
+    assert get_max_page_size(S.BRANCH_LIST_STATEMENT, 10) == 10
+    statement = "{ a(first: $offset) { edges { node { b(first: 100) { c(last: 100) { d } } } } } }"
+    assert estimate(statement, 49)[0] == 494949
+    assert get_max_page_size(statement) == 49
+
+
+def test_page_size_tuner():
+    tuner = PageSizeTuner(100, target_latency=4)
+    tuner.on_page(8)
+    assert tuner.page_size == 50
+    tuner.on_page(3)
+    assert tuner.page_size == 50
+    tuner.on_timeout()
+    assert tuner.page_size == 25
+    tuner.on_page(1)
+    assert tuner.page_size == 50
+    tuner.on_page(1)
+    tuner.on_page(1)
+    assert tuner.page_size == 100
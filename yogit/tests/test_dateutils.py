@@ -0,0 +1,46 @@
+from datetime import date, datetime
+from unittest.mock import patch
+
+import pytest
+
+from yogit.utils.dateutils import days_ago_str, dt_for_str, split_date_range
+
+
+def test_split_date_range():
+    dt_from = datetime(2019, 8, 1)
+    dt_to = datetime(2021, 8, 15, 23, 59, 59)
+    assert split_date_range(dt_from, dt_to, 365) == [
+        (datetime(2019, 8, 1), datetime(2020, 7, 30, 23, 59, 59)),
+        (datetime(2020, 7, 31), datetime(2021, 7, 30, 23, 59, 59)),
+        (datetime(2021, 7, 31), datetime(2021, 8, 15, 23, 59, 59)),
+    ]
+
+
+def test_split_short_date_range():
+    dt_from = datetime(2019, 8, 1)
+    dt_to = datetime(2019, 8, 1, 23, 59, 59)
+    assert split_date_range(dt_from, dt_to, 31) == [(dt_from, dt_to)]
+    assert split_date_range(dt_to, dt_from, 31) == []
+
+
+def test_dt_for_str():
+    for dt_string in ["2019-07-01T10:00:00Z", "2020-02-29T23:59:59Z", "1999-12-31T00:00:01Z"]:
+        assert dt_for_str(dt_string) == datetime.strptime(dt_string, r"%Y-%m-%dT%H:%M:%SZ")
+    with pytest.raises(ValueError):
+        dt_for_str("2019-02-30T10:00:00Z")
+    with pytest.raises(ValueError):
+        dt_for_str("2019-07-01 10:00:00")
+
+
+@patch("yogit.utils.dateutils._FROMISOFORMAT", None)
+def test_dt_for_str_sliced():
+    dt_for_str.cache_clear()
+    assert dt_for_str("2019-07-01T10:00:05Z") == datetime(2019, 7, 1, 10, 0, 5)
+    dt_for_str.cache_clear()
+
+
+@patch("yogit.utils.dateutils._utcnow", return_value=datetime(2019, 7, 17, 1, 15, 59, 666))
+def test_days_ago_str(mock_utc_now):
+    assert days_ago_str(date(2019, 7, 17)) == "Today"
+    assert days_ago_str(date(2019, 7, 16)) == "Yesterday"
+    assert days_ago_str(date(2019, 7, 16), date(2019, 7, 26)) == "10 days ago"
@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+
+from yogit.api.engine import run
+from yogit.api.executor import QueryExecutor
+from yogit.tests.mocks.mock_settings import mock_settings
+
+
+class FakeQuery:
+    def __init__(self, name, events, data=None, error=None):
+        self.name = name
+        self.events = events
+        self.data = data or []
+        self.error = error
+
+    async def execute_async(self, spinner=None):
+        self.events.append(("start", self.name))
+        await asyncio.sleep(0.01)
+        self.events.append(("end", self.name))
+        if self.error is not None:
+            raise self.error
+
+
+@pytest.mark.usefixtures("mock_settings")
+def test_independent_queries_overlap():
+    events = []
+    executor = QueryExecutor()
+    executor.add(FakeQuery("a", events, data=[[1]]))
+    executor.add(FakeQuery("b", events, data=[[2], [3]]))
+    run(executor.execute_async())
+    assert events == [("start", "a"), ("start", "b"), ("end", "a"), ("end", "b")]
+    assert executor.get_rows() == [[1], [2], [3]]
+    assert len(executor.timings) == 2
+
+
+def test_max_concurrency():
+    events = []
+    executor = QueryExecutor(max_concurrency=1)
+    executor.add(FakeQuery("a", events))
+    executor.add(FakeQuery("b", events))
+    run(executor.execute_async())
+    assert events == [("start", "a"), ("end", "a"), ("start", "b"), ("end", "b")]
+
+
+def test_dependencies():
+    events = []
+    executor = QueryExecutor(max_concurrency=10)
+    query_a = executor.add(FakeQuery("a", events))
+    executor.add(FakeQuery("b", events), depends_on=[query_a])
+    executor.add(FakeQuery("c", events))
+    run(executor.execute_async())
+    assert events == [("start", "a"), ("start", "c"), ("end", "a"), ("end", "c"), ("start", "b"), ("end", "b")]
+
+    with pytest.raises(ValueError):
+        executor.add(FakeQuery("d", events), depends_on=[FakeQuery("e", events)])
+
+
+def test_errors():
+    events = []
+    executor = QueryExecutor(max_concurrency=10)
+    query_a = executor.add(FakeQuery("a", events, error=ValueError("a")))
+    query_b = executor.add(FakeQuery("b", events), depends_on=[query_a])
+    query_c = executor.add(FakeQuery("c", events, error=KeyError("c")))
+    with pytest.raises(ValueError):
+        run(executor.execute_async())
+    assert ("start", "b") not in events
+    assert ("end", "c") in events
+    assert set(executor.errors) == {query_a, query_c}
+    assert query_b not in executor.timings
+
+    run(executor.execute_async(raise_errors=False))
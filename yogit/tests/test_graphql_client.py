@@ -3,6 +3,8 @@ import responses
 import pytest
 
 from yogit.api.client import GraphQLClient, GITHUB_API_URL_V4
+from yogit.api.engine import run, gather
+from yogit.api.requester import RetryPolicy, TransientHTTPError
 
 
 def _add_response(status, json):
@@ -45,3 +47,52 @@ def test_ko():
         client.get({"query": "request"})
 
     assert str(e.value) == "Internal server error"
+
+
+@responses.activate
+def test_ok_200_async():
+    _add_response(200, {"data": "result"})
+    client = GraphQLClient()
+
+    assert run(client.get_async({"query": "request"})) == {"data": "result"}
+
+
+@responses.activate
+def test_ko_401_async():
+    _add_response(401, {"error": "result"})
+    client = GraphQLClient()
+    with pytest.raises(click.ClickException) as e:
+        run(gather(client.get_async({"query": "request1"}), client.get_async({"query": "request2"})))
+
+    assert str(e.value) == "Unauthorized"
+
+
+@responses.activate
+def test_retry_on_transient_error():
+    _add_response(502, {"error": "result"})
+    _add_response(200, {"data": "result"})
+    client = GraphQLClient()
+
+    assert client.get("{ viewer { login } }") == {"data": "result"}
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_retry_gives_up():
+    _add_response(502, {"message": "Server Error"})
+    client = GraphQLClient()
+    with pytest.raises(TransientHTTPError) as e:
+        client.get("{ viewer { login } }")
+
+    assert len(responses.calls) == RetryPolicy().max_attempts
+    assert str(e.value) == '{"message": "Server Error"}'
+
+
+@responses.activate
+def test_mutation_is_not_replayed():
+    _add_response(502, {"message": "Server Error"})
+    client = GraphQLClient()
+    with pytest.raises(TransientHTTPError):
+        client.get("mutation { addStar }")
+
+    assert len(responses.calls) == 1
@@ -0,0 +1,273 @@
+import json
+import os
+from datetime import date, datetime
+from unittest.mock import patch
+
+import pytest
+import responses
+from click.testing import CliRunner
+
+from yogit.api.queries import BranchListQuery
+from yogit.api.rows import BranchRow, MemberRow, PullRequestRow
+from yogit.storage.mirror import Mirror
+from yogit.tests.mocks.mock_graphql import GraphQLRouter
+from yogit.tests.mocks.mock_settings import mock_settings
+from yogit.yogit import cli
+from yogit.yogit.errors import ExitCode
+from yogit.yogit.settings import Settings
+
+
+@pytest.fixture
+def runner():
+    return CliRunner()
+
+
+@patch("yogit.utils.dateutils._utcnow", return_value=datetime(2019, 7, 17, 1, 15, 59, 666))
+def test_mirror_rows(mock_utc_now, tmp_path):
+    mirror = Mirror(str(tmp_path / "mirror.sqlite3"))
+    assert mirror.get_sync("members") is None
+
+    mirror.replace("members", [MemberRow("user1", "user1@company.com", None, "ADMIN")])
+    mirror.update(
+        "pull_requests",
+        {
+            "https://abc": PullRequestRow(date(2019, 7, 10), "", "https://abc", "title1", "MERGEABLE"),
+            "https://def": PullRequestRow(date(2019, 7, 16), "", "https://def", "title2", "CONFLICTING"),
+        },
+        [],
+        "2019-07-16T10:00:00Z",
+    )
+    mirror.update("pull_requests", {}, ["https://abc"], "2019-07-17T00:00:00Z")
+    mirror.close()
+
+    mirror = Mirror(str(tmp_path / "mirror.sqlite3"))
+    assert mirror.load("members") == [MemberRow("user1", "user1@company.com", None, "ADMIN")]
+    # Relative dates are computed when rows are loaded
+    assert mirror.load("pull_requests") == [
+        PullRequestRow(date(2019, 7, 16), "Yesterday", "https://def", "title2", "CONFLICTING")
+    ]
+    assert mirror.count("pull_requests") == 1
+    assert mirror.get_sync("pull_requests")[1] == "2019-07-17T00:00:00Z"
+    assert mirror.get_sync("members")[1] is None
+    mirror.replace("branches", [BranchRow("https://abc", "b1", "https://abc/pull/1\nhttps://abc/pull/2")])
+    assert mirror.load("branches") == [BranchRow("https://abc", "b1", "https://abc/pull/1\nhttps://abc/pull/2")]
+
+
+def _pull_requests(end_cursor, nodes):
+    return {
+        "data": {
+            "viewer": {
+                "pullRequests": {
+                    "pageInfo": {"hasNextPage": end_cursor is not None, "endCursor": end_cursor},
+                    "edges": nodes,
+                }
+            }
+        }
+    }
+
+
+def _pull_request(url, updated_at, state):
+    return {
+        "node": {
+            "createdAt": "2019-07-01T10:00:00Z",
+            "updatedAt": updated_at,
+            "state": state,
+            "url": url,
+            "title": url[-3:],
+            "mergeable": "MERGEABLE",
+        }
+    }
+
+
+def _search(urls):
+    return {
+        "data": {
+            "search": {
+                "pageInfo": {"hasNextPage": False, "endCursor": None},
+                "edges": [{"node": {"url": x, "title": "title", "updatedAt": "2019-07-16T10:00:00Z"}} for x in urls],
+            }
+        }
+    }
+
+
+def _add_list_responses(router):
+    router.add("state:open review-requested", _search(["https://review1"]))
+    router.add("state:closed review-requested", _search([]))
+    router.add(
+        "pullRequestReviewContributions",
+        {
+            "data": {
+                "viewer": {
+                    "contributionsCollection": {
+                        "pullRequestReviewContributions": {
+                            "pageInfo": {"hasNextPage": False, "endCursor": None},
+                            "edges": [],
+                        }
+                    }
+                }
+            }
+        },
+    )
+    router.add(
+        "repositoriesContributedTo",
+        {
+            "data": {
+                "viewer": {
+                    "repositoriesContributedTo": {
+                        "pageInfo": {"hasNextPage": False, "endCursor": None},
+                        "edges": [
+                            {
+                                "node": {
+                                    "id": "repo1",
+                                    "url": "https://repo1",
+                                    "refs": {
+                                        "edges": [
+                                            {
+                                                "node": {
+                                                    "id": "ref{}".format(index),
+                                                    "name": name,
+                                                    "target": {"author": {"email": "user1@company1.com"}},
+                                                    "associatedPullRequests": {
+                                                        "pageInfo": {"hasNextPage": False, "endCursor": None},
+                                                        "edges": [{"node": {"url": x}} for x in pr_urls],
+                                                    },
+                                                }
+                                            }
+                                            for index, (name, pr_urls) in enumerate(
+                                                [("b1", ["https://repo1/pull/1"]), ("b2", [])]
+                                            )
+                                        ]
+                                    },
+                                }
+                            }
+                        ],
+                    }
+                }
+            }
+        },
+    )
+    router.add(
+        "organizations",
+        {"data": {"viewer": {"organizations": {"edges": [{"node": {"login": "Orga1", "url": "https://orga1"}}]}}}},
+    )
+    router.add(
+        "membersWithRole",
+        {
+            "data": {
+                "viewer": {
+                    "organization": {
+                        "membersWithRole": {
+                            "pageInfo": {"hasNextPage": False, "endCursor": None},
+                            "totalCount": 1,
+                            "edges": [{"role": "MEMBER", "node": {"login": "user2", "email": "", "location": "Paris"}}],
+                        }
+                    }
+                }
+            }
+        },
+    )
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+@patch("yogit.utils.dateutils._utcnow", return_value=datetime(2019, 7, 17, 1, 15, 59, 666))
+def test_sync_and_mirror(mock_utc_now, runner):
+    result = runner.invoke(cli.main, ["pr", "list", "--mirror"])
+    assert result.exit_code == ExitCode.DEFAULT_ERROR.value
+    assert result.output == "Error: Nothing synced yet, run `yogit sync`\n"
+
+    router = GraphQLRouter()
+    _add_list_responses(router)
+    router.add(
+        "UPDATED_AT",
+        _pull_requests(
+            "pr_cursor",
+            [
+                _pull_request("https://abc", "2019-07-16T10:00:00Z", "OPEN"),
+                _pull_request("https://def", "2019-07-15T10:00:00Z", "OPEN"),
+            ],
+        ),
+    )
+    router.add("UPDATED_AT", _pull_requests(None, [_pull_request("https://ghi", "2019-07-14T10:00:00Z", "MERGED")]))
+    # Pages of an interrupted `branch list` are left for it to resume
+    branch_query = BranchListQuery(emails=Settings().get_github_emails())
+    branch_query.open_checkpoint(resume=False)
+    branch_query.checkpoint.put("statement", None, {"page": 1})
+    result = runner.invoke(cli.main, ["sync"])
+    assert result.exit_code == ExitCode.NO_ERROR.value
+    assert os.path.exists(branch_query.checkpoint.filename)
+    assert result.output == (
+        "SOURCE                     ROWS\n"
+        "-----------------------  ------\n"
+        "pull_requests                 2\n"
+        "review_requested:open         1\n"
+        "review_requested:closed       0\n"
+        "reviews                       0\n"
+        "branches                      2\n"
+        "organizations                 1\n"
+        "members:orga1                 1\n"
+        "Mirror synced: 3 updated pull requests\n"
+    )
+
+    result = runner.invoke(cli.main, ["pr", "list", "--mirror"])
+    assert result.exit_code == ExitCode.NO_ERROR.value
+    assert result.output == (
+        "Mirror synced: just now\n"
+        "CREATED      URL          TITLE    MERGEABLE\n"
+        "-----------  -----------  -------  -----------\n"
+        "16 days ago  https://abc  abc      MERGEABLE\n"
+        "16 days ago  https://def  def      MERGEABLE\n"
+        "Count: 2\n"
+    )
+
+    result = runner.invoke(cli.main, ["branch", "list", "--dangling", "--mirror"])
+    assert result.exit_code == ExitCode.NO_ERROR.value
+    assert result.output == (
+        "Mirror synced: just now\n"
+        "REPO           BRANCH\n"
+        "-------------  --------\n"
+        "https://repo1  b2\n"
+        "Count: 1\n"
+    )
+
+    result = runner.invoke(cli.main, ["orga", "member", "list", "--mirror"])
+    assert result.exit_code == ExitCode.NO_ERROR.value
+    assert "user2" in result.output
+
+    # Nothing is fetched from the mirror: dry run does not change the result
+    result = runner.invoke(cli.main, ["--dry-run", "orga", "member", "list", "--mirror"])
+    assert result.exit_code == ExitCode.NO_ERROR.value
+    assert "user2" in result.output
+
+    result = runner.invoke(cli.main, ["pr", "list", "--mirror", "--label", "bug"])
+    assert result.exit_code == ExitCode.DEFAULT_ERROR.value
+
+    # Only pull requests updated since the previous sync are fetched
+    responses.reset()
+    router = GraphQLRouter()
+    _add_list_responses(router)
+    router.add(
+        "UPDATED_AT",
+        _pull_requests(
+            "pr_cursor",
+            [
+                _pull_request("https://abc", "2019-07-17T00:00:00Z", "CLOSED"),
+                _pull_request("https://def", "2019-07-15T10:00:00Z", "OPEN"),
+            ],
+        ),
+    )
+    result = runner.invoke(cli.main, ["sync"])
+    assert result.exit_code == ExitCode.NO_ERROR.value
+    assert "Mirror synced: 1 updated pull requests\n" in result.output
+    assert len([x for x in responses.calls if "UPDATED_AT" in json.loads(x.request.body)["query"]]) == 1
+
+    result = runner.invoke(cli.main, ["pr", "list", "--mirror"])
+    assert result.exit_code == ExitCode.NO_ERROR.value
+    assert "https://abc" not in result.output
+    assert "https://def" in result.output
+
+    # Rows of another account are not read
+    Settings().set_github_login("user2")
+    result = runner.invoke(cli.main, ["pr", "list", "--mirror"])
+    assert result.exit_code == ExitCode.DEFAULT_ERROR.value
+    assert result.output == "Error: Nothing synced yet, run `yogit sync`\n"
@@ -1,11 +1,15 @@
-from unittest.mock import patch, Mock, MagicMock
+import json
+from time import time
+from unittest.mock import patch
 import responses
 import pytest
 from click.testing import CliRunner
 
 from yogit.yogit import cli
 from yogit.yogit.errors import ExitCode
+from yogit.yogit.organization import OrganizationCache, ORGANIZATION_CACHE_MAX_AGE
 from yogit.api.client import GITHUB_API_URL_V4
+from yogit.tests.mocks.mock_graphql import GraphQLRouter
 from yogit.tests.mocks.mock_settings import mock_settings
 
 
@@ -66,33 +70,20 @@ def test_orga_member_list_no_organization(runner):
     assert result.output == ("Error: You do not belong to any organization 😿\n")
 
 
-@pytest.mark.usefixtures("mock_settings")
-@responses.activate
-@patch("yogit.yogit.organization.OrganizationListQuery", return_value=MagicMock())
-def test_orga_member_list_more_than_one_organization(mock_query, runner):
-    mock_query.return_value.data = [["orga1"], ["orga2"]]
-    result = runner.invoke(cli.main, ["orga", "member", "list"])
-    assert result.exit_code == ExitCode.DEFAULT_ERROR.value
-    assert result.output == (
-        "Error: You belong to more than one organization (see `yogit orga list`), use `--orga` option to discriminate\n"
+def _add_organizations(router, logins):
+    router.add(
+        "organizations",
+        {
+            "data": {
+                "viewer": {"organizations": {"edges": [{"node": {"login": x, "url": "https://" + x}} for x in logins]}}
+            }
+        },
     )
 
 
-@pytest.mark.usefixtures("mock_settings")
-@responses.activate
-@patch("yogit.yogit.organization.OrganizationListQuery", return_value=MagicMock())
-def test_orga_member_list_unrecognized_orga(mock_query, runner):
-    mock_query.return_value.data = [["orga1"], ["orga2"]]
-    result = runner.invoke(cli.main, ["orga", "member", "list", "--orga", "orga3"])
-    assert result.exit_code == ExitCode.DEFAULT_ERROR.value
-    assert result.output == ("Error: Unrecognized orga3 organization (see `yogit orga list`)\n")
-
-
-@pytest.mark.usefixtures("mock_settings")
-@responses.activate
-@patch("yogit.yogit.organization.check_organization", return_value="orga1")
-def test_orga_member_list_ok_default(mock_check, runner):
-    _add_graphql_response(
+def _add_members(router):
+    router.add(
+        "membersWithRole",
         {
             "data": {
                 "viewer": {
@@ -121,8 +112,39 @@ def test_orga_member_list_ok_default(mock_check, runner):
                     }
                 }
             }
-        }
+        },
+    )
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+def test_orga_member_list_more_than_one_organization(runner):
+    router = GraphQLRouter()
+    _add_organizations(router, ["orga1", "orga2"])
+    result = runner.invoke(cli.main, ["orga", "member", "list"])
+    assert result.exit_code == ExitCode.DEFAULT_ERROR.value
+    assert result.output == (
+        "Error: You belong to more than one organization (see `yogit orga list`), use `--orga` option to discriminate\n"
     )
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+def test_orga_member_list_unrecognized_orga(runner):
+    router = GraphQLRouter()
+    _add_organizations(router, ["orga1", "orga2"])
+    router.add("membersWithRole", {"data": {"viewer": {"organization": None}}})
+    result = runner.invoke(cli.main, ["orga", "member", "list", "--orga", "orga3"])
+    assert result.exit_code == ExitCode.DEFAULT_ERROR.value
+    assert result.output == ("Error: Unrecognized orga3 organization (see `yogit orga list`)\n")
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+def test_orga_member_list_ok_default(runner):
+    router = GraphQLRouter()
+    _add_organizations(router, ["orga1"])
+    _add_members(router)
     result = runner.invoke(cli.main, ["orga", "member", "list"])
     assert result.exit_code == ExitCode.NO_ERROR.value
     assert result.output == (
@@ -134,44 +156,15 @@ def test_orga_member_list_ok_default(mock_check, runner):
         "user3   user3@company.com  San Francisco  MEMBER\n"
         "Count: 3\n"
     )
+    assert len(responses.calls) == 2
 
 
 @pytest.mark.usefixtures("mock_settings")
 @responses.activate
-@patch("yogit.yogit.organization.OrganizationListQuery", return_value=MagicMock())
-def test_orga_member_list_ok_with_orga(mock_query, runner):
-    mock_query.return_value.data = [["orga1"]]
-    _add_graphql_response(
-        {
-            "data": {
-                "viewer": {
-                    "organization": {
-                        "membersWithRole": {
-                            "pageInfo": {"hasNextPage": False, "endCursor": None},
-                            "edges": [
-                                {
-                                    "role": "MEMBER",
-                                    "node": {
-                                        "login": "user3",
-                                        "email": "user3@company.com",
-                                        "location": "San Francisco",
-                                    },
-                                },
-                                {
-                                    "role": "ADMIN",
-                                    "node": {"login": "user2", "email": "user2@company.com", "location": "Lyon"},
-                                },
-                                {
-                                    "role": "ADMIN",
-                                    "node": {"login": "user1", "email": "user1@company.com", "location": "Besancon"},
-                                },
-                            ],
-                        }
-                    }
-                }
-            }
-        }
-    )
+def test_orga_member_list_ok_with_orga(runner):
+    router = GraphQLRouter()
+    _add_organizations(router, ["orga1", "orga2"])
+    _add_members(router)
     result = runner.invoke(cli.main, ["orga", "member", "list", "--orga", "orga1"])
     assert result.exit_code == ExitCode.NO_ERROR.value
     assert result.output == (
@@ -183,16 +176,112 @@ def test_orga_member_list_ok_with_orga(mock_query, runner):
         "user3   user3@company.com  San Francisco  MEMBER\n"
         "Count: 3\n"
     )
+    assert len(responses.calls) == 1
 
 
 @pytest.mark.usefixtures("mock_settings")
 @responses.activate
-@patch("yogit.yogit.organization.check_organization", return_value="orga1")
-@patch("yogit.yogit.organization.OrganizationMemberListQuery", return_value=MagicMock())
 @patch("yogit.yogit.organization.sleep", return_value=0)
 @patch("yogit.yogit.organization.random.randint", return_value=2)
-def test_orga_member_pickone(mock_random, mock_sleep, mock_query, mock_check, runner):
-    mock_query.return_value.data = [["user1"], ["user2"], ["user3"]]
+def test_orga_member_pickone(mock_random, mock_sleep, runner):
+    router = GraphQLRouter()
+    _add_organizations(router, ["orga1"])
+    _add_members(router)
     result = runner.invoke(cli.main, ["orga", "member", "pickone"])
     assert result.exit_code == ExitCode.NO_ERROR.value
     assert result.output == ("Picking one out of 3 members... (33.33%) 🎲\n" 'The winner is "user3" 🤠\n')
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+def test_orga_member_list_stream(runner):
+    router = GraphQLRouter()
+    _add_organizations(router, ["orga1"])
+    _add_members(router)
+    result = runner.invoke(cli.main, ["orga", "member", "list", "--stream"])
+    assert result.exit_code == ExitCode.NO_ERROR.value
+    assert result.output == (
+        "orga1's members\n"
+        "NAME\tEMAIL\tLOCATION\tROLE\n"
+        "user3\tuser3@company.com\tSan Francisco\tMEMBER\n"
+        "user2\tuser2@company.com\tLyon\tADMIN\n"
+        "user1\tuser1@company.com\tBesancon\tADMIN\n"
+        "Count: 3\n"
+    )
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+def test_orga_member_list_dry_run(runner):
+    for args in (["orga", "member", "list"], ["orga", "member", "list", "--stream"], ["orga", "member", "pickone"]):
+        result = runner.invoke(cli.main, ["--dry-run"] + args)
+        assert result.exit_code == ExitCode.NO_ERROR.value
+        assert result.output == (
+            "OrganizationListQuery: 1 request, 100 nodes, cost 1 each\n"
+            "OrganizationMemberListQuery: 1 request per 100 items, 100 nodes, cost 1 each\n"
+        )
+    assert len(responses.calls) == 0
+    assert OrganizationCache().get() is None
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+def test_orga_member_list_formats(runner):
+    router = GraphQLRouter()
+    _add_organizations(router, ["orga1"])
+    _add_members(router)
+    result = runner.invoke(cli.main, ["orga", "member", "list", "--format", "csv"])
+    assert result.exit_code == ExitCode.NO_ERROR.value
+    assert result.output == (
+        "login,email,location,role\n"
+        "user1,user1@company.com,Besancon,ADMIN\n"
+        "user2,user2@company.com,Lyon,ADMIN\n"
+        "user3,user3@company.com,San Francisco,MEMBER\n"
+    )
+
+    result = runner.invoke(cli.main, ["orga", "member", "list", "--format", "ndjson", "--stream"])
+    assert result.exit_code == ExitCode.NO_ERROR.value
+    assert result.output == (
+        '{"login": "user3", "email": "user3@company.com", "location": "San Francisco", "role": "MEMBER"}\n'
+        '{"login": "user2", "email": "user2@company.com", "location": "Lyon", "role": "ADMIN"}\n'
+        '{"login": "user1", "email": "user1@company.com", "location": "Besancon", "role": "ADMIN"}\n'
+    )
+
+    result = runner.invoke(cli.main, ["orga", "list", "--format", "json"])
+    assert result.exit_code == ExitCode.NO_ERROR.value
+    assert result.output == '[\n{"login": "orga1", "url": "https://orga1"}\n]\n'
+
+    result = runner.invoke(cli.main, ["orga", "list", "--format", "xml"])
+    assert result.exit_code == 2
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+@patch("yogit.yogit.organization.sleep", return_value=0)
+def test_orga_member_list_cached_organizations(mock_sleep, runner):
+    router = GraphQLRouter()
+    _add_organizations(router, ["orga1"])
+    _add_members(router)
+    result = runner.invoke(cli.main, ["orga", "member", "list"])
+    assert result.exit_code == ExitCode.NO_ERROR.value
+    assert len(responses.calls) == 2
+
+    # Organization is checked locally
+    result = runner.invoke(cli.main, ["orga", "member", "pickone"])
+    assert result.exit_code == ExitCode.NO_ERROR.value
+    assert len(responses.calls) == 3
+    assert "membersWithRole" in json.loads(responses.calls[2].request.body)["query"]
+
+    # Unknown organization, cached ones are fetched again
+    responses.reset()
+    router = GraphQLRouter()
+    _add_organizations(router, ["orga1", "orga2"])
+    _add_members(router)
+    result = runner.invoke(cli.main, ["orga", "member", "list", "--orga", "orga2", "--stream"])
+    assert result.exit_code == ExitCode.NO_ERROR.value
+    assert len(responses.calls) == 2
+    assert OrganizationCache().get() == ["orga1", "orga2"]
+
+    # Stale cache
+    with patch("yogit.yogit.organization.time", return_value=time() + ORGANIZATION_CACHE_MAX_AGE + 1):
+        assert OrganizationCache().get() is None
@@ -1,3 +1,4 @@
+import json
 from datetime import datetime
 
 from unittest.mock import patch
@@ -9,6 +10,7 @@ from yogit.yogit import cli
 from yogit.yogit.errors import ExitCode
 from yogit.api.client import GITHUB_API_URL_V4
 from yogit.tests.mocks.mock_settings import mock_settings
+from yogit.tests.mocks.mock_graphql import GraphQLRouter
 
 
 def _add_graphql_response(json):
@@ -133,6 +135,7 @@ def test_pr_list_ok(mock_utc_now, runner):
         "46 days ago  https://xyz  title9   UNKNOWN\n"
         "Count: 9\n"
     )
+    assert "labels" not in json.loads(responses.calls[0].request.body)["query"]
 
 
 @pytest.mark.usefixtures("mock_settings")
@@ -202,7 +205,9 @@ def test_pr_list_with_label_filter_ok(mock_utc_now, runner):
 @pytest.mark.usefixtures("mock_settings")
 @responses.activate
 def test_pr_list_with_unknown_orga(runner):
-    _add_graphql_response({"data": {"search": {"pageInfo": {"hasNextPage": False, "endCursor": None}, "edges": []}}})
+    _add_graphql_response(
+        {"data": {"search": {"issueCount": 0, "pageInfo": {"hasNextPage": False, "endCursor": None}, "edges": []}}}
+    )
     result = runner.invoke(cli.main, ["pr", "list", "--orga", "unknown"])
     assert result.exit_code == ExitCode.NO_ERROR.value
     assert result.output == ("Nothing... 😿 Time to push hard 💪\n")
@@ -216,6 +221,7 @@ def test_pr_list_with_orga_ok(mock_utc_now, runner):
         {
             "data": {
                 "search": {
+                    "issueCount": 4,
                     "pageInfo": {"hasNextPage": True, "endCursor": "cursor_id"},
                     "edges": [
                         {"node": {"createdAt": "2019-07-17T10:30:15Z", "url": "https://xyz", "title": "title2"}},
@@ -229,10 +235,11 @@ def test_pr_list_with_orga_ok(mock_utc_now, runner):
         {
             "data": {
                 "search": {
+                    "issueCount": 4,
                     "pageInfo": {"hasNextPage": False, "endCursor": None},
                     "edges": [
-                        {"node": {"createdAt": "2019-06-17T01:18:00Z", "url": "https://xyz", "title": "title3"}},
-                        {"node": {"createdAt": "2019-05-17T08:36:15Z", "url": "https://abc", "title": "title4"}},
+                        {"node": {"createdAt": "2019-06-17T01:18:00Z", "url": "https://uvw", "title": "title3"}},
+                        {"node": {"createdAt": "2019-05-17T08:36:15Z", "url": "https://def", "title": "title4"}},
                     ],
                 }
             }
@@ -246,10 +253,13 @@ def test_pr_list_with_orga_ok(mock_utc_now, runner):
         "-----------  -----------  -------\n"
         "Today        https://abc  title1\n"
         "Today        https://xyz  title2\n"
-        "30 days ago  https://xyz  title3\n"
-        "61 days ago  https://abc  title4\n"
+        "30 days ago  https://uvw  title3\n"
+        "61 days ago  https://def  title4\n"
         "Count: 4\n"
     )
+    query = json.loads(responses.calls[0].request.body)["query"]
+    assert 'user:Orga", type: ISSUE' in query
+    assert "labels" not in query
 
 
 @pytest.mark.usefixtures("mock_settings")
@@ -260,6 +270,7 @@ def test_pr_list_with_orga_with_label_filter_ok(mock_utc_now, runner):
         {
             "data": {
                 "search": {
+                    "issueCount": 4,
                     "pageInfo": {"hasNextPage": True, "endCursor": "cursor_id"},
                     "edges": [
                         {
@@ -289,12 +300,13 @@ def test_pr_list_with_orga_with_label_filter_ok(mock_utc_now, runner):
         {
             "data": {
                 "search": {
+                    "issueCount": 4,
                     "pageInfo": {"hasNextPage": False, "endCursor": None},
                     "edges": [
                         {
                             "node": {
                                 "createdAt": "2019-06-17T01:18:00Z",
-                                "url": "https://xyz",
+                                "url": "https://uvw",
                                 "title": "title3",
                                 "labels": {"edges": []},
                             }
@@ -302,7 +314,7 @@ def test_pr_list_with_orga_with_label_filter_ok(mock_utc_now, runner):
                         {
                             "node": {
                                 "createdAt": "2019-05-17T08:36:15Z",
-                                "url": "https://abc",
+                                "url": "https://def",
                                 "title": "title4",
                                 "labels": {
                                     "edges": [{"node": {"name": "LaBeL with spacE"}}, {"node": {"name": "lAbEl3"}}]
@@ -321,9 +333,12 @@ def test_pr_list_with_orga_with_label_filter_ok(mock_utc_now, runner):
         "CREATED       URL          TITLE\n"
         "------------  -----------  -------\n"
         "93 days ago   https://xyz  title1\n"
-        "154 days ago  https://abc  title4\n"
+        "154 days ago  https://def  title4\n"
         "Count: 2\n"
     )
+    query = json.loads(responses.calls[0].request.body)["query"]
+    assert 'user:Orga label:\\"label with space\\"", type: ISSUE' in query
+    assert "labels(first: 100)" in query
 
     result = runner.invoke(
         cli.main, ["pr", "list", "--orga", "Orga", "--label", "label with SpAce", "--label", "label3"]
@@ -333,6 +348,190 @@ def test_pr_list_with_orga_with_label_filter_ok(mock_utc_now, runner):
     assert result.output == (
         "CREATED       URL          TITLE\n"
         "------------  -----------  -------\n"
-        "154 days ago  https://abc  title4\n"
+        "154 days ago  https://def  title4\n"
         "Count: 1\n"
     )
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+@patch("yogit.utils.dateutils._utcnow", return_value=datetime(2019, 7, 17, 8, 15, 30, 666))
+def test_pr_list_with_orga_resumes_failed_page(mock_utc_now, runner):
+    _add_graphql_response(
+        {
+            "data": {
+                "search": {
+                    "issueCount": 4,
+                    "pageInfo": {"hasNextPage": True, "endCursor": "cursor_id"},
+                    "edges": [{"node": {"createdAt": "2019-07-17T10:30:15Z", "url": "https://xyz", "title": "title1"}}],
+                }
+            }
+        }
+    )
+    # Not retried by the transport: the page is fetched again with a smaller page size
+    responses.add(responses.POST, GITHUB_API_URL_V4, json={"message": "Server Error"}, status=502)
+    _add_graphql_response(
+        {
+            "data": {
+                "search": {
+                    "issueCount": 4,
+                    "pageInfo": {"hasNextPage": False, "endCursor": None},
+                    "edges": [{"node": {"createdAt": "2019-06-17T01:18:00Z", "url": "https://abc", "title": "title2"}}],
+                }
+            }
+        }
+    )
+    result = runner.invoke(cli.main, ["pr", "list", "--orga", "Orga"])
+    assert result.exit_code == ExitCode.NO_ERROR.value
+    assert result.output == (
+        "CREATED      URL          TITLE\n"
+        "-----------  -----------  -------\n"
+        "Today        https://xyz  title1\n"
+        "30 days ago  https://abc  title2\n"
+        "Count: 2\n"
+    )
+    assert len(responses.calls) == 3
+    assert 'after: "cursor_id"' in json.loads(responses.calls[-1].request.body)["query"]
+    assert "first: 50" in json.loads(responses.calls[-1].request.body)["query"]
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+def test_pr_list_with_orga_rate_limited_page(runner):
+    _add_graphql_response(_search_response(4, "cursor_id", [("2019-07-17T10:30:15Z", "https://xyz", "title1")]))
+    # Longer than the transport accepts to wait
+    responses.add(
+        responses.POST,
+        GITHUB_API_URL_V4,
+        json={"message": "You have exceeded a secondary rate limit"},
+        status=403,
+        headers={"Retry-After": "3600"},
+    )
+    result = runner.invoke(cli.main, ["pr", "list", "--orga", "Orga"])
+    assert result.exit_code == ExitCode.DEFAULT_ERROR.value
+    assert len(responses.calls) == 2
+
+
+def _search_response(issue_count, end_cursor, pull_requests):
+    return {
+        "data": {
+            "search": {
+                "issueCount": issue_count,
+                "pageInfo": {"hasNextPage": end_cursor is not None, "endCursor": end_cursor},
+                "edges": [{"node": {"createdAt": x[0], "url": x[1], "title": x[2]}} for x in pull_requests],
+            }
+        }
+    }
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+@patch("yogit.utils.dateutils._utcnow", return_value=datetime(2019, 7, 17, 8, 15, 30, 666))
+def test_pr_list_with_orga_sharded(mock_utc_now, runner):
+    recent, older = "..2019-07-17T08:15:30Z", "created:2008-01-01T00:00:00Z..2013-10-08T16:07:45Z"
+    router = GraphQLRouter()
+    router.add('user:Orga"', _search_response(1500, "c0", [("2019-07-17T10:30:15Z", "https://xyz", "title1")]))
+    # Bisected search, the recent half returns the pull request of the first page again
+    router.add(
+        recent,
+        _search_response(
+            900,
+            None,
+            [("2019-07-17T10:30:15Z", "https://xyz", "title1"), ("2019-06-17T01:18:00Z", "https://abc", "title2")],
+        ),
+    )
+    router.add(older, _search_response(600, "c1", [("2012-07-17T10:30:15Z", "https://def", "title3")]))
+    router.add(older, _search_response(600, None, [("2011-07-17T10:30:15Z", "https://ghi", "title4")]))
+    result = runner.invoke(cli.main, ["pr", "list", "--orga", "Orga"])
+    assert result.exit_code == ExitCode.NO_ERROR.value
+    assert result.output == (
+        "CREATED        URL          TITLE\n"
+        "-------------  -----------  -------\n"
+        "Today          https://xyz  title1\n"
+        "30 days ago    https://abc  title2\n"
+        "2556 days ago  https://def  title3\n"
+        "2922 days ago  https://ghi  title4\n"
+        "Count: 4\n"
+    )
+    assert 'after: "c1"' in json.loads(responses.calls[-1].request.body)["query"]
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+def test_pr_list_with_orga_sharded_resume(runner):
+    recent, older = "..2019-07-17T08:15:30Z", "created:2008-01-01T00:00:00Z..2013-10-08T16:07:45Z"
+    router = GraphQLRouter()
+    router.add((older, 'after: "c1"'), {"message": "Bad credentials"}, status=401)
+    router.add('user:Orga"', _search_response(1500, "c0", [("2019-07-17T10:30:15Z", "https://xyz", "title1")]))
+    router.add(recent, _search_response(900, None, [("2019-06-17T01:18:00Z", "https://abc", "title2")]))
+    router.add(older, _search_response(600, "c1", [("2012-07-17T10:30:15Z", "https://def", "title3")]))
+    with patch("yogit.utils.dateutils._utcnow", return_value=datetime(2019, 7, 17, 8, 15, 30, 666)):
+        result = runner.invoke(cli.main, ["pr", "list", "--orga", "Orga"])
+    assert result.exit_code == ExitCode.DEFAULT_ERROR.value
+    assert len(responses.calls) == 3
+
+    # Shards are bisected as in the interrupted run: only the failed page is requested
+    responses.reset()
+    router = GraphQLRouter()
+    router.add((older, 'after: "c1"'), _search_response(600, None, [("2011-07-17T10:30:15Z", "https://ghi", "title4")]))
+    with patch("yogit.utils.dateutils._utcnow", return_value=datetime(2019, 7, 18, 9, 0, 0)):
+        result = runner.invoke(cli.main, ["pr", "list", "--orga", "Orga", "--resume"])
+    assert result.exit_code == ExitCode.NO_ERROR.value
+    assert len(responses.calls) == 1
+    for url in ["https://xyz", "https://abc", "https://def", "https://ghi"]:
+        assert url in result.output
+    assert "Count: 4\n" in result.output
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+def test_pr_list_with_orga_dry_run(runner):
+    result = runner.invoke(cli.main, ["--dry-run", "pr", "list", "--orga", "orga"])
+    assert result.exit_code == ExitCode.NO_ERROR.value
+    assert result.output == "OrgaPullRequestListQuery: 1 request per 100 items, 100 nodes, cost 1 each\n"
+
+    # Labels are only fetched to filter by label
+    result = runner.invoke(cli.main, ["--dry-run", "pr", "list", "--orga", "orga", "--label", "bug"])
+    assert result.exit_code == ExitCode.NO_ERROR.value
+    assert result.output == "OrgaPullRequestListQuery: 1 request per 100 items, 10100 nodes, cost 1 each\n"
+    assert len(responses.calls) == 0
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+@patch("yogit.utils.dateutils._utcnow", return_value=datetime(2019, 7, 17, 8, 15, 30, 666))
+def test_pr_list_with_orga_stream(mock_utc_now, runner):
+    _add_graphql_response(
+        {
+            "data": {
+                "search": {
+                    "issueCount": 4,
+                    "pageInfo": {"hasNextPage": True, "endCursor": "cursor_id"},
+                    "edges": [
+                        {"node": {"createdAt": "2019-07-17T10:30:15Z", "url": "https://xyz", "title": "title2"}},
+                        {"node": {"createdAt": "2019-07-17T17:28:15Z", "url": "https://abc", "title": "title1"}},
+                    ],
+                }
+            }
+        }
+    )
+    _add_graphql_response(
+        {
+            "data": {
+                "search": {
+                    "issueCount": 4,
+                    "pageInfo": {"hasNextPage": False, "endCursor": None},
+                    "edges": [{"node": {"createdAt": "2019-05-17T08:36:15Z", "url": "https://def", "title": "title4"}}],
+                }
+            }
+        }
+    )
+    result = runner.invoke(cli.main, ["pr", "list", "--orga", "Orga", "--stream"])
+    assert result.exit_code == ExitCode.NO_ERROR.value
+    assert result.output == (
+        "CREATED\tURL\tTITLE\n"
+        "Today\thttps://xyz\ttitle2\n"
+        "Today\thttps://abc\ttitle1\n"
+        "61 days ago\thttps://def\ttitle4\n"
+        "Count: 3\n"
+    )
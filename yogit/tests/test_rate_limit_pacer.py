@@ -0,0 +1,96 @@
+import json
+from unittest.mock import patch
+
+import pytest
+import responses
+
+from yogit.api.client import GraphQLClient, RESTClient, RateLimitPacer, get_pacer, GITHUB_API_URL_V4, GITHUB_API_URL_V3
+from yogit.api.statement import with_rate_limit
+from yogit.yogit.paths import get_rate_limit_path
+from yogit.tests.mocks.mock_settings import mock_settings
+
+
+def test_with_rate_limit():
+    assert with_rate_limit("{\n    viewer { login }\n}") == (
+        "{\n    rateLimit { limit cost remaining resetAt }\n    viewer { login }\n}"
+    )
+    assert with_rate_limit("{ rateLimit { limit } }") == "{ rateLimit { limit } }"
+    assert with_rate_limit("mutation { addStar }") == "mutation { addStar }"
+
+
+@patch("yogit.api.client.time", return_value=1000)
+def test_no_pacing_with_enough_budget(mock_time):
+    pacer = RateLimitPacer(get_rate_limit_path())
+    assert pacer.get_delay("graphql") == 0
+    pacer.update("graphql", 5000, 501, 2000)
+    assert pacer.get_delay("graphql") == 0
+
+
+@patch("yogit.api.client.time", return_value=1000)
+def test_pacing_below_threshold(mock_time):
+    pacer = RateLimitPacer(get_rate_limit_path())
+    pacer.update("graphql", 5000, 100, 2000)
+    assert pacer.get_delay("graphql") == 10
+    assert pacer.get_delay("graphql", cost=10) == 100
+    pacer.update("graphql", 5000, 0, 2000)
+    assert pacer.get_delay("graphql") == 1001
+    assert pacer.get_delay("core") == 0
+
+
+@patch("yogit.api.client.time", return_value=3000)
+def test_budget_reset(mock_time):
+    pacer = RateLimitPacer(get_rate_limit_path())
+    pacer.update("graphql", 5000, 0, 2000)
+    assert pacer.get_budget("graphql") is None
+    assert pacer.get_delay("graphql") == 0
+
+
+def test_budget_is_persisted():
+    get_pacer().update("core", 60, 42, 2000)
+    assert RateLimitPacer(get_rate_limit_path()).budgets == {"core": {"limit": 60, "remaining": 42, "reset": 2000}}
+
+    # Within a budget window, budgets are only saved on flush
+    get_pacer().update("core", 60, 41, 2000)
+    assert RateLimitPacer(get_rate_limit_path()).budgets["core"]["remaining"] == 42
+    get_pacer().flush()
+    assert RateLimitPacer(get_rate_limit_path()).budgets["core"]["remaining"] == 41
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+@patch("yogit.api.client.sleep")
+@patch("yogit.api.client.time", return_value=1000)
+def test_pacing_with_query_cost(mock_time, mock_sleep):
+    responses.add(responses.POST, GITHUB_API_URL_V4, json={"data": {}})
+    get_pacer().update("graphql", 5000, 50, 2000)
+    GraphQLClient().get("{ viewer { login } }")
+    mock_sleep.assert_called_once_with(20)
+
+    # Costs 101 points, more than the remaining budget
+    mock_sleep.reset_mock()
+    GraphQLClient().get("{ a(first: 100) { b(first: 100) { c(first: 100) { d } } } }")
+    mock_sleep.assert_called_once_with(1001)
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+def test_clients_update_budget():
+    responses.add(
+        responses.POST,
+        GITHUB_API_URL_V4,
+        json={"data": {"rateLimit": {"limit": 5000, "cost": 1, "remaining": 4999, "resetAt": "2019-07-11T23:39:39Z"}}},
+    )
+    responses.add(
+        responses.GET,
+        GITHUB_API_URL_V3 + "/endpoint",
+        json={},
+        headers={"X-RateLimit-Limit": "60", "X-RateLimit-Remaining": "59", "X-RateLimit-Reset": "1562888379"},
+    )
+    GraphQLClient().get("{ viewer { login } }")
+    RESTClient().get("/endpoint")
+
+    assert "rateLimit" in json.loads(responses.calls[0].request.body)["query"]
+    assert get_pacer().budgets == {
+        "graphql": {"limit": 5000, "remaining": 4999, "reset": 1562888379},
+        "core": {"limit": 60, "remaining": 59, "reset": 1562888379},
+    }
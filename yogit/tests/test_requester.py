@@ -0,0 +1,34 @@
+from unittest.mock import patch
+
+import pytest
+import responses
+
+import yogit.api.requester as requester
+from yogit.api.client import GraphQLClient, RESTClient, GITHUB_API_URL_V4, GITHUB_API_URL_V3
+from yogit.yogit.settings import Settings
+from yogit.tests.mocks.mock_settings import mock_settings
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+def test_clients_share_session():
+    responses.add(responses.POST, GITHUB_API_URL_V4, json={"data": "result"}, status=200)
+    responses.add(responses.GET, GITHUB_API_URL_V3 + "/endpoint", json={"data": "result"}, status=200)
+    with patch.object(requester.requests, "request") as mock_request:
+        GraphQLClient().get("request")
+        RESTClient().get("/endpoint")
+    mock_request.assert_not_called()
+    assert requester.get_session() is requester.get_session()
+
+
+@pytest.mark.usefixtures("mock_settings")
+@patch("yogit.api.requester._SESSION", None)
+def test_session_pool_settings():
+    settings = Settings()
+    data = settings.storage.load()
+    data["http"] = {"pool_connections": 3, "pool_maxsize": 7}
+    settings.storage.save(data)
+
+    adapter = requester.get_session().get_adapter("https://api.github.com")
+    assert adapter._pool_connections == 3
+    assert adapter._pool_maxsize == 7
@@ -3,6 +3,7 @@ import responses
 import pytest
 
 from yogit.api.client import RESTClient, GITHUB_API_URL_V3
+from yogit.api.engine import run
 
 
 def _add_response(status, json):
@@ -45,3 +46,35 @@ def test_ko():
         client.get("/endpoint")
 
     assert str(e.value) == "Internal server error"
+
+
+@responses.activate
+def test_conditional_request():
+    responses.add(
+        responses.GET, GITHUB_API_URL_V3 + "/endpoint", json={"data": "result"}, status=200, headers={"ETag": '"abc"'}
+    )
+    responses.add(responses.GET, GITHUB_API_URL_V3 + "/endpoint", body="", status=304)
+    client = RESTClient()
+
+    assert client.get("/endpoint") == {"data": "result"}
+    assert "If-None-Match" not in responses.calls[0].request.headers
+    assert client.get("/endpoint") == {"data": "result"}
+    assert responses.calls[1].request.headers["If-None-Match"] == '"abc"'
+
+
+@responses.activate
+def test_conditional_request_modified():
+    last_modified = "Wed, 21 Oct 2015 07:28:00 GMT"
+    responses.add(
+        responses.GET,
+        GITHUB_API_URL_V3 + "/endpoint",
+        json={"data": "result1"},
+        status=200,
+        headers={"Last-Modified": last_modified},
+    )
+    responses.add(responses.GET, GITHUB_API_URL_V3 + "/endpoint", json={"data": "result2"}, status=200)
+    client = RESTClient()
+
+    assert client.get("/endpoint") == {"data": "result1"}
+    assert run(client.get_async("/endpoint")) == {"data": "result2"}
+    assert responses.calls[1].request.headers["If-Modified-Since"] == last_modified
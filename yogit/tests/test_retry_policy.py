@@ -0,0 +1,58 @@
+from unittest.mock import Mock, patch
+
+import requests
+
+from yogit.api.requester import RetryPolicy
+
+
+def _response(status, headers={}):
+    return Mock(status_code=status, headers=headers)
+
+
+def test_no_retry_on_client_error():
+    policy = RetryPolicy()
+    assert policy.get_retry_delay(0, _response(400)) is None
+    assert policy.get_retry_delay(0, _response(401)) is None
+    assert policy.get_retry_delay(0, _response(403)) is None
+
+
+def test_max_attempts():
+    policy = RetryPolicy(max_attempts=3)
+    assert policy.get_retry_delay(1, _response(502)) is not None
+    assert policy.get_retry_delay(2, _response(502)) is None
+
+
+@patch("yogit.api.requester.random.uniform", side_effect=lambda low, high: high)
+def test_exponential_backoff(mock_uniform):
+    policy = RetryPolicy(max_attempts=10, backoff_factor=1.0, max_backoff=10)
+    delays = [policy.get_retry_delay(attempt, _response(503)) for attempt in range(6)]
+    assert delays == [1, 2, 4, 8, 10, 10]
+
+
+def test_retry_after():
+    policy = RetryPolicy()
+    assert policy.get_retry_delay(0, _response(403, {"Retry-After": "42"})) == 42
+    assert policy.get_retry_delay(0, _response(429, {"Retry-After": "3"})) == 3
+    assert policy.get_retry_delay(0, _response(403, {"Retry-After": "3600"})) is None
+
+
+@patch("yogit.api.requester.time", return_value=1000)
+def test_rate_limit_reset(mock_time):
+    policy = RetryPolicy()
+    headers = {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1060"}
+    assert policy.get_retry_delay(0, _response(403, headers)) == 61
+
+
+def test_not_idempotent():
+    policy = RetryPolicy(idempotent=False)
+    assert policy.get_retry_delay(0, _response(502)) is None
+    assert policy.get_retry_delay(0, exception=requests.ConnectionError()) is None
+    assert policy.get_retry_delay(0, _response(429, {"Retry-After": "1"})) == 1
+    assert policy.get_retry_delay(0, exception=requests.exceptions.ConnectTimeout()) is not None
+
+
+def test_only_rate_limits():
+    policy = RetryPolicy(retry_errors=False)
+    assert policy.get_retry_delay(0, _response(502)) is None
+    assert policy.get_retry_delay(0, exception=requests.ConnectionError()) is None
+    assert policy.get_retry_delay(0, _response(429, {"Retry-After": "1"})) == 1
@@ -0,0 +1,71 @@
+import pytest
+import responses
+
+from yogit.api.engine import run
+from yogit.api.queries import OrganizationMemberListQuery
+from yogit.api.rows import MemberRow
+from yogit.tests.mocks.mock_graphql import GraphQLRouter
+from yogit.tests.mocks.mock_settings import mock_settings
+
+
+def _add_members(router, logins, cursor=None):
+    router.add(
+        "membersWithRole",
+        {
+            "data": {
+                "viewer": {
+                    "organization": {
+                        "membersWithRole": {
+                            "pageInfo": {"hasNextPage": cursor is not None, "endCursor": cursor},
+                            "edges": [
+                                {"role": "MEMBER", "node": {"login": x, "email": None, "location": None}}
+                                for x in logins
+                            ],
+                        }
+                    }
+                }
+            }
+        },
+    )
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+def test_iter_rows():
+    router = GraphQLRouter()
+    _add_members(router, ["user2", "user1"], "cursor")
+    _add_members(router, ["user0"])
+    query = OrganizationMemberListQuery("orga")
+    rows = query.iter_rows()
+    assert next(rows) == MemberRow("user2", None, None, "MEMBER")
+    assert next(rows).login == "user1"
+    assert [x.login for x in rows] == ["user0"]
+    # Neither rows nor pages are held once streamed
+    assert query.data == []
+    assert query._response == []
+    assert query.get_count() == 3
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+def test_stream():
+    router = GraphQLRouter()
+    _add_members(router, ["user1"])
+    query = OrganizationMemberListQuery("orga")
+
+    async def collect():
+        rows = []
+        async for row in query.stream():
+            rows.append(row.login)
+        return rows
+
+    assert run(collect()) == ["user1"]
+
+
+@pytest.mark.usefixtures("mock_settings")
+@responses.activate
+def test_stream_error():
+    responses.add(responses.POST, "https://api.github.com/graphql", json={}, status=401)
+    with pytest.raises(Exception) as error:
+        list(OrganizationMemberListQuery("orga").iter_rows())
+    assert str(error.value) == "Unauthorized"
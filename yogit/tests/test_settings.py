@@ -1,7 +1,13 @@
+import os
+import threading
+from unittest.mock import patch
+
 import pytest
 
 import click
+import yaml
 
+from yogit.storage.storage import load_json, save_json
 from yogit.tests.mocks.mock_settings import temporary_settings, assert_empty_settings, temporary_scrum_report
 from yogit.yogit.settings import Settings, ScrumReportSettings
 
@@ -108,3 +114,126 @@ def test_report_settings_1_to_2_migration():
     with open(report_settings.storage.get_path(), "r") as settings_file:
         content = settings_file.read()
         assert content == REPORT_TEMPLATE_2
+
+
+@pytest.mark.usefixtures("temporary_settings")
+def test_settings_parsed_once():
+    settings = Settings()
+    settings.set_github_token("github_token")
+    settings.set_github_login("github_login")
+
+    with patch("yaml.load") as mock_load:
+        assert Settings().get_github_token() == "github_token"
+        assert Settings().get_github_login() == "github_login"
+        # In another process, parsed data is read from the sidecar
+        with patch.dict("yogit.storage.storage._SNAPSHOTS", clear=True):
+            assert Settings().get_github_login() == "github_login"
+        assert mock_load.call_count == 0
+
+    # Edited by hand
+    with open(settings.get_path(), "w") as settings_file:
+        settings_file.write("login: another_login\n")
+    assert settings.get_github_login() == "another_login"
+    assert settings.get_github_token() == ""
+
+
+@pytest.mark.usefixtures("temporary_settings")
+def test_settings_transaction():
+    settings = Settings()
+    with patch("yaml.dump") as mock_dump:
+        settings.reset_github()
+        assert mock_dump.call_count == 1
+
+    with settings.transaction():
+        settings.set_github_token("github_token")
+        settings.set_github_login("github_login")
+        # Pending values are read back, they are not written yet
+        assert settings.get_github_login() == "github_login"
+        assert Settings().get_github_login() == ""
+    assert Settings().get_github_login() == "github_login"
+
+    with pytest.raises(ValueError):
+        with settings.transaction():
+            settings.set_github_login("another_login")
+            raise ValueError()
+    assert Settings().get_github_login() == "github_login"
+
+
+@pytest.mark.usefixtures("temporary_settings")
+def test_settings_atomic_save():
+    settings = Settings()
+    settings.set_github_login("github_login")
+
+    def partial_dump(data, yaml_file):
+        yaml_file.write("login: partial")
+        raise OSError("No space left on device")
+
+    with patch("yogit.storage.storage._dump_yaml", side_effect=partial_dump):
+        with pytest.raises(OSError):
+            settings.set_github_login("another_login")
+    with patch.dict("yogit.storage.storage._SNAPSHOTS", clear=True):
+        assert Settings().get_github_login() == "github_login"
+    directory, name = os.path.split(settings.get_path())
+    assert not [x for x in os.listdir(directory) if x.startswith(name) and x.endswith(".tmp")]
+
+
+def test_json_file(tmp_path):
+    filename = str(tmp_path / "data.json")
+    assert load_json(filename) == {}
+    save_json(filename, {"key": "value"})
+    assert load_json(filename) == {"key": "value"}
+    with open(filename, "w") as json_file:
+        json_file.write("{")
+    assert load_json(filename) == {}
+    # Errors are logged
+    save_json(str(tmp_path / "missing" / "data.json"), {})
+
+
+@pytest.mark.usefixtures("temporary_settings")
+def test_settings_concurrent_edits():
+    Settings().set_github_login("github_login")
+
+    def increment():
+        for _ in range(20):
+            with Settings().transaction() as data:
+                data["count"] = data.get("count", 0) + 1
+
+    logins = []
+
+    def read():
+        # Readers parse the file without waiting for writers
+        for _ in range(100):
+            logins.append(Settings().storage.load(fresh=True).get("login"))
+
+    threads = [threading.Thread(target=increment) for _ in range(4)] + [threading.Thread(target=read)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert Settings().storage.load()["count"] == 80
+    assert logins == ["github_login"] * 100
+
+
+@pytest.mark.usefixtures("temporary_scrum_report")
+def test_report_settings_snapshot():
+    report_settings = ScrumReportSettings()
+
+    with open(report_settings.storage.get_path(), "w") as settings_file:
+        settings_file.write(REPORT_TEMPLATE_1)
+
+    with patch("yaml.load", wraps=yaml.load) as mock_load, patch("yaml.dump", wraps=yaml.dump) as mock_dump:
+        snapshot = report_settings.get_snapshot()
+        assert mock_load.call_count == 1
+        assert mock_dump.call_count == 1
+        # Migrated once
+        ScrumReportSettings().get_snapshot()
+        assert mock_dump.call_count == 1
+
+    assert snapshot.questions == [
+        "What have you done today?",
+        "Do you have any blockers?",
+        "What do you plan to work on your next working day?",
+    ]
+    assert len(snapshot.sections) == 1
+    section = snapshot.sections[0].safe_substitute({"date": "2019-07-17", "q0": "Done?"})
+    assert section.startswith("*REPORT 2019-07-17*\n*Done?*\n${a0}")
@@ -1,10 +1,12 @@
+from time import time
 from unittest.mock import patch
 
 import responses
 import pytest
 
 from yogit.api.client import GITHUB_API_URL_V3
-from yogit.yogit.update_checker import UpdateChecker, YOGIT_TAG_LIST_ENDPOINT
+from yogit.storage.storage import load_json, save_json
+from yogit.yogit.update_checker import UpdateChecker, UPDATE_CHECK_MAX_AGE, YOGIT_TAG_LIST_ENDPOINT
 
 RESPONSE_OK = [
     {"name": "0.0.1"},
@@ -40,3 +42,40 @@ def test_ok(mock_version):
     assert outdated == True
     assert current_version == "2.3.30"
     assert latest_version == "2.20.20"
+
+
+@patch("yogit.yogit.update_checker.get_version", return_value="2.3.30")
+@responses.activate
+def test_refresh(mock_version):
+    _add_response(RESPONSE_OK)
+    checker = UpdateChecker()
+    checker.refresh()
+    assert load_json(checker.filename)["latest_version"] == "2.20.20"
+
+    # A failed fetch keeps the known latest version
+    responses.replace(responses.GET, GITHUB_API_URL_V3 + YOGIT_TAG_LIST_ENDPOINT, status=500)
+    checker = UpdateChecker()
+    checker.refresh()
+    assert load_json(checker.filename)["latest_version"] == "2.20.20"
+
+
+@patch("yogit.yogit.update_checker.get_version", return_value="2.3.30")
+@patch("yogit.yogit.update_checker.UpdateChecker._spawn_refresh")
+@patch("yogit.yogit.update_checker.YogitTagsQuery.execute")
+def test_check_cached(mock_execute, mock_spawn_refresh, mock_version, capsys):
+    checker = UpdateChecker()
+    checker.check()
+    # Nothing known yet: the latest version is fetched in background, for next run
+    assert mock_spawn_refresh.call_count == 1
+    assert capsys.readouterr().out == ""
+
+    save_json(checker.filename, dict(load_json(checker.filename), latest_version="2.20.20"))
+    UpdateChecker().check()
+    assert mock_spawn_refresh.call_count == 1
+    assert "version 2.20.20 is available" in capsys.readouterr().out
+
+    save_json(checker.filename, {"checked_at": time() - UPDATE_CHECK_MAX_AGE - 1, "latest_version": "2.3.30"})
+    UpdateChecker().check()
+    assert mock_spawn_refresh.call_count == 2
+    assert capsys.readouterr().out == ""
+    assert mock_execute.call_count == 0
@@ -0,0 +1,51 @@
+from datetime import date
+
+import pytest
+
+from yogit.api.rows import OrgaPullRequestRow
+from yogit.utils.writers import write_rows
+
+ROWS = [
+    OrgaPullRequestRow(date(2019, 7, 17), "Today", "https://abc", "title, 1"),
+    OrgaPullRequestRow(date(2019, 5, 17), "61 days ago", "https://xyz", 'title "2"'),
+]
+
+
+@pytest.fixture
+def output(capsys):
+    def _output(rows, output_format):
+        write_rows(iter(rows), output_format)
+        return capsys.readouterr().out
+
+    return _output
+
+
+def test_ndjson(output):
+    assert output(ROWS, "ndjson") == (
+        '{"created": "2019-07-17", "created_str": "Today", "url": "https://abc", "title": "title, 1"}\n'
+        '{"created": "2019-05-17", "created_str": "61 days ago", "url": "https://xyz", "title": "title \\"2\\""}\n'
+    )
+    assert output([], "ndjson") == ""
+
+
+def test_json(output):
+    assert output(ROWS, "json") == (
+        "[\n"
+        '{"created": "2019-07-17", "created_str": "Today", "url": "https://abc", "title": "title, 1"},\n'
+        '{"created": "2019-05-17", "created_str": "61 days ago", "url": "https://xyz", "title": "title \\"2\\""}\n'
+        "]\n"
+    )
+    assert output([], "json") == "[]\n"
+
+
+def test_csv(output):
+    assert output(ROWS, "csv") == (
+        "created,created_str,url,title\n"
+        '2019-07-17,Today,https://abc,"title, 1"\n'
+        '2019-05-17,61 days ago,https://xyz,"title ""2"""\n'
+    )
+
+
+def test_unknown_format(output):
+    with pytest.raises(KeyError):
+        output(ROWS, "xml")
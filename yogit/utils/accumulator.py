@@ -0,0 +1,55 @@
+"""
+Row accumulation
+"""
+
+
+class RowAccumulator:
+    """
+    Collect rows page after page and order them once, when they are read
+
+    `sort_keys` is a list of (key, reverse) pairs, applied in turn as stable
+    sorts: the last one is the primary order. Listeners are called with every
+    added row, in the order rows arrive.
+    """
+
+    def __init__(self, sort_keys=()):
+        self.sort_keys = sort_keys
+        self.rows = []
+        self.count = 0
+        self.is_sorted = True
+        self.keep_rows = True
+        self.listeners = []
+
+    def subscribe(self, listener, keep_rows=True):
+        """
+        Call `listener` with every row added from now on
+
+        Unless `keep_rows` is set, rows are only counted: listeners are the only ones to get them.
+        """
+        self.listeners.append(listener)
+        self.keep_rows = self.keep_rows and keep_rows
+
+    def append(self, row):
+        """ Add one row """
+        self.count += 1
+        if self.keep_rows:
+            self.rows.append(row)
+            self.is_sorted = False
+        for listener in self.listeners:
+            listener(row)
+
+    def extend(self, rows):
+        """ Add several rows """
+        for row in rows:
+            self.append(row)
+
+    def get_rows(self):
+        """ Return ordered rows """
+        if not self.is_sorted:
+            for key, reverse in self.sort_keys:
+                self.rows.sort(key=key, reverse=reverse)
+            self.is_sorted = True
+        return self.rows
+
+    def __len__(self):
+        return self.count
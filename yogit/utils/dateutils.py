@@ -1,16 +1,59 @@
 """ Date utility functions """
-from datetime import datetime
+import calendar
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+# Python 3.7+, parses in C
+_FROMISOFORMAT = getattr(datetime, "fromisoformat", None)
 
 
 def _utcnow():
     return datetime.utcnow()
 
 
+@lru_cache(maxsize=4096)
 def dt_for_str(dt_string):
-    """ Return datetime object from ISO 8601 string """
+    """
+    Return datetime object from ISO 8601 string
+
+    GitHub `YYYY-MM-DDTHH:MM:SSZ` strings skip `strptime`, which is much
+    slower. Results are cached: pages repeat the same timestamps.
+    """
+    if (
+        len(dt_string) == 20
+        and dt_string[4] == dt_string[7] == "-"
+        and dt_string[10] == "T"
+        and dt_string[13] == dt_string[16] == ":"
+        and dt_string[19] == "Z"
+    ):
+        if _FROMISOFORMAT is not None:
+            return _FROMISOFORMAT(dt_string[:19])
+        return datetime(
+            int(dt_string[0:4]),
+            int(dt_string[5:7]),
+            int(dt_string[8:10]),
+            int(dt_string[11:13]),
+            int(dt_string[14:16]),
+            int(dt_string[17:19]),
+        )
     return datetime.strptime(dt_string, r"%Y-%m-%dT%H:%M:%SZ")
 
 
+def timestamp_for_str(dt_string):
+    """ Return POSIX timestamp of ISO 8601 UTC string """
+    return calendar.timegm(dt_for_str(dt_string).utctimetuple())
+
+
+def str_for_timestamp(timestamp):
+    """ Return ISO 8601 UTC string of POSIX timestamp """
+    return datetime.utcfromtimestamp(timestamp).strftime(r"%Y-%m-%dT%H:%M:%SZ")
+
+
+def utcnow_timestamp():
+    """ Return POSIX timestamp of now instant """
+    return calendar.timegm(_utcnow().utctimetuple())
+
+
 def utcnow_str():
     """ Return ISO 8601 string of now instant """
     return _utcnow().replace(microsecond=0).isoformat()
@@ -26,12 +69,50 @@ def today_earliest_str():
     return _utcnow().replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
 
 
-def days_ago_str(dte):
-    """ Return human readable string between today and another date object """
-    today = _utcnow().date()
+def utc_today():
+    """ Return date object of today """
+    return _utcnow().date()
+
+
+def days_ago_str(dte, today=None):
+    """
+    Return human readable string between today and another date object
+
+    Callers building many rows should compute `today` once with `utc_today`.
+    """
+    if today is None:
+        today = utc_today()
     delta_days = (today - dte).days
     if delta_days == 0:
         return "Today"
     if delta_days == 1:
         return "Yesterday"
     return "{} days ago".format(delta_days)
+
+
+def elapsed_str(seconds):
+    """ Return human readable string of a duration in the past """
+    minutes = int(seconds // 60)
+    if minutes == 0:
+        return "Just now"
+    if minutes < 60:
+        return "{} minutes ago".format(minutes)
+    if minutes < 24 * 60:
+        return "{} hours ago".format(minutes // 60)
+    return "{} days ago".format(minutes // (24 * 60))
+
+
+def split_date_range(dt_from, dt_to, days):
+    """
+    Split a range of datetimes in consecutive windows of `days` days at most
+
+    Return (from, to) pairs, both included and one second apart from their
+    neighbours, in chronological order.
+    """
+    windows = []
+    window_from = dt_from
+    while window_from <= dt_to:
+        window_to = min(window_from + timedelta(days=days) - timedelta(seconds=1), dt_to)
+        windows.append((window_from, window_to))
+        window_from = window_to + timedelta(seconds=1)
+    return windows
@@ -1,7 +1,10 @@
 import platform
+import threading
 
 from halo import Halo
 
+SPINNER_DELAY = 0.2
+
 
 def get_spinner_object():
     spinner_type = "dots"
@@ -14,10 +17,19 @@ def get_spinner_object():
 def spin(func):
     """
    Wrap Halo within a decorator then it's easy to disable it.
+   The spinner only shows up after `SPINNER_DELAY` seconds, so instant
+   results (served from cache for instance) do not flash it.
    """
 
     def inner(self, *args, **kwargs):
-        with get_spinner_object() as spinner:
+        spinner = get_spinner_object()
+        timer = threading.Timer(SPINNER_DELAY, spinner.start)
+        timer.start()
+        try:
             func(self, spinner, *args, **kwargs)
+        finally:
+            timer.cancel()
+            timer.join()
+            spinner.stop()
 
     return inner
@@ -0,0 +1,83 @@
+"""
+Streaming row writers for machine-readable output
+
+Rows are named tuples, written one by one as they come: the whole output
+is never held in memory.
+"""
+import csv
+import json
+
+import click
+
+
+def _to_json(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError("{} is not JSON serializable".format(type(value).__name__))
+
+
+class _EchoFile:
+    """ File-like object writing through `click.echo` """
+
+    def write(self, text):
+        click.echo(text, nl=False)
+
+
+class RowWriter:
+    """ Write rows one by one """
+
+    def write_row(self, row):
+        """ Write one row """
+        raise NotImplementedError()
+
+    def close(self):
+        """ Terminate output """
+
+
+class NdjsonWriter(RowWriter):
+    """ One JSON object per line """
+
+    def write_row(self, row):
+        click.echo(json.dumps(row._asdict(), default=_to_json))
+
+
+class JsonWriter(RowWriter):
+    """ One JSON array of objects """
+
+    def __init__(self):
+        self.count = 0
+
+    def write_row(self, row):
+        click.echo("[" if self.count == 0 else ",")
+        click.echo(json.dumps(row._asdict(), default=_to_json), nl=False)
+        self.count += 1
+
+    def close(self):
+        click.echo("[]" if self.count == 0 else "\n]")
+
+
+class CsvWriter(RowWriter):
+    """ Comma separated values, with a header line """
+
+    def __init__(self):
+        self.writer = csv.writer(_EchoFile(), lineterminator="\n")
+        self.has_header = False
+
+    def write_row(self, row):
+        if not self.has_header:
+            self.writer.writerow(row._fields)
+            self.has_header = True
+        self.writer.writerow([_to_json(x) if hasattr(x, "isoformat") else x for x in row])
+
+
+WRITERS = {"json": JsonWriter, "ndjson": NdjsonWriter, "csv": CsvWriter}
+
+
+def write_rows(rows, output_format):
+    """
+    Write rows in one of the `WRITERS` formats
+    """
+    writer = WRITERS[output_format]()
+    for row in rows:
+        writer.write_row(row)
+    writer.close()
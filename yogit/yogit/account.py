@@ -4,6 +4,8 @@ Account commands
 
 import click
 
+from yogit.api.engine import exit_dry_run
+from yogit.api.executor import QueryExecutor
 from yogit.api.queries import LoginQuery, EmailQuery, RateLimitQuery
 from yogit.yogit.slack import SlackAuthCheck, SlackChannelListQuery
 from yogit.yogit.settings import Settings
@@ -68,18 +70,19 @@ def _setup_github():
     settings.set_github_token(token)
 
     try:
-        login_query = LoginQuery()
-        login_query.execute()  # pylint: disable=no-value-for-parameter
+        executor = QueryExecutor()
+        login_query = executor.add(LoginQuery())
+        email_query = executor.add(EmailQuery())
+        executor.execute()  # pylint: disable=no-value-for-parameter
+        exit_dry_run()
         login = login_query.get_login()
-
-        email_query = EmailQuery()
-        email_query.execute()  # pylint: disable=no-value-for-parameter
     except Exception as exception:
         settings.reset_github()
         raise exception
 
-    settings.set_github_login(login)
-    settings.set_github_emails(email_query.get_emails())
+    with settings.transaction():
+        settings.set_github_login(login)
+        settings.set_github_emails(email_query.get_emails())
 
     click.secho("✓ GitHub, hello {}! 💕✨".format(login), bold=True)
 
@@ -97,8 +100,9 @@ def _setup_slack():
     click.echo(get_slack_text())
     token = click.prompt("Slack token", type=click.STRING, hide_input=True).strip()
     channel = click.prompt("Slack channel", type=click.STRING, prompt_suffix=": #").strip()
-    settings.set_slack_token(token)
-    settings.set_slack_channel(channel)
+    with settings.transaction():
+        settings.set_slack_token(token)
+        settings.set_slack_channel(channel)
 
     try:
         auth_query = SlackAuthCheck()
@@ -133,15 +137,18 @@ def account_setup():
 
 
 @click.command("usage", help="Account API usage")
+@click.option("--refresh", is_flag=True, help="Ask GitHub instead of using the budget seen by the last request")
 @click.pass_context
 @account_required
 @check_update
-def account_usage(ctx):  # pylint: disable=unused-argument
+def account_usage(ctx, refresh):  # pylint: disable=unused-argument
     """
     Account API usage
     """
     query = RateLimitQuery()
-    query.execute()  # pylint: disable=no-value-for-parameter
+    if refresh or not query.load_last_known():
+        query.execute()  # pylint: disable=no-value-for-parameter
+    exit_dry_run()
     query.print()
 
 
@@ -7,6 +7,8 @@ import click
 from yogit.api.queries import BranchListQuery
 from yogit.yogit.settings import Settings
 from yogit.yogit.checks import account_required, check_update
+from yogit.yogit.output import format_option, mirror_option, print_query
+from yogit.yogit.caching import cache_options
 
 
 @click.group("branch")
@@ -18,16 +20,19 @@ def branch():
 
 @click.command("list", help="List your branches")
 @click.option("--dangling", is_flag=True, help="Only show branches which do not have associated pull requests")
+@click.option("--resume", is_flag=True, help="Continue an interrupted listing from its last page")
+@mirror_option
+@format_option
+@cache_options(max_age=300)
 @click.pass_context
 @account_required
 @check_update
-def branch_list(ctx, dangling):  # pylint: disable=unused-argument
+def branch_list(ctx, dangling, resume, from_mirror, output_format):  # pylint: disable=unused-argument
     """
     List your branches
     """
-    query = BranchListQuery(emails=Settings().get_github_emails(), is_dangling=dangling)
-    query.execute()  # pylint: disable=no-value-for-parameter
-    query.print()
+    query = BranchListQuery(emails=Settings().get_github_emails(), is_dangling=dangling, resume=resume)
+    print_query(query, output_format, from_mirror=from_mirror)
 
 
 branch.add_command(branch_list)
@@ -0,0 +1,42 @@
+"""
+Response cache options of commands
+"""
+import functools
+
+import click
+
+from yogit.api.cache import set_cache_policy, log_cache_stats
+
+
+def cache_options(max_age):
+    """
+    Add `--max-age`, `--no-cache` and `--refresh` options to a command
+
+    Responses of the command are served from cache for `max_age` seconds by
+    default. Hits and misses are logged once the command completes.
+    """
+
+    def decorator(func):
+        @click.option(
+            "--max-age",
+            type=click.IntRange(min=0),
+            default=max_age,
+            show_default=True,
+            help="Serve responses cached for less than this many seconds",
+        )
+        @click.option("--no-cache", is_flag=True, help="Neither read nor write cached responses")
+        @click.option("--refresh", is_flag=True, help="Fetch responses again and cache them")
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            max_age = kwargs.pop("max_age")
+            no_cache = kwargs.pop("no_cache")
+            set_cache_policy(None if no_cache else max_age, kwargs.pop("refresh"))
+            try:
+                return func(*args, **kwargs)
+            finally:
+                log_cache_stats()
+                set_cache_policy(None)
+
+        return wrapper
+
+    return decorator
@@ -3,6 +3,7 @@ yogit precheck routines
 """
 import click
 
+from yogit.api.engine import is_dry_run
 from yogit.yogit.settings import Settings
 from yogit.yogit.update_checker import UpdateChecker
 
@@ -32,7 +33,8 @@ def check_update(func):
 
     def wrapper(self, *args, **kwargs):
         # pylint: disable=missing-docstring
-        _check_update()
+        if not is_dry_run():
+            _check_update()
         func(self, *args, **kwargs)
 
     return wrapper
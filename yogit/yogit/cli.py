@@ -4,6 +4,7 @@ yogit entry point
 import click
 
 from yogit import get_name, get_version
+from yogit.api.engine import exit_dry_run, set_dry_run
 from yogit.yogit.logger import enable_stdout
 from yogit.yogit.organization import organization
 from yogit.yogit.pullrequest import pull_request
@@ -12,6 +13,7 @@ from yogit.yogit.contribution import contribution
 from yogit.yogit.review import review
 from yogit.yogit.account import account
 from yogit.yogit.scrum import scrum
+from yogit.yogit.sync import sync
 
 
 def get_version_content():
@@ -26,13 +28,23 @@ def get_version_content():
 @click.group()
 @click.version_option(message=get_version_content())
 @click.option("--verbose", "-v", is_flag=True, help="Print verbose output.")
+@click.option("--dry-run", is_flag=True, help="Print planned requests and their cost instead of sending them.")
 @click.pass_context
-def main(ctx, verbose):  # pylint: disable=unused-argument
+def main(ctx, verbose, dry_run):  # pylint: disable=unused-argument
     """
     Command line utility for GitHub daily work
     """
     if verbose:
         enable_stdout()
+    set_dry_run(dry_run)
+
+
+@main.resultcallback()
+def main_result(*args, **kwargs):  # pylint: disable=unused-argument
+    """
+    Print requests planned by a dry run command which did not need their results
+    """
+    exit_dry_run()
 
 
 main.add_command(account)
@@ -42,6 +54,7 @@ main.add_command(organization)
 main.add_command(pull_request)
 main.add_command(review)
 main.add_command(scrum)
+main.add_command(sync)
 
 
 if __name__ == "__main__":
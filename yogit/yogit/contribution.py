@@ -5,8 +5,11 @@ from datetime import datetime
 
 import click
 
+from yogit.api.engine import exit_dry_run
 from yogit.api.queries import ContributionListQuery, ContributionStatsQuery
 from yogit.yogit.checks import account_required, check_update
+from yogit.yogit.output import format_option, print_query, TABLE_FORMAT
+from yogit.yogit.caching import cache_options
 from yogit.utils.dateutils import today_str
 
 
@@ -54,23 +57,24 @@ def contribution():
     default=_get_default_from(),
     show_default=True,
 )
+@format_option
+@cache_options(max_age=60)
 @click.pass_context
 @account_required
 @check_update
-def contribution_list(ctx, str_from, str_to):  # pylint: disable=unused-argument
+def contribution_list(ctx, str_from, str_to, output_format):  # pylint: disable=unused-argument
     """
     List contributions
     """
     dt_from, dt_to = _compute_date_str(str_from, str_to)
-    if (dt_to - dt_from).days > 365:
-        raise click.ClickException("Date range must not exceed one year")
-    click.secho("Contributions from {} to {}".format(str_from, str_to), bold=True)
+    if output_format == TABLE_FORMAT:
+        click.secho("Contributions from {} to {}".format(str_from, str_to), bold=True)
     query = ContributionListQuery(dt_from, dt_to)
-    query.execute()  # pylint: disable=no-value-for-parameter
-    query.print()
+    print_query(query, output_format)
 
 
 @click.command("stats", help="GitHub statistics")
+@cache_options(max_age=3600)
 @click.pass_context
 @account_required
 @check_update
@@ -80,6 +84,7 @@ def contribution_stats(ctx):  # pylint: disable=unused-argument
     """
     query = ContributionStatsQuery()
     query.execute()  # pylint: disable=no-value-for-parameter
+    exit_dry_run()
     query.print()
 
 
@@ -2,22 +2,77 @@
 Subcommand `orga`
 """
 import random
-from time import sleep
+from time import sleep, time
 
 import click
 
+from yogit.api.engine import exit_dry_run, is_dry_run
+from yogit.api.executor import QueryExecutor
 from yogit.api.queries import OrganizationListQuery, OrganizationMemberListQuery
+from yogit.storage.storage import load_json, save_json
 from yogit.yogit.checks import account_required, check_update
+from yogit.yogit.output import format_option, load_mirror, mirror_option, print_query, print_result, TABLE_FORMAT
+from yogit.yogit.caching import cache_options
+from yogit.yogit.paths import get_organizations_path
+from yogit.yogit.settings import Settings
 from yogit.utils.spinner import get_spinner_object
 
+ORGANIZATION_CACHE_MAX_AGE = 7 * 24 * 3600
 
-def check_organization(orga):
+
+class OrganizationCache:
+    """
+    Organizations the user belongs to, cached for `ORGANIZATION_CACHE_MAX_AGE` seconds
+    """
+
+    def __init__(self):
+        self.filename = get_organizations_path()
+
+    def get(self):
+        """
+        Return cached organization logins, lowercased, or None when unknown or stale
+        """
+        data = load_json(self.filename)
+        if data.get("login") != Settings().get_github_login():
+            return None
+        if time() - data.get("cached_at", 0) > ORGANIZATION_CACHE_MAX_AGE:
+            return None
+        return data.get("organizations")
+
+    def put(self, orga_query):
+        """
+        Cache organizations of an executed query, unless nothing was fetched in dry run
+        """
+        if is_dry_run():
+            return
+        organizations = [x[0].lower() for x in orga_query.data]
+        data = {"login": Settings().get_github_login(), "cached_at": time(), "organizations": organizations}
+        save_json(self.filename, data)
+
+    def clear(self):
+        """
+        Forget cached organizations
+        """
+        save_json(self.filename, {})
+
+
+def get_cached_organization(orga):
+    """
+    Return orga once checked against cached organizations, None when the cache cannot tell
+    """
+    organizations = OrganizationCache().get()
+    if not organizations:
+        return None
+    if orga is None:
+        return organizations[0] if len(organizations) == 1 else None
+    return orga if orga.lower() in organizations else None
+
+
+def check_organization(orga, orga_query):
     """
     Check if orga exist or if user belong to only one orga
     """
-    query = OrganizationListQuery()
-    query.execute()  # pylint: disable=no-value-for-parameter
-    orgas = [x[0].lower() for x in query.data]
+    orgas = [x[0].lower() for x in orga_query.data]
     if not orgas:
         raise click.ClickException("You do not belong to any organization 😿")
     if orga is None:
@@ -31,6 +86,65 @@ def check_organization(orga):
     return orga
 
 
+def check_fetched_organization(orga, orga_query):
+    """
+    Check orga against organizations fetched by orga_query
+
+    Organizations are not fetched in dry run: orga is taken as is.
+    """
+    if is_dry_run():
+        return orga
+    return check_organization(orga, orga_query)
+
+
+def get_organization(orga):
+    """
+    Return orga once checked, organizations are fetched when the cache cannot tell
+    """
+    cached_orga = get_cached_organization(orga)
+    if cached_orga is not None:
+        return cached_orga
+    orga_query = OrganizationListQuery()
+    orga_query.execute()  # pylint: disable=no-value-for-parameter
+    OrganizationCache().put(orga_query)
+    return check_fetched_organization(orga, orga_query)
+
+
+def get_members(orga):
+    """
+    Return executed member query of orga, once checked
+
+    When orga is cached, only its members are fetched. Otherwise they are
+    fetched while orga is checked, if given.
+    """
+    cached_orga = get_cached_organization(orga)
+    if cached_orga is not None:
+        executor = QueryExecutor()
+        member_query = executor.add(OrganizationMemberListQuery(cached_orga))
+        executor.execute(raise_errors=False)  # pylint: disable=no-value-for-parameter
+        if not executor.errors:
+            return member_query
+        # Membership may have changed since organizations were cached
+        OrganizationCache().clear()
+
+    executor = QueryExecutor()
+    orga_query = executor.add(OrganizationListQuery())
+    member_query = None
+    if orga is not None:
+        member_query = executor.add(OrganizationMemberListQuery(orga))
+    executor.execute(raise_errors=False)  # pylint: disable=no-value-for-parameter
+    if orga_query in executor.errors:
+        raise executor.errors[orga_query]
+    OrganizationCache().put(orga_query)
+    orga = check_fetched_organization(orga, orga_query)
+    executor.raise_errors()
+
+    if member_query is None:
+        member_query = OrganizationMemberListQuery(orga)
+        member_query.execute()  # pylint: disable=no-value-for-parameter
+    return member_query
+
+
 @click.group("orga")
 def organization():
     """
@@ -39,16 +153,18 @@ def organization():
 
 
 @click.command("list", help="List organizations you belong to")
+@format_option
+@cache_options(max_age=3600)
 @click.pass_context
 @account_required
 @check_update
-def orga_list(ctx):  # pylint: disable=unused-argument
+def orga_list(ctx, output_format):  # pylint: disable=unused-argument
     """
     List organizations you belong to
     """
     query = OrganizationListQuery()
-    query.execute()  # pylint: disable=no-value-for-parameter
-    query.print()
+    print_query(query, output_format)
+    OrganizationCache().put(query)
 
 
 @click.group("member")
@@ -60,21 +176,36 @@ def member():
 
 @click.command("list", help="List members of the organization you belong to")
 @click.option("--orga", type=click.STRING, help="Specify the organization")
+@click.option("--stream", is_flag=True, help="Print members as they are fetched, unordered")
+@mirror_option
+@format_option
+@cache_options(max_age=3600)
 @click.pass_context
 @account_required
 @check_update
-def orga_member_list(ctx, orga):  # pylint: disable=unused-argument
+def orga_member_list(ctx, orga, stream, from_mirror, output_format):  # pylint: disable=unused-argument
     """
     List members of the organization you belong to
     """
-    orga = check_organization(orga)
-    query = OrganizationMemberListQuery(orga)
-    query.execute()  # pylint: disable=no-value-for-parameter
-    query.print()
+    if from_mirror:
+        orga_query = OrganizationListQuery()
+        load_mirror(orga_query)
+        member_query = OrganizationMemberListQuery(check_organization(orga, orga_query))
+        load_mirror(member_query)
+        print_result(member_query, output_format)
+        return
+    if stream:
+        orga = get_organization(orga)
+        if output_format == TABLE_FORMAT and not is_dry_run():
+            click.secho("{}'s members".format(orga), bold=True)
+        print_query(OrganizationMemberListQuery(orga), output_format, stream=True)
+        return
+    print_result(get_members(orga), output_format)
 
 
 @click.command("pickone", help="Randomly pick a member of the organization you belong to")
 @click.option("--orga", type=click.STRING, help="Specify the organization")
+@cache_options(max_age=3600)
 @click.pass_context
 @account_required
 @check_update
@@ -82,9 +213,8 @@ def orga_member_pickone(ctx, orga):  # pylint: disable=unused-argument
     """
     Randomly pick a member of the organization you belong to
     """
-    orga = check_organization(orga)
-    query = OrganizationMemberListQuery(orga)
-    query.execute()  # pylint: disable=no-value-for-parameter
+    query = get_members(orga)
+    exit_dry_run()
     members = [x[0] for x in query.data]
     count = len(members)
     click.secho("Picking one out of {} members... ({:.2f}%) 🎲".format(count, 100 / count), bold=True)
@@ -0,0 +1,82 @@
+"""
+Output of list commands
+"""
+from time import time
+
+import click
+
+from yogit.api.engine import exit_dry_run, is_dry_run
+from yogit.storage.mirror import Mirror
+from yogit.utils.dateutils import elapsed_str
+from yogit.utils.writers import WRITERS, write_rows
+
+TABLE_FORMAT = "table"
+
+
+def format_option(func):
+    """
+    Add `--format` option to a list command
+    """
+    return click.option(
+        "--format",
+        "output_format",
+        type=click.Choice([TABLE_FORMAT] + sorted(WRITERS)),
+        default=TABLE_FORMAT,
+        show_default=True,
+        help="Output format, json, ndjson and csv are written row by row",
+    )(func)
+
+
+def mirror_option(func):
+    """
+    Add `--mirror` option to a list command
+    """
+    return click.option(
+        "--mirror", "from_mirror", is_flag=True, help="Answer from the local mirror filled by `yogit sync`"
+    )(func)
+
+
+def load_mirror(query):
+    """
+    Fill a query with its rows of the local mirror, telling how old they are
+    """
+    source = query.get_mirror_source()
+    mirror = Mirror()
+    try:
+        sync = mirror.get_sync(source)
+        if sync is None:
+            raise click.ClickException("Nothing synced yet, run `yogit sync`")
+        query.load_mirror_rows(mirror.load(source))
+    finally:
+        mirror.close()
+    click.secho("Mirror synced: {}".format(elapsed_str(time() - sync[0]).lower()), err=True)
+
+
+def print_result(query, output_format):
+    """
+    Print rows of an executed query
+    """
+    exit_dry_run()
+    if output_format == TABLE_FORMAT:
+        query.print()
+    else:
+        write_rows(query.data, output_format)
+
+
+def print_query(query, output_format, stream=False, from_mirror=False):
+    """
+    Execute a query and print its rows
+
+    When `stream` is set, rows are printed as soon as they are fetched.
+    When `from_mirror` is set, rows are read from the local mirror instead.
+    """
+    if from_mirror:
+        load_mirror(query)
+        print_result(query, output_format)
+    elif not stream or is_dry_run():
+        query.execute()  # pylint: disable=no-value-for-parameter
+        print_result(query, output_format)
+    elif output_format == TABLE_FORMAT:
+        query.print_stream()
+    else:
+        write_rows(query.iter_rows(), output_format)
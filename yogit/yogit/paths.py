@@ -19,3 +19,38 @@ def get_settings_path():
 def get_scrum_report_path():
     """ Get scrum report path """
     return os.path.join(SETTINGS_DIR, "scrum_report.yaml")
+
+
+def get_validators_path():
+    """ Get path of REST validators and bodies used by conditional requests """
+    return os.path.join(SETTINGS_DIR, "validators.json")
+
+
+def get_rate_limit_path():
+    """ Get path of the last known GitHub rate limit budget """
+    return os.path.join(SETTINGS_DIR, "rate_limit.json")
+
+
+def get_update_check_path():
+    """ Get path of the last known yogit version """
+    return os.path.join(SETTINGS_DIR, "update_check.json")
+
+
+def get_organizations_path():
+    """ Get path of the cached organizations the user belongs to """
+    return os.path.join(SETTINGS_DIR, "organizations.json")
+
+
+def get_checkpoint_dir():
+    """ Get directory of pagination checkpoints of interrupted queries """
+    return os.path.join(SETTINGS_DIR, "checkpoints")
+
+
+def get_cache_dir():
+    """ Get directory of cached GitHub responses """
+    return os.path.join(SETTINGS_DIR, "cache")
+
+
+def get_mirror_path(login):
+    """ Get path of the local mirror filled by `yogit sync` for a GitHub login """
+    return os.path.join(SETTINGS_DIR, "mirrors", "{}.sqlite3".format(login))
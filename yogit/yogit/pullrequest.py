@@ -6,6 +6,8 @@ import click
 
 from yogit.api.queries import PullRequestListQuery, OrgaPullRequestListQuery
 from yogit.yogit.checks import account_required, check_update
+from yogit.yogit.output import format_option, mirror_option, print_query
+from yogit.yogit.caching import cache_options
 
 
 @click.group("pr")
@@ -23,20 +25,26 @@ def pull_request():
     multiple=True,
     help="Only show pull requests having such label (several --label can be set)",
 )
+@click.option("--stream", is_flag=True, help="Print pull requests as they are fetched, unordered")
+@click.option("--resume", is_flag=True, help="With --orga, continue an interrupted listing from its last page")
+@mirror_option
+@format_option
+@cache_options(max_age=60)
 @click.pass_context
 @account_required
 @check_update
-def pull_request_list(ctx, orga, label):  # pylint: disable=unused-argument
+def pull_request_list(ctx, orga, label, stream, resume, from_mirror, output_format):  # pylint: disable=unused-argument
     """
     List pull requests
     """
+    if from_mirror and (orga or label):
+        raise click.ClickException("`--mirror` cannot be used with `--orga` nor `--label`")
     labels = [x.lower() for x in label]
     if orga:
-        query = OrgaPullRequestListQuery(labels, orga)
+        query = OrgaPullRequestListQuery(labels, orga, resume=resume)
     else:
         query = PullRequestListQuery(labels)
-    query.execute()  # pylint: disable=no-value-for-parameter
-    query.print()
+    print_query(query, output_format, stream, from_mirror)
 
 
 pull_request.add_command(pull_request_list)
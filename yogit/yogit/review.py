@@ -6,6 +6,8 @@ import click
 
 from yogit.api.queries import ReviewListQuery, ReviewRequestedQuery
 from yogit.yogit.checks import account_required, check_update
+from yogit.yogit.output import format_option, mirror_option, print_query
+from yogit.yogit.caching import cache_options
 
 
 @click.group("review")
@@ -16,30 +18,35 @@ def review():
 
 
 @click.command("list", help="List your reviews on opened pull requests")
+@mirror_option
+@format_option
+@cache_options(max_age=60)
 @click.pass_context
 @account_required
 @check_update
-def review_list(ctx):  # pylint: disable=unused-argument
+def review_list(ctx, from_mirror, output_format):  # pylint: disable=unused-argument
     """
     List your reviews on opened pull requests
     """
     query = ReviewListQuery()
-    query.execute()  # pylint: disable=no-value-for-parameter
-    query.print()
+    print_query(query, output_format, from_mirror=from_mirror)
 
 
 @click.command("requested", help="List pull requests where your review is requested")
 @click.option("--missed", is_flag=True, help="Only show closed pull requests")
+@click.option("--stream", is_flag=True, help="Print pull requests as they are fetched, unordered")
+@mirror_option
+@format_option
+@cache_options(max_age=60)
 @click.pass_context
 @account_required
 @check_update
-def review_requested_list(ctx, missed):  # pylint: disable=unused-argument
+def review_requested_list(ctx, missed, stream, from_mirror, output_format):  # pylint: disable=unused-argument
     """
     List pull requests where your review is requested
     """
     query = ReviewRequestedQuery(is_closed=missed)
-    query.execute()  # pylint: disable=no-value-for-parameter
-    query.print()
+    print_query(query, output_format, stream, from_mirror)
 
 
 review.add_command(review_list)
@@ -3,11 +3,11 @@
 """
 
 import re
-from string import Template
 
 import click
 import pyperclip
 
+from yogit.api.engine import exit_dry_run
 from yogit.yogit.settings import ScrumReportSettings, Settings
 from yogit.api.queries import OneDayContributionListQuery
 from yogit.yogit.logger import LOGGER
@@ -38,6 +38,7 @@ def generate_scrum_report(report_dt):
 
     click.secho("GitHub's cheat sheet 😏:", bold=True)
     report_query = _exec_github_report_query(report_dt)
+    exit_dry_run()
     if len(report_query.data) == 0:
         click.echo("• Sorry, nothing from GitHub! Maybe you can ask your mum? 🤷‍")
     else:
@@ -46,12 +47,11 @@ def generate_scrum_report(report_dt):
     click.echo("")
 
     data = {}
-    questions = report_settings.get_questions()
-    tpl = report_settings.get_template()
+    snapshot = report_settings.get_snapshot()
     suffix = "• "
 
     click.secho("Report of {}".format(report_dt.date().isoformat()), bold=True)
-    for idx, question in enumerate(questions):
+    for idx, question in enumerate(snapshot.questions):
         click.echo(click.style(question, bold=True) + " (empty line to move on)")
         answers = []
         while True:
@@ -65,10 +65,9 @@ def generate_scrum_report(report_dt):
         data["a{}".format(idx)] = "\n".join(answers)
 
     report_sections = []
-    for section in tpl.get("sections", []):
-        template = Template("\n".join(section))
-        data["date"] = report_dt.date().isoformat()
-        if "${github_report}" in template.template:
+    data["date"] = report_dt.date().isoformat()
+    for template in snapshot.sections:
+        if "github_report" not in data and "${github_report}" in template.template:
             data["github_report"] = report_query.tabulate()
         report_sections.append(template.safe_substitute(data))
 
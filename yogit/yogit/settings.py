@@ -1,12 +1,15 @@
 """
 yogit settings
 """
-import yaml
+from contextlib import contextmanager
+from string import Template
 
 from yogit.yogit.paths import get_settings_path, get_scrum_report_path
 from yogit.storage.storage import Storage
 
 SETTINGS_VERSION = 1
+DEFAULT_HTTP_POOL_CONNECTIONS = 10
+DEFAULT_HTTP_POOL_MAXSIZE = 10
 SCRUM_REPORT_VERSION = 2
 DEFAULT_SCRUM_REPORT_CONFIG = """
 # Available placeholders:
@@ -44,6 +47,7 @@ class Settings:
 
     def __init__(self):
         self.storage = Storage(get_settings_path(), SETTINGS_VERSION)
+        self.pending = None
 
     def get_path(self):
         """
@@ -51,6 +55,26 @@ class Settings:
         """
         return self.storage.get_path()
 
+    @contextmanager
+    def transaction(self):
+        """
+        Yield settings data to be modified, written once when the outermost transaction ends
+        """
+        if self.pending is not None:
+            yield self.pending
+            return
+        with self.storage.edit() as data:
+            self.pending = data
+            try:
+                yield data
+            finally:
+                self.pending = None
+
+    def _load(self):
+        if self.pending is not None:
+            return self.pending
+        return self.storage.load()
+
     def reset(self):
         """ Reset setting values """
         self.storage.save(None)
@@ -61,42 +85,40 @@ class Settings:
 
     def reset_github(self):
         """ Reset GitHub settings """
-        self.set_github_token("")
-        self.set_github_login("")
-        self.set_github_emails("")
+        with self.transaction():
+            self.set_github_token("")
+            self.set_github_login("")
+            self.set_github_emails("")
 
     def get_github_token(self):
         """ Return GitHub token or empty string """
-        data = self.storage.load()
+        data = self._load()
         return data.get("token", "") or ""
 
     def set_github_token(self, token):
         """ Store GitHub token """
-        data = self.storage.load()
-        data["token"] = token
-        self.storage.save(data)
+        with self.transaction() as data:
+            data["token"] = token
 
     def get_github_login(self):
         """ Return GitHub login identifier or empty string """
-        data = self.storage.load()
+        data = self._load()
         return data.get("login", "") or ""
 
     def set_github_login(self, login):
         """ Store GitHub login identifier """
-        data = self.storage.load()
-        data["login"] = login
-        self.storage.save(data)
+        with self.transaction() as data:
+            data["login"] = login
 
     def get_github_emails(self):
         """ Return email list associated to the GitHub account or empty list """
-        data = self.storage.load()
+        data = self._load()
         return data.get("emails", []) or []
 
     def set_github_emails(self, emails):
         """ Store email list """
-        data = self.storage.load()
-        data["emails"] = emails
-        self.storage.save(data)
+        with self.transaction() as data:
+            data["emails"] = emails
 
     def is_slack_valid(self):
         """ Return True if Slack is setup, False otherwise """
@@ -104,35 +126,44 @@ class Settings:
 
     def reset_slack(self):
         """ Reset Slack settings """
-        self.set_slack_token("")
-        self.set_slack_channel("")
+        with self.transaction():
+            self.set_slack_token("")
+            self.set_slack_channel("")
 
     def set_slack_token(self, token):
         """ Store Slack token """
-        data = self.storage.load()
-        slack_data = data.get("slack", {}) or {}
-        slack_data["legacy_token"] = token
-        data["slack"] = slack_data
-        self.storage.save(data)
+        with self.transaction() as data:
+            slack_data = data.get("slack", {}) or {}
+            slack_data["legacy_token"] = token
+            data["slack"] = slack_data
 
     def get_slack_token(self):
         """ Return Slack token or empty string """
-        data = self.storage.load()
+        data = self._load()
         return data.get("slack", {}).get("legacy_token", "") or ""
 
     def set_slack_channel(self, channel):
         """ Store Slack channel """
-        data = self.storage.load()
-        slack_data = data.get("slack", {}) or {}
-        slack_data["report_channel"] = channel
-        data["slack"] = slack_data
-        self.storage.save(data)
+        with self.transaction() as data:
+            slack_data = data.get("slack", {}) or {}
+            slack_data["report_channel"] = channel
+            data["slack"] = slack_data
 
     def get_slack_channel(self):
         """ Return Slack channel or empty string """
-        data = self.storage.load()
+        data = self._load()
         return data.get("slack", {}).get("report_channel", "") or ""
 
+    def get_http_pool_connections(self):
+        """ Return number of per-host connection pools kept alive """
+        data = self._load()
+        return data.get("http", {}).get("pool_connections") or DEFAULT_HTTP_POOL_CONNECTIONS
+
+    def get_http_pool_maxsize(self):
+        """ Return maximum number of connections kept alive per host """
+        data = self._load()
+        return data.get("http", {}).get("pool_maxsize") or DEFAULT_HTTP_POOL_MAXSIZE
+
 
 def migrate_report_settings_from_1_to_2(data):
     """
@@ -150,6 +181,17 @@ def migrate_report_settings_from_1_to_2(data):
     return migrated
 
 
+class ScrumReportSnapshot:
+    """
+    Scrum report settings, with template sections compiled once
+    """
+
+    def __init__(self, data):
+        self.questions = data.get("questions", []) or []
+        template = data.get("template", {}) or {}
+        self.sections = [Template("\n".join(section)) for section in template.get("sections", []) or []]
+
+
 class ScrumReportSettings:
     """
     Scrum report settings access class
@@ -172,13 +214,19 @@ class ScrumReportSettings:
         """
         data = self.storage.load()
         if data == {}:
+            import yaml
+
             data = yaml.load(DEFAULT_SCRUM_REPORT_CONFIG, Loader=yaml.FullLoader)
             self.storage.save(data)
-        if self.storage.get_version() is None or self.storage.get_version() == 1:
+        elif (data.get("version") or None) in (None, 1):
             data = migrate_report_settings_from_1_to_2(data)
             self.storage.save(data)
         return data
 
+    def get_snapshot(self):
+        """ Return scrum report data, loaded once, as a `ScrumReportSnapshot` """
+        return ScrumReportSnapshot(self.get())
+
     def get_questions(self):
         """ Return questions or empty list """
         data = self.get()
@@ -6,7 +6,7 @@ import click
 from urllib.parse import urlparse
 
 from yogit.yogit.settings import Settings
-from yogit.api.requester import http_call
+from yogit.api.requester import http_call, RetryPolicy
 from yogit.utils.spinner import spin
 from yogit.yogit.logger import LOGGER
 
@@ -40,7 +40,7 @@ class SlackRESTClient:
         url = _get_slack_url(endpoint)
         LOGGER.debug("POST %s", url)
         LOGGER.debug(payload)
-        return http_call("post", url, data=payload)
+        return http_call("post", url, data=payload, retry_policy=RetryPolicy(idempotent=False))
 
     def get(self, endpoint, params):
         """
@@ -0,0 +1,74 @@
+"""
+Command `sync`
+"""
+import click
+from tabulate import tabulate
+
+from yogit.api.engine import exit_dry_run
+from yogit.api.executor import QueryExecutor
+from yogit.api.queries import (
+    BranchListQuery,
+    OrganizationListQuery,
+    OrganizationMemberListQuery,
+    PullRequestSyncQuery,
+    ReviewListQuery,
+    ReviewRequestedQuery,
+)
+from yogit.storage.mirror import Mirror
+from yogit.yogit.checks import account_required, check_update
+from yogit.yogit.settings import Settings
+
+
+def fetch(mirror):
+    """
+    Return executed queries filling the mirror: pull request sync query first, then list queries
+    """
+    sync = mirror.get_sync(PullRequestSyncQuery().get_mirror_source())
+    pr_query = PullRequestSyncQuery(high_water=sync[1] if sync else None)
+    orga_query = OrganizationListQuery()
+    list_queries = [
+        ReviewRequestedQuery(is_closed=False),
+        ReviewRequestedQuery(is_closed=True),
+        ReviewListQuery(),
+        # Not resumable: the checkpoint of `branch list` is left alone
+        BranchListQuery(emails=Settings().get_github_emails(), is_checkpointed=False),
+        orga_query,
+    ]
+    executor = QueryExecutor()
+    for query in [pr_query] + list_queries:
+        executor.add(query)
+    executor.execute()  # pylint: disable=no-value-for-parameter
+
+    member_queries = [OrganizationMemberListQuery(x.login) for x in orga_query.data]
+    if member_queries:
+        executor = QueryExecutor()
+        for query in member_queries:
+            executor.add(query)
+        executor.execute()  # pylint: disable=no-value-for-parameter
+    return pr_query, list_queries + member_queries
+
+
+@click.command("sync", help="Fill the local mirror read by `--mirror` options")
+@click.pass_context
+@account_required
+@check_update
+def sync(ctx):  # pylint: disable=unused-argument
+    """
+    Fill the local mirror read by `--mirror` options
+
+    Pull requests are fetched incrementally, from the most recently updated
+    down to the last sync. Other lists are fetched again and replaced.
+    """
+    mirror = Mirror()
+    try:
+        pr_query, list_queries = fetch(mirror)
+        exit_dry_run()
+        mirror.update(pr_query.get_mirror_source(), pr_query.open_rows, pr_query.closed_urls, pr_query.new_high_water)
+        for query in list_queries:
+            mirror.replace(query.get_mirror_source(), query.data)
+        sources = [pr_query.get_mirror_source()] + [x.get_mirror_source() for x in list_queries]
+        counts = [[source, mirror.count(source)] for source in sources]
+    finally:
+        mirror.close()
+    click.echo(tabulate(counts, headers=["SOURCE", "ROWS"]))
+    click.secho("Mirror synced: {} updated pull requests".format(pr_query.get_count()), bold=True)
@@ -1,16 +1,27 @@
 """
 Check for yogit update
+
+The latest version is cached for `UPDATE_CHECK_MAX_AGE` seconds. Once stale,
+it is fetched again by a detached process so commands are never delayed:
+the notice is printed by the next command.
 """
+import os
+import subprocess
+import sys
 from functools import cmp_to_key
+from time import time
 from packaging import version
 
 import click
 
 from yogit import get_version
 from yogit.api.queries import RESTQuery
+from yogit.storage.storage import load_json, save_json
 from yogit.yogit.logger import LOGGER
+from yogit.yogit.paths import get_update_check_path
 
 YOGIT_TAG_LIST_ENDPOINT = "/repos/hasboeuf/yogit/tags"
+UPDATE_CHECK_MAX_AGE = 24 * 3600
 
 
 def compare(version1, version2):
@@ -48,6 +59,36 @@ class UpdateChecker:
 
     def __init__(self):
         self.query = YogitTagsQuery()
+        self.filename = get_update_check_path()
+
+    def _spawn_refresh(self):
+        """ Refresh the latest version in a detached process """
+        kwargs = {"start_new_session": True}
+        if os.name == "nt":
+            kwargs = {"creationflags": subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP}
+        try:
+            subprocess.Popen(
+                [sys.executable, "-m", "yogit.yogit.update_checker"],
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+                close_fds=True,
+                **kwargs
+            )
+        except OSError as error:
+            LOGGER.error(str(error))
+
+    def refresh(self):
+        """
+        Fetch the latest version and cache it
+        """
+        _, _, latest_version = self._is_outdated()
+        data = load_json(self.filename)
+        data["checked_at"] = time()
+        if self.query.get_tags():
+            # Known latest version is kept when fetch failed
+            data["latest_version"] = latest_version
+        save_json(self.filename, data)
 
     def _is_outdated(self):
         current_version = get_version()
@@ -64,10 +105,24 @@ class UpdateChecker:
 
     def check(self):
         """
-        Compare current version with the latest one and print a message if needed
+        Compare current version with the latest cached one and print a message if needed
+
+        A stale cache is refreshed in the background, for the next command.
         """
-        outdated, current_version, latest_version = self._is_outdated()
-        if not outdated:
+        data = load_json(self.filename)
+        if time() - data.get("checked_at", 0) > UPDATE_CHECK_MAX_AGE:
+            # Set now so a single refresh is spawned, whether it succeeds or not
+            data["checked_at"] = time()
+            save_json(self.filename, data)
+            self._spawn_refresh()
+        current_version = get_version()
+        latest_version = data.get("latest_version")
+        try:
+            if latest_version is None or version.parse(current_version) >= version.parse(latest_version):
+                return
+        except Exception as exception:  # pylint: disable=broad-except
+            # Update check should never fail
+            LOGGER.error(str(exception))
             return
         click.secho(
             (
@@ -77,3 +132,7 @@ class UpdateChecker:
             ).format(current_version=current_version, latest_version=latest_version),
             fg="yellow",
         )
+
+
+if __name__ == "__main__":
+    UpdateChecker().refresh()